@@ -0,0 +1,90 @@
+"""
+Tables de correspondance des cocktails construites une seule fois par le parser IBA
+Retrouver un cocktail par slug, URI, nom ou label se fait en O(1) au lieu de parcourir
+get_all_cocktails() à chaque appel
+
+Les collisions de slug (deux noms donnant le même id via generate_slug) sont détectées
+à la construction: le premier cocktail garde l'id, les suivants sont signalés
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from backend.models.cocktail import Cocktail
+
+
+class CocktailLookup:
+    """
+    Index des cocktails par clé
+
+    - by_id: slug -> Cocktail
+    - by_uri: URI DBpedia -> Cocktail
+    - by_name: nom en minuscules -> Cocktail
+    - by_label: label multilingue ou nom alternatif en minuscules -> Cocktail
+    - positions: slug -> position dans la liste d'origine
+    - collisions: slug -> URIs des cocktails en conflit (le premier inclus)
+    """
+
+    def __init__(self, cocktails: List[Cocktail], slugify: Optional[Callable[[str], str]] = None, strict: bool = False):
+        self.cocktails = cocktails
+        self.slugify = slugify
+        self.by_id: Dict[str, Cocktail] = {}
+        self.by_uri: Dict[str, Cocktail] = {}
+        self.by_name: Dict[str, Cocktail] = {}
+        self.by_label: Dict[str, Cocktail] = {}
+        self.positions: Dict[str, int] = {}
+        self.collisions: Dict[str, List[str]] = {}
+
+        for position, cocktail in enumerate(cocktails):
+            existing = self.by_id.get(cocktail.id)
+            if existing is not None:
+                self.collisions.setdefault(cocktail.id, [existing.uri]).append(cocktail.uri)
+            else:
+                self.by_id[cocktail.id] = cocktail
+                self.positions[cocktail.id] = position
+
+            self.by_uri.setdefault(cocktail.uri, cocktail)
+            self.by_name.setdefault(cocktail.name.lower(), cocktail)
+            for label in list((cocktail.labels or {}).values()) + list(cocktail.alternative_names or []):
+                if label:
+                    self.by_label.setdefault(label.lower(), cocktail)
+
+        if self.collisions:
+            details = ", ".join(f"{slug} ({len(uris)} cocktails)" for slug, uris in self.collisions.items())
+            if strict:
+                raise ValueError(f"Collision d'identifiants de cocktails: {details}")
+            print(f"⚠️  Collision d'identifiants de cocktails: {details}")
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get_by_id(self, cocktail_id: str) -> Optional[Cocktail]:
+        return self.by_id.get(cocktail_id)
+
+    def get_by_uri(self, cocktail_uri: str) -> Optional[Cocktail]:
+        return self.by_uri.get(cocktail_uri)
+
+    def get_by_name(self, name: str) -> Optional[Cocktail]:
+        """Recherche par nom exact (insensible à la casse), puis par label multilingue"""
+        key = name.strip().lower()
+        return self.by_name.get(key) or self.by_label.get(key)
+
+    def position(self, cocktail_id: str) -> Optional[int]:
+        """Position du cocktail dans la liste ayant servi à construire l'index"""
+        return self.positions.get(cocktail_id)
+
+    def resolve(self, key: str) -> Optional[Cocktail]:
+        """
+        Retrouve un cocktail à partir d'un id, d'une URI, d'un nom ou d'un label
+
+        Args:
+            key: Identifiant quelconque du cocktail
+
+        Returns:
+            Le cocktail, ou None s'il est inconnu
+        """
+        if not key:
+            return None
+        cocktail = self.by_id.get(key) or self.by_uri.get(key) or self.get_by_name(key)
+        if cocktail is None and self.slugify is not None:
+            cocktail = self.by_id.get(self.slugify(key))
+        return cocktail
@@ -0,0 +1,163 @@
+"""
+Table des plus proches voisins des cocktails par ingrédients communs
+La matrice d'incidence cocktails x ingrédients est construite une seule fois, au format creux
+(listes d'ingrédients par cocktail et listes de postings par ingrédient). Les intersections de
+toutes les paires sont comptées à partir des postings, par blocs de lignes dont la taille suit
+un budget mémoire, et seuls les k meilleurs voisins de chaque cocktail sont conservés
+
+Le rail "cocktails similaires" lit ensuite une ligne de la table en O(k)
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.models.cocktail import Cocktail
+
+# Budget mémoire d'un bloc de la matrice de similarité (lignes x catalogue)
+_BLOCK_BYTES = 64 * 1024 * 1024
+# Octets par paire d'un bloc: intersections, dénominateurs, similarités et masques de sélection
+_BYTES_PER_PAIR = 40
+
+METRICS = ("jaccard", "cosine")
+
+
+class CocktailSimilarityTable:
+    """
+    Voisins les plus proches de chaque cocktail
+
+    - indptr/indices: ingrédients de chaque cocktail (CSR, cocktail i -> indices[indptr[i]:indptr[i + 1]])
+    - posting_indptr/posting_indices: cocktails de chaque ingrédient (CSR transposée)
+    - sizes: nombre d'ingrédients distincts de chaque cocktail
+    - neighbors: int32[n_cocktails, k], positions des voisins (-1 si aucun)
+    - scores: float64[n_cocktails, k], similarité correspondante
+    """
+
+    def __init__(self, cocktails: List[Cocktail], k: int = 20, metric: str = "jaccard",
+                 key: Optional[Callable[[str], str]] = None):
+        if metric not in METRICS:
+            raise ValueError(f"Métrique inconnue: {metric} (attendu: {', '.join(METRICS)})")
+        self.cocktails = cocktails
+        self.k = max(0, min(k, len(cocktails) - 1))
+        self.metric = metric
+        self.positions: Dict[str, int] = {}
+        for position, cocktail in enumerate(cocktails):
+            self.positions.setdefault(cocktail.id, position)
+
+        key = key or str.lower
+        vocabulary: Dict[str, int] = {}
+        rows: List[List[int]] = []
+        for cocktail in cocktails:
+            ids = {vocabulary.setdefault(key(name), len(vocabulary)) for name in cocktail.parsed_ingredients or []}
+            rows.append(sorted(ids))
+
+        counts = np.array([len(ids) for ids in rows], dtype=np.int64)
+        self.sizes = counts.astype(np.float64)
+        self.indptr = np.zeros(len(cocktails) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.indices = np.fromiter((i for ids in rows for i in ids), dtype=np.int32, count=int(self.indptr[-1]))
+
+        # Postings: cocktails triés par ingrédient (tri stable, donc par position dans chaque liste)
+        owners = np.repeat(np.arange(len(cocktails), dtype=np.int32), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        self.posting_indices = owners[order]
+        self.posting_indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=len(vocabulary)), out=self.posting_indptr[1:])
+
+        self.neighbors = np.full((len(cocktails), self.k), -1, dtype=np.int32)
+        self.scores = np.zeros((len(cocktails), self.k), dtype=np.float64)
+        self._build()
+
+    def _block_rows(self) -> int:
+        """Nombre de lignes par bloc pour rester dans _BLOCK_BYTES"""
+        return max(1, _BLOCK_BYTES // (_BYTES_PER_PAIR * max(1, len(self.cocktails))))
+
+    def _intersections(self, start: int, stop: int) -> np.ndarray:
+        """Nombre d'ingrédients communs entre les cocktails start:stop et tout le catalogue"""
+        n = len(self.cocktails)
+        ingredients = self.indices[self.indptr[start]:self.indptr[stop]]
+        block_rows = np.repeat(np.arange(stop - start, dtype=np.int64), np.diff(self.indptr[start:stop + 1]))
+        # Pour chaque (ligne, ingrédient), tous les cocktails de la liste de postings de l'ingrédient
+        lengths = self.posting_indptr[ingredients + 1] - self.posting_indptr[ingredients]
+        firsts = np.repeat(self.posting_indptr[ingredients] - np.cumsum(lengths) + lengths, lengths)
+        others = self.posting_indices[firsts + np.arange(int(lengths.sum()))]
+        pairs = np.repeat(block_rows, lengths) * n + others
+        return np.bincount(pairs, minlength=(stop - start) * n).reshape(stop - start, n)
+
+    def _similarity_block(self, start: int, stop: int) -> np.ndarray:
+        """Similarités des cocktails start:stop avec tout le catalogue (-1 pour les paires exclues)"""
+        intersection = self._intersections(start, stop)
+        if self.metric == "jaccard":
+            denominator = self.sizes[start:stop, None] + self.sizes[None, :] - intersection
+        else:
+            denominator = np.sqrt(self.sizes[start:stop, None] * self.sizes[None, :])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Comptes entiers exacts, division en float64 pour des scores exacts
+            similarity = np.where(denominator > 0, intersection / denominator.astype(np.float64), 0.0)
+
+        # Ni le cocktail lui-même, ni les cocktails sans ingrédients
+        similarity[:, self.sizes == 0] = -1.0
+        rows = np.arange(stop - start)
+        similarity[rows, rows + start] = -1.0
+        similarity[self.sizes[start:stop] == 0] = -1.0
+        return similarity
+
+    @staticmethod
+    def _top_k(similarity: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k meilleures colonnes de chaque ligne, de la plus à la moins similaire
+
+        argpartition donne le k-ième score de chaque ligne; seules les k colonnes retenues sont
+        ensuite triées. À score égal, l'ordre du catalogue est conservé, y compris à la frontière.
+        """
+        candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        threshold = np.take_along_axis(similarity, candidates, axis=1).min(axis=1)[:, None]
+        above = similarity > threshold
+        tied = similarity == threshold
+        needed = k - above.sum(axis=1, dtype=np.int32)[:, None]
+        selected = above | (tied & (np.cumsum(tied, axis=1, dtype=np.int32) <= needed))
+        # Exactement k colonnes par ligne, dans l'ordre du catalogue
+        columns = np.nonzero(selected)[1].reshape(len(similarity), k)
+        top = np.take_along_axis(similarity, columns, axis=1)
+        order = np.argsort(-top, axis=1, kind="stable")
+        return np.take_along_axis(columns, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+    def _build(self):
+        if self.k == 0:
+            return
+        block_rows = self._block_rows()
+        for start in range(0, len(self.cocktails), block_rows):
+            stop = min(start + block_rows, len(self.cocktails))
+            order, top = self._top_k(self._similarity_block(start, stop), self.k)
+            self.neighbors[start:stop] = np.where(top >= 0, order, -1)
+            self.scores[start:stop] = np.maximum(top, 0.0)
+
+    def similar(self, cocktail_id: str, limit: int = 10) -> List[Tuple[Cocktail, float]]:
+        """
+        Cocktails les plus proches d'un cocktail
+
+        Args:
+            cocktail_id: Identifiant (slug) du cocktail
+            limit: Nombre de voisins voulus (au-delà de k, la ligne est recalculée)
+
+        Returns:
+            Liste de (Cocktail, similarité), de la plus à la moins similaire
+        """
+        position = self.positions.get(cocktail_id)
+        if position is None or limit <= 0 or self.sizes[position] == 0:
+            return []
+
+        if limit <= self.k:
+            neighbors = self.neighbors[position, :limit]
+            scores = self.scores[position, :limit]
+        else:
+            similarity = self._similarity_block(position, position + 1)
+            neighbors, scores = self._top_k(similarity, min(limit, len(self.cocktails)))
+            neighbors, scores = neighbors[0], scores[0]
+            neighbors = np.where(scores >= 0, neighbors, -1)
+
+        return [
+            (self.cocktails[int(neighbor)], float(score))
+            for neighbor, score in zip(neighbors, scores)
+            if neighbor >= 0
+        ]
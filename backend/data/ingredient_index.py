@@ -0,0 +1,341 @@
+"""
+Index inversé ingrédient -> cocktails construit une seule fois par le parser IBA
+Les requêtes "que puis-je faire avec mon bar" deviennent des intersections de listes
+de postings au lieu de parcourir tout le catalogue à chaque appel
+
+La faisabilité est évaluée sur des bitmasks NumPy: chaque recette et chaque inventaire
+sont encodés sur le vocabulaire global des ingrédients (mots de 64 bits), et le nombre
+d'ingrédients manquants est le popcount de `recette & ~inventaire`, pour tous les
+cocktails en une seule opération vectorisée
+"""
+
+from functools import lru_cache
+from typing import List, Dict, Callable, FrozenSet, Iterable, Iterator, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.models.cocktail import Cocktail
+
+_WORD_BITS = 64
+# Taille maximale (en mots de 64 bits) d'un bloc utilisateurs x cocktails x mots évalué d'un coup
+_BATCH_CHUNK_WORDS = 1 << 22
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(masks: np.ndarray) -> np.ndarray:
+        """Nombre de bits à 1 par ligne (somme sur le dernier axe)"""
+        return np.bitwise_count(masks).sum(axis=-1, dtype=np.int64)
+else:
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(masks: np.ndarray) -> np.ndarray:
+        """Nombre de bits à 1 par ligne (somme sur le dernier axe)"""
+        as_bytes = masks.view(np.uint8).reshape(masks.shape[:-1] + (-1,))
+        return _POPCOUNT8[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+class IngredientIndex:
+    """
+    Index des ingrédients du catalogue
+
+    - vocabulary: nom normalisé -> identifiant entier de l'ingrédient
+    - postings: nom normalisé -> positions (dans `cocktails`) des cocktails qui l'utilisent
+    - recipe_masks: matrice uint64 [cocktails, mots], bitmask des ingrédients de chaque cocktail
+    - recipe_sizes: nombre d'ingrédients distincts de chaque cocktail
+    """
+
+    def __init__(self, cocktails: List[Cocktail], normalize: Callable[[str], str]):
+        """
+        Args:
+            cocktails: Catalogue des cocktails (l'ordre est conservé dans les résultats)
+            normalize: Fonction de normalisation des noms d'ingrédients
+        """
+        self.cocktails = cocktails
+        # Les mêmes noms reviennent sans cesse d'un inventaire à l'autre
+        self.normalize = lru_cache(maxsize=65536)(normalize)
+        self.vocabulary: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.postings: Dict[str, FrozenSet[int]] = {}
+        self.recipe_masks = np.zeros((0, 1), dtype=np.uint64)
+        self.recipe_sizes = np.zeros(0, dtype=np.int64)
+        self.cocktail_ingredients: List[Tuple[str, ...]] = []
+        # Cocktails avec 1 ou 2 ingrédients: "presque faisables" même sans aucun ingrédient en stock
+        self._small_cocktails: FrozenSet[int] = frozenset()
+        self._build()
+
+    def _build(self):
+        postings: Dict[str, set] = {}
+        small = set()
+
+        for position, cocktail in enumerate(self.cocktails):
+            keys = []
+            for name in cocktail.parsed_ingredients or []:
+                key = self.normalize(name)
+                if not key or key in keys:
+                    continue
+                ingredient_id = self.vocabulary.get(key)
+                if ingredient_id is None:
+                    ingredient_id = len(self.names)
+                    self.vocabulary[key] = ingredient_id
+                    self.names.append(key)
+                    postings[key] = set()
+                postings[key].add(position)
+                keys.append(key)
+
+            self.cocktail_ingredients.append(tuple(keys))
+            if 1 <= len(keys) <= 2:
+                small.add(position)
+
+        self.postings = {key: frozenset(positions) for key, positions in postings.items()}
+        self._small_cocktails = frozenset(small)
+
+        self.recipe_masks = np.zeros((len(self.cocktails), self.word_count), dtype=np.uint64)
+        for position, keys in enumerate(self.cocktail_ingredients):
+            self.recipe_masks[position] = self._mask_from_ids(self.vocabulary[key] for key in keys)
+        self.recipe_sizes = np.array([len(keys) for keys in self.cocktail_ingredients], dtype=np.int64)
+
+    @property
+    def word_count(self) -> int:
+        """Nombre de mots de 64 bits nécessaires pour couvrir le vocabulaire"""
+        return max(1, -(-len(self.names) // _WORD_BITS))
+
+    def _mask_from_ids(self, ingredient_ids: Iterable[int]) -> np.ndarray:
+        # Accumuler en entiers Python puis convertir une seule fois (évite les scalaires NumPy)
+        words = [0] * self.word_count
+        for ingredient_id in ingredient_ids:
+            words[ingredient_id // _WORD_BITS] |= 1 << (ingredient_id % _WORD_BITS)
+        return np.array(words, dtype=np.uint64)
+
+    def _keys(self, ingredient_names: Iterable[str]) -> List[str]:
+        return [key for key in (self.normalize(name) for name in ingredient_names) if key]
+
+    def encode(self, ingredient_names: Iterable[str]) -> np.ndarray:
+        """
+        Encode une liste d'ingrédients en bitmask sur le vocabulaire
+        Les ingrédients inconnus du catalogue sont ignorés
+        """
+        ids = (self.vocabulary.get(key) for key in self._keys(ingredient_names))
+        return self._mask_from_ids(i for i in ids if i is not None)
+
+    def missing_vector(self, inventory_mask: np.ndarray) -> np.ndarray:
+        """
+        Nombre d'ingrédients manquants pour chaque cocktail, calculé en une passe vectorisée
+
+        Args:
+            inventory_mask: Bitmask de l'inventaire (voir encode)
+
+        Returns:
+            Tableau int64 aligné sur `cocktails`
+        """
+        return _popcount(self.recipe_masks & ~inventory_mask)
+
+    def encode_many(self, inventories: Iterable[Iterable[str]]) -> np.ndarray:
+        """Encode plusieurs inventaires en une matrice uint64 [inventaires, mots]"""
+        masks = [self.encode(inventory) for inventory in inventories]
+        if not masks:
+            return np.zeros((0, self.word_count), dtype=np.uint64)
+        return np.vstack(masks)
+
+    def _missing_chunks(self, inventory_masks: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Nombre d'ingrédients manquants, par blocs d'inventaires bornant la mémoire du produit
+        inventaires x cocktails x mots
+
+        Yields:
+            (position du premier inventaire du bloc, matrice int64 [inventaires du bloc, cocktails])
+        """
+        rows_per_chunk = max(1, _BATCH_CHUNK_WORDS // max(1, len(self.cocktails) * self.word_count))
+        for start in range(0, inventory_masks.shape[0], rows_per_chunk):
+            lacking = ~inventory_masks[start:start + rows_per_chunk]
+            yield start, _popcount(self.recipe_masks[np.newaxis, :, :] & lacking[:, np.newaxis, :])
+
+    def missing_matrix(self, inventory_masks: np.ndarray) -> np.ndarray:
+        """
+        Nombre d'ingrédients manquants pour chaque couple (inventaire, cocktail)
+
+        Args:
+            inventory_masks: Matrice [inventaires, mots] (voir encode_many)
+
+        Returns:
+            Matrice [inventaires, cocktails] dans le plus petit type entier suffisant (uint8 en pratique)
+        """
+        largest = int(self.recipe_sizes.max()) if len(self.recipe_sizes) else 0
+        missing = np.empty((inventory_masks.shape[0], len(self.cocktails)), dtype=np.min_scalar_type(largest))
+        for start, chunk in self._missing_chunks(inventory_masks):
+            missing[start:start + len(chunk)] = chunk
+        return missing
+
+    def feasibility_many(self, inventory_masks: np.ndarray,
+                         max_missing: int = 2) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Cocktails faisables et presque faisables de chaque inventaire
+        Chaque bloc de la matrice des manquants est réduit à ses listes de positions dès
+        qu'il est calculé: la mémoire ne croît pas en inventaires x catalogue
+
+        Args:
+            inventory_masks: Matrice [inventaires, mots] (voir encode_many)
+            max_missing: Nombre maximal d'ingrédients manquants pour "presque faisable"
+
+        Returns:
+            Pour chaque inventaire, (positions faisables, positions presque faisables)
+        """
+        has_ingredients = self.recipe_sizes > 0
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for _, chunk in self._missing_chunks(inventory_masks):
+            for user_missing in chunk:
+                results.append((
+                    np.flatnonzero((user_missing == 0) & has_ingredients),
+                    np.flatnonzero((user_missing >= 1) & (user_missing <= max_missing)),
+                ))
+        return results
+
+    def cocktails_with_all(self, ingredient_names: Iterable[str]) -> List[Cocktail]:
+        """
+        Cocktails qui contiennent tous les ingrédients donnés
+        Intersection des postings, en commençant par la liste la plus courte
+        """
+        keys = set(self._keys(ingredient_names))
+        if not keys:
+            return list(self.cocktails)
+
+        postings: List[FrozenSet[int]] = []
+        for key in keys:
+            posting = self.postings.get(key)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                return []
+        return [self.cocktails[position] for position in sorted(matches)]
+
+    def missing_counts(self, inventory: Iterable[str], max_missing: Optional[int] = None) -> Dict[int, int]:
+        """
+        Nombre d'ingrédients manquants par cocktail pour un inventaire donné
+        Seuls les cocktails touchés par l'inventaire (et, si max_missing le permet,
+        les cocktails assez courts pour manquer de tout) sont évalués
+
+        Args:
+            inventory: Noms des ingrédients disponibles
+            max_missing: Ignorer les cocktails auxquels il manque plus d'ingrédients
+
+        Returns:
+            Dictionnaire {position du cocktail: nombre d'ingrédients manquants}
+        """
+        return self._missing_counts(set(self._keys(inventory)), max_missing)
+
+    def _missing_counts(self, inventory_keys: Set[str], max_missing: Optional[int]) -> Dict[int, int]:
+        hits: Dict[int, int] = {}
+        for key in inventory_keys:
+            for position in self.postings.get(key, ()):
+                hits[position] = hits.get(position, 0) + 1
+
+        candidates = set(hits)
+        if max_missing is None or max_missing >= 1:
+            candidates |= self._small_cocktails
+
+        counts = {}
+        for position in candidates:
+            missing = len(self.cocktail_ingredients[position]) - hits.get(position, 0)
+            if max_missing is None or missing <= max_missing:
+                counts[position] = missing
+        return counts
+
+    def feasible_cocktails(self, inventory: Iterable[str]) -> List[Cocktail]:
+        """Cocktails réalisables entièrement avec l'inventaire: (recette & ~inventaire) == 0"""
+        missing = self.missing_vector(self.encode(inventory))
+        positions = np.flatnonzero((missing == 0) & (self.recipe_sizes > 0))
+        return [self.cocktails[position] for position in positions]
+
+    def almost_feasible_cocktails(self, inventory: Iterable[str], min_missing: int = 1,
+                                  max_missing: int = 2) -> List[Dict[str, object]]:
+        """Cocktails auxquels il manque entre min_missing et max_missing ingrédients"""
+        inventory_keys = set(self._keys(inventory))
+        missing = self.missing_vector(self.encode(inventory_keys))
+        positions = np.flatnonzero((missing >= max(min_missing, 1)) & (missing <= max_missing))
+
+        return [
+            {
+                "cocktail": self.cocktails[position],
+                "missing": [key for key in self.cocktail_ingredients[position] if key not in inventory_keys],
+            }
+            for position in positions
+        ]
+
+
+class FeasibilityState:
+    """
+    État de faisabilité d'un inventaire, mis à jour de manière incrémentale
+
+    Conserve le nombre d'ingrédients manquants par cocktail ainsi que les ensembles
+    des cocktails faisables et presque faisables. Ajouter ou retirer un ingrédient ne
+    touche que les cocktails de sa liste de postings.
+    """
+
+    def __init__(self, index: IngredientIndex, inventory: Iterable[str], max_almost_missing: int = 2):
+        """
+        Args:
+            index: Index des ingrédients du catalogue
+            inventory: Inventaire initial
+            max_almost_missing: Nombre maximal d'ingrédients manquants suivi pour "presque faisable"
+        """
+        self.index = index
+        self.max_almost_missing = max_almost_missing
+        self.inventory_keys: Set[str] = set(index._keys(inventory))
+        self.missing: List[int] = index.missing_vector(index.encode(self.inventory_keys)).tolist()
+        self.feasible: Set[int] = set()
+        self.almost: Set[int] = set()
+        for position, missing in enumerate(self.missing):
+            self._classify(position, missing)
+
+    def _classify(self, position: int, missing: int):
+        if missing == 0:
+            if self.index.recipe_sizes[position] > 0:
+                self.feasible.add(position)
+        elif missing <= self.max_almost_missing:
+            self.almost.add(position)
+
+    def _shift(self, key: str, delta: int):
+        for position in self.index.postings.get(key, ()):
+            self.feasible.discard(position)
+            self.almost.discard(position)
+            self.missing[position] += delta
+            self._classify(position, self.missing[position])
+
+    def update(self, inventory: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Aligne l'état sur un nouvel inventaire
+
+        Returns:
+            Ingrédients (normalisés) ajoutés et retirés
+        """
+        keys = set(self.index._keys(inventory))
+        added = keys - self.inventory_keys
+        removed = self.inventory_keys - keys
+        for key in added:
+            self._shift(key, -1)
+        for key in removed:
+            self._shift(key, +1)
+        self.inventory_keys = keys
+        return added, removed
+
+    def feasible_cocktails(self) -> List[Cocktail]:
+        """Cocktails réalisables avec l'inventaire courant"""
+        return [self.index.cocktails[position] for position in sorted(self.feasible)]
+
+    def almost_feasible_cocktails(self, min_missing: int = 1, max_missing: int = 2) -> List[Dict[str, object]]:
+        """Cocktails auxquels il manque entre min_missing et max_missing ingrédients"""
+        if max_missing > self.max_almost_missing:
+            return self.index.almost_feasible_cocktails(self.inventory_keys, min_missing, max_missing)
+
+        return [
+            {
+                "cocktail": self.index.cocktails[position],
+                "missing": [key for key in self.index.cocktail_ingredients[position] if key not in self.inventory_keys],
+            }
+            for position in sorted(self.almost)
+            if min_missing <= self.missing[position] <= max_missing
+        ]
@@ -0,0 +1,160 @@
+"""
+Normalisation des lignes d'ingrédients IBA en une seule passe
+Format typique d'une ligne: "* 30 ml gin", "*1/4 barspoon Absinthe", "* Few dashes Angostura bitters"
+
+Les règles de nettoyage historiques (puces, quantités, unités, "splash of", "Two dashes"...)
+sont regroupées dans une unique expression régulière compilée une fois: chaque règle y est
+un groupe optionnel, dans le même ordre que les anciens re.sub successifs, et les groupes
+nommés capturent la quantité et l'unité au passage.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+# Unités reconnues après une quantité numérique ("30 ml", "1/2 barspoon", "9cl")
+_UNITS = (
+    "ml", "cl", "oz", "dash", "dashes", "barspoon", "teaspoon", "teaspoons", "tsp",
+    "tablespoon", "tbsp", "drop", "drops", "splash", "piece", "pieces", "cube", "cubes",
+    "slice", "slices",
+)
+_UNIT_ALTERNATION = "|".join(sorted(_UNITS, key=len, reverse=True))
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "few": None,
+}
+_NUMBER_WORD_ALTERNATION = "|".join(_NUMBER_WORDS)
+
+_CANONICAL_UNITS = {
+    "dashes": "dash",
+    "drops": "drop",
+    "teaspoons": "teaspoon",
+    "tsp": "teaspoon",
+    "tbsp": "tablespoon",
+    "pieces": "piece",
+    "cubes": "cube",
+    "slices": "slice",
+    "bar spoon": "barspoon",
+    "bar spoons": "barspoon",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Mentions marquant un ingrédient facultatif: "(optional)", "if desired", "to taste"
+_OPTIONAL = re.compile(r"\b(?:optional|optionally|if desired|to taste)\b", re.IGNORECASE)
+
+_LINE = re.compile(
+    r"^"
+    # Puce (* ou -)
+    r"(?:[*\-]\s*)?"
+    # Quantité décimale + unité: "30 ml ", "22.5 ml ", "9cl ", "2 of "
+    rf"(?:(?P<amount>\d+\.?\d*)\s*(?P<unit>{_UNIT_ALTERNATION}|of)?\s+)?"
+    # Fraction + unité: "1/4 barspoon "
+    rf"(?:(?P<fraction>\d+/\d+)\s*(?P<fraction_unit>{_UNIT_ALTERNATION})?\s+)?"
+    # Select/Aperol/Campari/Cynar -> Cynar
+    r"(?:Select/)?(?:Aperol/)?(?:Campari/)?"
+    # Valeur parasite présente dans les données DBpedia
+    r"(?P<junk>5\.049216E8$)?"
+    r"(?:(?P<splash>splash of|splash|a splash of)\s+)?"
+    r"(?:(?P<spoon>barspoon of|bar spoon of|barspoon|bar spoon|bar spoons)\s+)?"
+    r"(?:(?:100%|100 %)\s+)?"
+    # "of Worcestershire sauce" -> "Worcestershire sauce"
+    r"(?P<of_worcestershire>of\s+(?=Worcestershire sauce))?"
+    # "6 to 8 mint leaves": la quantité basse est déjà lue, on retire "to 8"
+    r"(?:to\s+[86421]\s+)?"
+    # "Two dashes Peychaud's Bitters", "Few drops of egg white"
+    rf"(?:(?P<dashes_count>{_NUMBER_WORD_ALTERNATION})\s+dashes\s+)?"
+    rf"(?:(?P<dash_count>{_NUMBER_WORD_ALTERNATION})\s+dash\s+)?"
+    rf"(?:(?P<drops_count>{_NUMBER_WORD_ALTERNATION})\s+(?P<drops>drops?)\s+(?:of\s+)?)?"
+    r"(?P<name>.*)$",
+    re.IGNORECASE,
+)
+
+
+class ParsedIngredientLine(NamedTuple):
+    """Ligne d'ingrédient structurée"""
+    name: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    optional: bool = False
+
+
+def _canonical_unit(unit: Optional[str]) -> Optional[str]:
+    if not unit:
+        return None
+    unit = _WHITESPACE.sub(" ", unit.lower())
+    if unit == "of":
+        return None
+    if unit.endswith(" of"):
+        unit = unit[:-3]
+    if unit.startswith("a "):
+        unit = unit[2:]
+    return _CANONICAL_UNITS.get(unit, unit)
+
+
+@lru_cache(maxsize=16384)
+def parse_ingredient_line(raw_line: str) -> Optional[ParsedIngredientLine]:
+    """
+    Parse une ligne d'ingrédient (résultat mémorisé par ligne brute)
+
+    Args:
+        raw_line: Ligne brute, ex: "* 30 ml gin"
+
+    Returns:
+        ParsedIngredientLine, ou None si la ligne ne contient pas d'ingrédient
+    """
+    line = _WHITESPACE.sub(" ", raw_line).strip()
+    if not line:
+        return None
+
+    match = _LINE.match(line)
+    if match.group("junk"):
+        return None
+
+    name = match.group("name")
+    if match.group("of_worcestershire"):
+        name = "Worcestershire sauce" + name[len("Worcestershire sauce"):]
+    if len(name) <= 1:  # Ignorer les lignes vides ou trop courtes
+        return None
+
+    quantity = None
+    if match.group("amount") or match.group("fraction"):
+        # Nombre mixte "1 1/2 oz": partie entière + fraction
+        quantity = float(match.group("amount") or 0)
+        if match.group("fraction"):
+            numerator, denominator = match.group("fraction").split("/")
+            quantity = quantity + float(numerator) / float(denominator) if float(denominator) else None
+    else:
+        count_word = match.group("dashes_count") or match.group("dash_count") or match.group("drops_count")
+        if count_word:
+            quantity = _NUMBER_WORDS[count_word.lower()]
+
+    unit = None
+    for group in ("unit", "fraction_unit", "splash", "spoon"):
+        unit = _canonical_unit(match.group(group))
+        if unit:
+            break
+    if unit is None:
+        if match.group("dashes_count") or match.group("dash_count"):
+            unit = "dash"
+        elif match.group("drops"):
+            unit = "drop"
+
+    return ParsedIngredientLine(name=name, quantity=quantity, unit=unit, optional=bool(_OPTIONAL.search(line)))
+
+
+def parse_ingredient_lines(ingredients_text: str) -> List[ParsedIngredientLine]:
+    """
+    Parse le texte complet des ingrédients d'un cocktail (une ligne par ingrédient)
+
+    Args:
+        ingredients_text: Texte brut, ex: "* 30 ml gin\\n* 30 ml vermouth\\n* splash soda"
+
+    Returns:
+        Liste des lignes structurées (les lignes sans ingrédient sont ignorées)
+    """
+    if not ingredients_text:
+        return []
+    parsed = (parse_ingredient_line(line) for line in ingredients_text.split("\n"))
+    return [line for line in parsed if line is not None]
@@ -0,0 +1,195 @@
+"""
+Quantités structurées des ingrédients, stockées en colonnes NumPy
+Chaque ligne d'ingrédient du catalogue ("30 ml gin", "2 dashes Angostura bitters") devient
+une entrée (nom, quantité, unité, volume en ml, facultatif); les entrées de tous les cocktails
+sont concaténées dans des tableaux contigus et les entrées du cocktail i occupent
+l'intervalle offsets[i]:offsets[i + 1]
+
+Les fonctionnalités dépendant des volumes (mise à l'échelle, degré d'alcool, coût) lisent
+ces tableaux précalculés au lieu de re-parser Cocktail.ingredients à chaque requête
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from backend.data.ingredient_line import parse_ingredient_lines
+from backend.models.cocktail import Cocktail
+
+# Conversion des unités en millilitres (valeurs de bar usuelles pour les unités non métriques)
+UNIT_TO_ML: Dict[str, float] = {
+    "ml": 1.0,
+    "cl": 10.0,
+    "oz": 30.0,
+    "tablespoon": 15.0,
+    "teaspoon": 5.0,
+    "barspoon": 5.0,
+    "splash": 5.0,
+    "dash": 0.9,
+    "drop": 0.05,
+}
+
+# Unités dont la quantité implicite est 1 ("splash of soda water", "bar spoon of sugar")
+_IMPLICIT_SINGLE_UNITS = {"splash", "barspoon"}
+
+# Code 0 réservé à "pas d'unité" (quantité comptée: "1 egg white", ou absente)
+UNITS: Tuple[Optional[str], ...] = (None, "ml", "cl", "oz", "tablespoon", "teaspoon", "barspoon",
+                                    "splash", "dash", "drop", "piece", "cube", "slice")
+_UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+_CODE_TO_ML = np.array([UNIT_TO_ML.get(unit, np.nan) if unit else np.nan for unit in UNITS],
+                       dtype=np.float32)
+
+
+class IngredientQuantity(NamedTuple):
+    """Entrée d'ingrédient structurée d'un cocktail"""
+    name: str
+    amount: Optional[float]
+    unit: Optional[str]
+    amount_ml: Optional[float]
+    optional: bool
+
+
+class IngredientQuantities:
+    """
+    Stockage en colonnes des quantités d'ingrédients du catalogue
+
+    - offsets: int32[n_cocktails + 1], bornes des entrées de chaque cocktail
+    - names: nom de chaque entrée (aligné sur Cocktail.parsed_ingredients)
+    - amounts: float32, quantité telle qu'écrite dans la recette (NaN si absente)
+    - unit_codes: uint8, indice dans UNITS
+    - amounts_ml: float32, quantité convertie en ml (NaN si non convertible)
+    - optional: bool, ingrédient facultatif
+    """
+
+    def __init__(self, cocktails: List[Cocktail]):
+        self.cocktail_ids: List[str] = [c.id for c in cocktails]
+        self.positions: Dict[str, int] = {}
+        for position, cocktail in enumerate(cocktails):
+            self.positions.setdefault(cocktail.id, position)
+
+        offsets = [0]
+        names: List[str] = []
+        amounts: List[float] = []
+        unit_codes: List[int] = []
+        optional: List[bool] = []
+
+        for cocktail in cocktails:
+            lines = parse_ingredient_lines(cocktail.ingredients or "")
+            parsed_names = cocktail.parsed_ingredients or []
+            # parsed_ingredients provient des mêmes lignes: réutiliser les noms normalisés
+            aligned = len(parsed_names) == len(lines)
+            for j, line in enumerate(lines):
+                names.append(parsed_names[j] if aligned else line.name)
+                quantity = line.quantity
+                if quantity is None and line.unit in _IMPLICIT_SINGLE_UNITS:
+                    quantity = 1.0
+                amounts.append(np.nan if quantity is None else quantity)
+                unit_codes.append(_UNIT_CODES.get(line.unit, 0))
+                optional.append(line.optional)
+            offsets.append(len(names))
+
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.names: Tuple[str, ...] = tuple(names)
+        self.amounts = np.asarray(amounts, dtype=np.float32)
+        self.unit_codes = np.asarray(unit_codes, dtype=np.uint8)
+        self.optional = np.asarray(optional, dtype=bool)
+        self.amounts_ml = self.amounts * _CODE_TO_ML[self.unit_codes]
+
+    def __len__(self) -> int:
+        return len(self.cocktail_ids)
+
+    def _bounds(self, cocktail_id: str) -> Optional[slice]:
+        position = self.positions.get(cocktail_id)
+        if position is None:
+            return None
+        return slice(int(self.offsets[position]), int(self.offsets[position + 1]))
+
+    def entries(self, cocktail_id: str) -> List[IngredientQuantity]:
+        """
+        Entrées structurées d'un cocktail
+
+        Args:
+            cocktail_id: Identifiant (slug) du cocktail
+
+        Returns:
+            Liste d'IngredientQuantity (vide si le cocktail est inconnu)
+        """
+        bounds = self._bounds(cocktail_id)
+        if bounds is None:
+            return []
+        entries = []
+        for k in range(bounds.start, bounds.stop):
+            amount = float(self.amounts[k])
+            amount_ml = float(self.amounts_ml[k])
+            entries.append(IngredientQuantity(
+                name=self.names[k],
+                amount=None if np.isnan(amount) else amount,
+                unit=UNITS[self.unit_codes[k]],
+                amount_ml=None if np.isnan(amount_ml) else amount_ml,
+                optional=bool(self.optional[k]),
+            ))
+        return entries
+
+    def volumes_ml(self, cocktail_id: str) -> np.ndarray:
+        """Vue sur les volumes en ml des ingrédients d'un cocktail (NaN si inconnu)"""
+        bounds = self._bounds(cocktail_id)
+        if bounds is None:
+            return np.empty(0, dtype=np.float32)
+        return self.amounts_ml[bounds]
+
+    def scaled_volumes_ml(self, cocktail_id: str, servings: float) -> np.ndarray:
+        """Volumes en ml pour préparer `servings` portions (batch)"""
+        return self.volumes_ml(cocktail_id) * np.float32(servings)
+
+    def _sum_per_cocktail(self, values: np.ndarray) -> np.ndarray:
+        """Somme d'une colonne par cocktail (segments offsets[i]:offsets[i + 1])"""
+        totals = np.zeros(len(self.cocktail_ids), dtype=np.float32)
+        if values.size:
+            owners = np.repeat(np.arange(len(self.cocktail_ids)), np.diff(self.offsets))
+            np.add.at(totals, owners, values)
+        return totals
+
+    def total_volumes_ml(self, include_optional: bool = True) -> np.ndarray:
+        """
+        Volume total connu (ml) de chaque cocktail, dans l'ordre de cocktail_ids
+        Les ingrédients sans volume convertible sont ignorés
+
+        Args:
+            include_optional: Compter les ingrédients facultatifs
+
+        Returns:
+            float32[n_cocktails]
+        """
+        volumes = np.nan_to_num(self.amounts_ml, nan=0.0)
+        if not include_optional:
+            volumes = np.where(self.optional, np.float32(0.0), volumes)
+        return self._sum_per_cocktail(volumes)
+
+    def total_volume_ml(self, cocktail_id: str, include_optional: bool = True) -> float:
+        """Volume total connu (ml) d'un cocktail"""
+        bounds = self._bounds(cocktail_id)
+        if bounds is None:
+            return 0.0
+        volumes = self.amounts_ml[bounds]
+        if not include_optional:
+            volumes = volumes[~self.optional[bounds]]
+        return float(np.nansum(volumes))
+
+    def weighted_totals(self, weights: Dict[str, float], normalize: Optional[Callable[[str], str]] = None) -> np.ndarray:
+        """
+        Somme par cocktail de volume_ml x poids de l'ingrédient
+        Ex: poids = degré d'alcool -> ml d'alcool pur (ABV = résultat / total_volumes_ml()),
+        poids = prix au ml -> coût estimé
+
+        Args:
+            weights: Nom d'ingrédient -> poids par ml (ingrédients absents: poids 0)
+            normalize: Normalisation appliquée aux noms des deux côtés (par défaut str.lower)
+
+        Returns:
+            float32[n_cocktails], dans l'ordre de cocktail_ids
+        """
+        normalize = normalize or str.lower
+        by_name = {normalize(name): weight for name, weight in weights.items()}
+        per_entry = np.fromiter((by_name.get(normalize(name), 0.0) for name in self.names),
+                                dtype=np.float32, count=len(self.names))
+        return self._sum_per_cocktail(np.nan_to_num(self.amounts_ml, nan=0.0) * per_entry)
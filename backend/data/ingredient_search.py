@@ -0,0 +1,222 @@
+"""
+Index de recherche des ingrédients tolérant aux fautes de frappe (autocomplétion)
+Les noms d'ingrédients sont normalisés (minuscules, sans accents) et découpés en mots;
+chaque mot du vocabulaire est indexé par ses suppressions de caractères (algorithme
+"symmetric delete"): un mot saisi avec une faute retrouve ses voisins à distance
+d'édition <= 2 sans parcourir le vocabulaire ("angostrua" -> angostura, "cointrau" -> cointreau)
+
+Des synonymes usuels ("simple syrup", "club soda", "whisky"...) renvoient vers les noms
+canoniques du catalogue
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.data.search_index import fold_text
+from backend.models.ingredient import Ingredient
+
+# Alias saisi par l'utilisateur -> noms canoniques (normalisés) des ingrédients du catalogue
+INGREDIENT_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "simple syrup": ("sugar syrup",),
+    "gomme": ("sugar syrup",),
+    "sirop de sucre": ("sugar syrup",),
+    "club soda": ("soda water",),
+    "sparkling water": ("soda water",),
+    "eau gazeuse": ("soda water",),
+    "kahlua": ("coffee liqueur",),
+    "coffee liqueur": ("kahlua",),
+    "cointreau": ("triple sec",),
+    "triple sec": ("cointreau",),
+    "curacao": ("orange curacao",),
+    "espresso": ("strong espresso",),
+    "whisky": ("irish whiskey", "rye whiskey", "bourbon whiskey"),
+    "scotch": ("irish whiskey", "rye whiskey", "bourbon whiskey"),
+    "rhum": ("white rum", "aged rum", "jamaican rum"),
+    "agave nectar": ("agave syrup",),
+    "dry gin": ("london gin",),
+    "london dry gin": ("london gin",),
+    "sweet red vermouth": ("sweet vermouth",),
+    "citron vert": ("lime juice",),
+    "jus de citron": ("lemon juice",),
+    "menthe": ("mint leaves", "mint sprigs"),
+    "blanc d oeuf": ("egg white",),
+}
+
+# Pénalités ajoutées au coût d'une correspondance selon le terme touché
+_TERM_PENALTY = {"name": 0.0, "alias": 0.1, "synonym": 0.5}
+_PREFIX_COST = 0.25
+_SUBSTRING_COST = 1.5
+# Une requête égale au terme complet passe devant tout le reste
+_EXACT_BONUS = -1.0
+
+
+def _max_distance(word: str, max_distance: int) -> int:
+    """Distance d'édition tolérée selon la longueur du mot (aucune faute sur les mots courts)"""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return min(1, max_distance)
+    return max_distance
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Toutes les variantes du mot obtenues en supprimant jusqu'à `distance` caractères"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distance de Damerau-Levenshtein (transpositions adjacentes comprises)
+    Renvoie limit + 1 dès que la distance dépasse limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class IngredientSearchIndex:
+    """
+    Index flou des ingrédients
+
+    - terms: pour chaque ingrédient, liste de (mots du terme, texte normalisé, type de terme)
+      avec type = "name", "alias" (label, nom alternatif) ou "synonym"
+    - postings: mot -> positions des ingrédients qui le contiennent
+    - deletes: variante par suppression -> mots du vocabulaire
+    """
+
+    def __init__(self, ingredients: List[Ingredient], synonyms: Optional[Dict[str, Iterable[str]]] = None,
+                 max_distance: int = 2):
+        self.ingredients = ingredients
+        self.max_distance = max_distance
+        self.terms: List[List[Tuple[Tuple[str, ...], str, str]]] = []
+        self.postings: Dict[str, Set[int]] = {}
+        self.deletes: Dict[str, Set[str]] = {}
+
+        by_name: Dict[str, List[int]] = {}
+        for position, ingredient in enumerate(ingredients):
+            raw_terms = [(ingredient.name, "name")]
+            raw_terms += [(name, "alias") for name in (ingredient.alternative_names or []) if name]
+            raw_terms += [(label, "alias") for label in (ingredient.labels or {}).values() if label]
+            self.terms.append([])
+            for text, kind in raw_terms:
+                self._add_term(position, fold_text(text), kind)
+            by_name.setdefault(fold_text(ingredient.name), []).append(position)
+
+        synonyms = INGREDIENT_SYNONYMS if synonyms is None else synonyms
+        for alias, canonical_names in synonyms.items():
+            folded_alias = fold_text(alias)
+            for canonical in canonical_names:
+                for position in by_name.get(fold_text(canonical), []):
+                    self._add_term(position, folded_alias, "synonym")
+
+        for word in self.postings:
+            for variant in _deletes(word, _max_distance(word, max_distance)):
+                self.deletes.setdefault(variant, set()).add(word)
+        self._sorted_words = sorted(self.postings)
+
+    def _add_term(self, position: int, folded: str, kind: str):
+        if not folded or any(existing == folded for _, existing, _ in self.terms[position]):
+            return
+        words = tuple(folded.split())
+        self.terms[position].append((words, folded, kind))
+        for word in words:
+            self.postings.setdefault(word, set()).add(position)
+
+    def _match_token(self, token: str, allow_prefix: bool) -> Dict[str, float]:
+        """Mots du vocabulaire correspondant à un mot de la requête -> coût de la correspondance"""
+        matches: Dict[str, float] = {}
+        if token in self.postings:
+            matches[token] = 0.0
+
+        if allow_prefix:
+            start = bisect_left(self._sorted_words, token)
+            for word in self._sorted_words[start:]:
+                if not word.startswith(token):
+                    break
+                matches.setdefault(word, _PREFIX_COST)
+
+        allowed = _max_distance(token, self.max_distance)
+        if allowed:
+            candidates: Set[str] = set()
+            for variant in _deletes(token, allowed):
+                candidates |= self.deletes.get(variant, set())
+            for word in candidates:
+                if word in matches:
+                    continue
+                distance = edit_distance(token, word, allowed)
+                if distance <= allowed:
+                    matches[word] = float(distance)
+
+        if allow_prefix and len(token) >= 3:
+            # Saisie au milieu d'un mot ("berry" -> cranberry): parcours du vocabulaire seul
+            for word in self._sorted_words:
+                if token in word:
+                    matches.setdefault(word, _SUBSTRING_COST)
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Ingredient]:
+        """
+        Recherche classée des ingrédients
+
+        Args:
+            query: Texte saisi (le dernier mot peut être incomplet)
+            limit: Nombre maximal de résultats (None: tous)
+
+        Returns:
+            Ingrédients du plus au moins pertinent (à coût égal, les plus utilisés d'abord)
+        """
+        folded = fold_text(query or "")
+        if not folded or (limit is not None and limit <= 0):
+            return []
+        tokens = folded.split()
+        token_matches = [self._match_token(token, allow_prefix=(i == len(tokens) - 1))
+                         for i, token in enumerate(tokens)]
+
+        candidates: Optional[Set[int]] = None
+        for matches in token_matches:
+            positions: Set[int] = set()
+            for word in matches:
+                positions |= self.postings[word]
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return []
+
+        ranked = []
+        for position in candidates:
+            best = None
+            for words, term, kind in self.terms[position]:
+                cost = 0.0
+                for matches in token_matches:
+                    token_cost = min((matches[word] for word in words if word in matches), default=None)
+                    if token_cost is None:
+                        break
+                    cost += token_cost
+                else:
+                    cost += _TERM_PENALTY[kind] + (_EXACT_BONUS if term == folded else 0.0)
+                    if best is None or cost < best:
+                        best = cost
+            if best is not None:
+                ranked.append((best, position))
+
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.ingredients[position] for _, position in ranked]
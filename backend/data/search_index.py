@@ -0,0 +1,190 @@
+"""
+Index de recherche des cocktails par nom (recherche à la frappe)
+Les noms, labels multilingues et noms alternatifs sont normalisés (minuscules, sans accents)
+puis indexés deux fois:
+    - un trie de préfixes sur chaque mot: "neg" -> Negroni, "ame" -> Americano
+    - un index de trigrammes: sous-chaînes ("groni") et fautes de frappe ("negorni")
+
+Les résultats sont classés: nom exact > début du nom > début d'un mot > sous-chaîne > approché
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from backend.models.cocktail import Cocktail
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Rangs du classement (plus petit = plus pertinent)
+_EXACT, _PREFIX, _WORD_PREFIX, _SUBSTRING, _FUZZY = range(5)
+# Similarité minimale (Jaccard sur les trigrammes) pour une correspondance approchée
+_MIN_FUZZY_SIMILARITY = 0.3
+
+
+def fold_text(text: str) -> str:
+    """Minuscules, accents retirés, ponctuation remplacée par des espaces ("Kahlúa" -> "kahlua")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_marks = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", without_marks).strip()
+
+
+def _trigrams(folded: str) -> Set[str]:
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "docs", "ranked")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Cocktails ayant au moins un mot commençant par ce préfixe
+        self.docs: Set[int] = set()
+        # Mêmes cocktails, classés pour la requête égale à ce préfixe (calculé au premier appel)
+        self.ranked: Optional[List[int]] = None
+
+
+class CocktailSearchIndex:
+    """
+    Trie de préfixes + index de trigrammes sur les noms des cocktails
+
+    - terms: pour chaque cocktail, liste de (texte normalisé, est_un_label)
+    - trigrams: trigramme -> positions des cocktails
+    """
+
+    def __init__(self, cocktails: List[Cocktail]):
+        self.cocktails = cocktails
+        self.terms: List[List[Tuple[str, bool]]] = []
+        self._term_trigrams: List[List[Set[str]]] = []
+        self._root = _TrieNode()
+        self.trigrams: Dict[str, Set[int]] = {}
+
+        for position, cocktail in enumerate(cocktails):
+            raw_terms = [(cocktail.name, False)]
+            raw_terms += [(label, True) for label in (cocktail.labels or {}).values() if label]
+            raw_terms += [(name, True) for name in (cocktail.alternative_names or []) if name]
+
+            terms: List[Tuple[str, bool]] = []
+            seen: Set[str] = set()
+            for text, is_label in raw_terms:
+                folded = fold_text(text)
+                if folded and folded not in seen:
+                    seen.add(folded)
+                    terms.append((folded, is_label))
+            self.terms.append(terms)
+            self._term_trigrams.append([_trigrams(folded) for folded, _ in terms])
+
+            for folded, _ in terms:
+                for word in folded.split():
+                    self._insert_word(word, position)
+                for gram in _trigrams(folded):
+                    self.trigrams.setdefault(gram, set()).add(position)
+
+    def _insert_word(self, word: str, position: int):
+        node = self._root
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            node.docs.add(position)
+
+    def _node(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        node = self._node(prefix)
+        return node.docs if node is not None else set()
+
+    def _ranked_prefix_docs(self, prefix: str) -> List[int]:
+        """
+        Cocktails du préfixe (un seul mot) dans l'ordre du classement de search
+        L'ordre ne dépend que du préfixe: il est calculé une fois par nœud, puis chaque
+        frappe ne lit que les `limit` premiers
+        """
+        node = self._node(prefix)
+        if node is None:
+            return []
+        if node.ranked is None:
+            grams = _trigrams(prefix)
+            keys = [(self._rank(position, prefix, [prefix], grams), position) for position in node.docs]
+            node.ranked = [position for _, position in sorted(keys)]
+        return node.ranked
+
+    def _rank(self, position: int, query: str, tokens: List[str], query_grams: Set[str]) -> Optional[Tuple]:
+        """Clé de tri du cocktail pour la requête, ou None s'il ne correspond pas"""
+        best = None
+        for (folded, is_label), grams in zip(self.terms[position], self._term_trigrams[position]):
+            similarity = 0.0
+            if folded == query:
+                tier = _EXACT
+            elif folded.startswith(query):
+                tier = _PREFIX
+            elif all(any(word.startswith(token) for word in folded.split()) for token in tokens):
+                tier = _WORD_PREFIX
+            elif query in folded:
+                tier = _SUBSTRING
+            else:
+                similarity = len(grams & query_grams) / len(grams | query_grams)
+                if similarity < _MIN_FUZZY_SIMILARITY:
+                    continue
+                tier = _FUZZY
+            key = (tier, -similarity, is_label)
+            if best is None or key < best:
+                best = key
+        if best is None:
+            return None
+        name = self.cocktails[position].name
+        return best + (len(name), name.lower())
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Cocktail]:
+        """
+        Recherche classée des cocktails
+
+        Args:
+            query: Texte saisi (préfixe, sous-chaîne ou nom approché, accents facultatifs)
+            limit: Nombre maximal de résultats (None: tous)
+
+        Returns:
+            Cocktails du plus au moins pertinent
+        """
+        folded = fold_text(query or "")
+        if not folded or (limit is not None and limit <= 0):
+            return []
+        tokens = folded.split()
+
+        # Un seul mot: chaque cocktail du préfixe est mieux classé que toute correspondance par
+        # trigrammes, donc une liste de préfixe assez longue donne directement la réponse
+        if len(tokens) == 1 and limit is not None:
+            ranked_docs = self._ranked_prefix_docs(folded)
+            if len(ranked_docs) >= limit:
+                return [self.cocktails[position] for position in ranked_docs[:limit]]
+
+        # Tous les mots de la requête doivent préfixer un mot du cocktail
+        candidates = set(self._prefix_docs(tokens[0]))
+        for token in tokens[1:]:
+            candidates &= self._prefix_docs(token)
+
+        query_grams = _trigrams(folded)
+        # Les correspondances par préfixe sont toujours mieux classées: les trigrammes ne
+        # servent que s'il reste des places (sous-chaînes et fautes de frappe)
+        if len(folded) >= 3 and (limit is None or len(candidates) < limit):
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self.trigrams.get(gram, ()))
+            needed = max(1, int(len(query_grams) * _MIN_FUZZY_SIMILARITY))
+            candidates.update(position for position, count in shared.items() if count >= needed)
+
+        ranked = []
+        for position in candidates:
+            key = self._rank(position, folded, tokens, query_grams)
+            if key is not None:
+                ranked.append((key, position))
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.cocktails[position] for _, position in ranked]
@@ -0,0 +1,238 @@
+"""
+Snapshot binaire des données IBA déjà parsées
+Évite de re-parser data.ttl (Turtle + requêtes SPARQL + regex) à chaque démarrage de worker
+
+Format du fichier (little-endian):
+    - en-tête fixe: magic, version du format, empreinte SHA-256 du TTL source,
+      taille du bloc de métadonnées, nombre de triples
+    - bloc JSON (UTF-8): table des termes RDF, cocktails et ingrédients sérialisés
+    - table des triples: int32[n, 3] d'indices dans la table des termes
+
+Le fichier est ouvert via mmap: les pages sont partagées entre les workers par le cache de l'OS.
+
+Construction manuelle:
+    python -m backend.data.snapshot [--force]
+"""
+
+import sys
+from pathlib import Path
+
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path.resolve()))
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from rdflib import Graph, Literal, URIRef, BNode
+
+from backend.models.cocktail import Cocktail
+from backend.models.ingredient import Ingredient
+
+SNAPSHOT_MAGIC = b"MTSNAPv1"
+# À incrémenter dès que le parsing des cocktails/ingrédients change de résultat
+# v2: lignes d'ingrédients et unités analysées par ingredient_line
+# v3: quantités en nombres mixtes ("1 1/2 oz")
+SNAPSHOT_VERSION = 3
+
+_HEADER = struct.Struct("<8sI32sQQ")
+_ALIGNMENT = 4
+
+
+def snapshot_path_for(ttl_path: Path) -> Path:
+    """Retourne le chemin du snapshot associé à un fichier TTL (data.ttl -> data.snapshot)"""
+    return Path(ttl_path).with_suffix(".snapshot")
+
+
+def compute_source_digest(ttl_path: Path) -> bytes:
+    """Empreinte SHA-256 du contenu du fichier TTL"""
+    hasher = hashlib.sha256()
+    with open(ttl_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def _encode_term(term) -> List[Any]:
+    if isinstance(term, Literal):
+        return ["l", str(term), term.language, str(term.datatype) if term.datatype else None]
+    if isinstance(term, BNode):
+        return ["b", str(term)]
+    return ["u", str(term)]
+
+
+def _decode_term(entry: List[Any]):
+    kind = entry[0]
+    if kind == "l":
+        return Literal(entry[1], lang=entry[2], datatype=URIRef(entry[3]) if entry[3] else None)
+    if kind == "b":
+        return BNode(entry[1])
+    return URIRef(entry[1])
+
+
+class DataSnapshot:
+    """Contenu d'un snapshot chargé (cocktails, ingrédients et triples mappés en mémoire)"""
+
+    def __init__(self, cocktails: List[Cocktail], ingredients: List[Ingredient],
+                 terms: List[List[Any]], triples: np.ndarray, extra: Dict[str, Any],
+                 mapped: Optional[mmap.mmap] = None):
+        self.cocktails = cocktails
+        self.ingredients = ingredients
+        self.terms = terms
+        self.triples = triples
+        self.extra = extra
+        # Garder une référence sur le mmap tant que le tableau de triples est utilisé
+        self._mapped = mapped
+
+    @property
+    def triple_count(self) -> int:
+        return int(self.triples.shape[0])
+
+    def build_graph(self) -> Graph:
+        """Reconstruit le graph RDFLib à partir de la table des triples"""
+        decoded = [_decode_term(entry) for entry in self.terms]
+        graph = Graph()
+        graph.addN(
+            (decoded[s], decoded[p], decoded[o], graph)
+            for s, p, o in self.triples.tolist()
+        )
+        return graph
+
+
+def write_snapshot(path: Path, source_digest: bytes, graph: Graph,
+                   cocktails: List[Cocktail], ingredients: List[Ingredient],
+                   extra: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Écrit un snapshot de manière atomique (fichier temporaire + rename)
+
+    Args:
+        path: Chemin de destination
+        source_digest: Empreinte SHA-256 du TTL source
+        graph: Graph RDFLib complet
+        cocktails: Cocktails parsés
+        ingredients: Ingrédients dédupliqués
+        extra: Données dérivées supplémentaires (sérialisables en JSON)
+
+    Returns:
+        Chemin du snapshot écrit
+    """
+    path = Path(path)
+    term_ids: Dict[Tuple, int] = {}
+    terms: List[List[Any]] = []
+    triples = np.empty((len(graph), 3), dtype="<i4")
+
+    for row, triple in enumerate(graph):
+        for col, term in enumerate(triple):
+            entry = _encode_term(term)
+            key = tuple(entry)
+            term_id = term_ids.get(key)
+            if term_id is None:
+                term_id = len(terms)
+                term_ids[key] = term_id
+                terms.append(entry)
+            triples[row, col] = term_id
+
+    meta = json.dumps({
+        "terms": terms,
+        # vibe_id est un état runtime (clustering), il ne fait pas partie des données
+        "cocktails": [c.model_dump(exclude={"vibe_id"}) for c in cocktails],
+        "ingredients": [i.model_dump() for i in ingredients],
+        "extra": extra or {},
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, source_digest, len(meta), len(triples))
+    padding = (-(len(header) + len(meta))) % _ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(meta)
+            f.write(b"\0" * padding)
+            f.write(triples.tobytes())
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+    return path
+
+
+def load_snapshot(path: Path, source_digest: bytes) -> Optional[DataSnapshot]:
+    """
+    Charge un snapshot via mmap s'il correspond au TTL source
+
+    Args:
+        path: Chemin du snapshot
+        source_digest: Empreinte SHA-256 attendue du TTL source
+
+    Returns:
+        Le snapshot, ou None s'il est absent, obsolète ou corrompu
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"Snapshot illisible ({path}): {e}")
+        return None
+
+    try:
+        if len(mapped) < _HEADER.size:
+            raise ValueError("en-tête tronqué")
+        magic, version, digest, meta_len, n_triples = _HEADER.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            print(f"Snapshot ignoré: format {magic!r} v{version} (attendu v{SNAPSHOT_VERSION})")
+            mapped.close()
+            return None
+        if digest != source_digest:
+            print("Snapshot ignoré: le fichier TTL a changé")
+            mapped.close()
+            return None
+
+        meta_start = _HEADER.size
+        meta_end = meta_start + meta_len
+        triples_offset = meta_end + (-meta_end) % _ALIGNMENT
+        if triples_offset + n_triples * 3 * 4 > len(mapped):
+            raise ValueError("table des triples tronquée")
+
+        meta = json.loads(mapped[meta_start:meta_end].decode("utf-8"))
+        triples = np.frombuffer(mapped, dtype="<i4", count=n_triples * 3, offset=triples_offset).reshape(n_triples, 3)
+
+        return DataSnapshot(
+            cocktails=[Cocktail.model_validate(c) for c in meta["cocktails"]],
+            ingredients=[Ingredient.model_validate(i) for i in meta["ingredients"]],
+            terms=meta["terms"],
+            triples=triples,
+            extra=meta.get("extra", {}),
+            mapped=mapped,
+        )
+    except Exception as e:
+        print(f"Snapshot corrompu ({path}): {e}")
+        try:
+            mapped.close()
+        except BufferError:
+            # Un tableau numpy référence encore le mmap, il sera libéré avec lui
+            pass
+        return None
+
+
+if __name__ == "__main__":
+    from backend.data.ttl_parser import IBADataParser
+
+    force = "--force" in sys.argv[1:]
+    parser = IBADataParser()
+    if parser.loaded_from_snapshot and not force:
+        print("Snapshot déjà à jour")
+    else:
+        written = parser.save_snapshot(from_source=force)
+        print(f"Snapshot écrit: {written}")
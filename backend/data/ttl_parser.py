@@ -15,9 +15,23 @@ from rdflib.namespace import RDF, RDFS
 from typing import List, Dict, Any, Optional, Set
 import os
 import re
+import threading
 
 from backend.models.cocktail import Cocktail
 from backend.models.ingredient import Ingredient
+from backend.data.cocktail_lookup import CocktailLookup
+from backend.data.cocktail_similarity import CocktailSimilarityTable
+from backend.data.ingredient_index import IngredientIndex
+from backend.data.ingredient_line import ParsedIngredientLine, parse_ingredient_lines
+from backend.data.ingredient_quantities import IngredientQuantities
+from backend.data.ingredient_search import IngredientSearchIndex
+from backend.data.search_index import CocktailSearchIndex
+from backend.data.snapshot import (
+    compute_source_digest,
+    load_snapshot,
+    snapshot_path_for,
+    write_snapshot,
+)
 
 # Définition des namespaces DBpedia
 DBR = Namespace("http://dbpedia.org/resource/")
@@ -53,13 +67,46 @@ class IBADataParser:
             return
             
         print(f"Initializing IBADataParser (singleton) with ttl_file_path: '{ttl_file_path}'")
-        self.graph = Graph()
+        self._graph: Optional[Graph] = None
+        self._graph_lock = threading.Lock()
+        self._snapshot = None            # Snapshot binaire chargé (graph reconstruit à la demande)
+        self._source_digest = None       # Empreinte SHA-256 du fichier TTL
+        self.loaded_from_snapshot = False
         self.ttl_file_path = ttl_file_path
         self._ingredients_cache = None  # Cache pour les ingrédients dédupliqués
         self._cocktails_cache = None     # Cache pour les cocktails
+        self._ingredient_index = None    # Index inversé ingrédient -> cocktails
+        self._ingredient_quantities = None  # Quantités structurées (colonnes NumPy)
+        self._cocktail_lookup = None     # Tables id/URI/nom -> cocktail
+        self._search_index = None        # Trie + trigrammes pour la recherche par nom
+        self._ingredient_search_index = None  # Recherche floue des ingrédients
+        self._similarity_table = None    # k plus proches voisins par ingrédients communs
+        self._index_lock = threading.Lock()
         self._load_data()
         self._initialized = True
-        print(f"IBADataParser initialized with {len(self.graph)} triples")
+        print(f"IBADataParser initialized with {self.triple_count} triples")
+
+    @property
+    def graph(self) -> Graph:
+        """
+        Graph RDFLib des données
+        Reconstruit à la demande depuis le snapshot (seul SPARQL en a besoin)
+        """
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    import time
+                    start_time = time.time()
+                    self._graph = self._snapshot.build_graph()
+                    print(f"Graph rebuilt from snapshot ({len(self._graph)} triples) in {time.time() - start_time:.3f}s")
+        return self._graph
+
+    @property
+    def triple_count(self) -> int:
+        """Nombre de triples sans forcer la reconstruction du graph"""
+        if self._graph is None and self._snapshot is not None:
+            return self._snapshot.triple_count
+        return len(self.graph)
     
     @staticmethod
     def generate_slug(name: str) -> str:
@@ -70,25 +117,98 @@ class IBADataParser:
         slug = slug.strip('-')
         return slug
     
+    @property
+    def ttl_path(self) -> Path:
+        """Chemin absolu du fichier TTL"""
+        # Utiliser un chemin absolu basé sur la racine du projet
+        project_root = Path(__file__).parent.parent.parent  # Remonte de data/ vers backend/ vers racine
+        return project_root / "backend" / "data" / self.ttl_file_path
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Chemin du snapshot binaire associé au fichier TTL"""
+        return snapshot_path_for(self.ttl_path)
+
     def _load_data(self):
+        """
+        Charge les données: depuis le snapshot binaire si son empreinte correspond au TTL,
+        sinon en parsant le fichier TTL dans le graph RDFLib
+        """
+        import time
+        file_path = self.ttl_path
+
+        try:
+            self._source_digest = compute_source_digest(file_path)
+        except FileNotFoundError:
+            print(f"File not found: {file_path}")
+            raise
+
+        start_time = time.time()
+        snapshot = load_snapshot(self.snapshot_path, self._source_digest)
+        if snapshot is not None:
+            self._snapshot = snapshot
+            self._cocktails_cache = snapshot.cocktails
+            self._ingredients_cache = snapshot.ingredients
+            self.loaded_from_snapshot = True
+            load_time = time.time() - start_time
+            print(f"Loaded snapshot {self.snapshot_path.name} ({snapshot.triple_count} triples, "
+                  f"{len(snapshot.cocktails)} cocktails) in {load_time * 1000:.1f}ms")
+            return
+
+        self._parse_turtle()
+
+    def _parse_turtle(self):
         """Charge le fichier TTL dans le graph RDFLib"""
         import time
-        # Utiliser un chemin absolu basé sur la racine du projet
-        project_root = Path(__file__).parent.parent.parent  # Remonte de data/ vers backend/ vers racine
-        file_path = project_root / "backend" / "data" / self.ttl_file_path
-        
+        file_path = self.ttl_path
+        graph = Graph()
+
         try:
             print(f"Loading TTL file: {file_path}...")
             start_time = time.time()
-            self.graph.parse(str(file_path), format="turtle", encoding="utf-8")
+            graph.parse(str(file_path), format="turtle", encoding="utf-8")
             load_time = time.time() - start_time
-            print(f"Loaded {len(self.graph)} triples in {load_time:.3f}s")
+            print(f"Loaded {len(graph)} triples in {load_time:.3f}s")
         except FileNotFoundError:
             print(f"File not found: {file_path}")
             raise
         except Exception as e:
             print(f"Error loading file: {e}")
             raise
+
+        self._graph = graph
+        self._snapshot = None
+        self.loaded_from_snapshot = False
+
+    def save_snapshot(self, from_source: bool = False) -> Path:
+        """
+        Écrit le snapshot binaire des données parsées (cocktails, ingrédients, triples)
+
+        Args:
+            from_source: Re-parser le fichier TTL au lieu de réutiliser les données chargées
+
+        Returns:
+            Chemin du snapshot écrit
+        """
+        if from_source:
+            self._source_digest = compute_source_digest(self.ttl_path)
+            self._cocktails_cache = None
+            self._ingredients_cache = None
+            self._ingredient_index = None
+            self._ingredient_quantities = None
+            self._cocktail_lookup = None
+            self._search_index = None
+            self._ingredient_search_index = None
+            self._similarity_table = None
+            self._parse_turtle()
+
+        return write_snapshot(
+            self.snapshot_path,
+            self._source_digest,
+            self.graph,
+            self.get_all_cocktails(),
+            self.get_all_ingredients(),
+        )
     
     def _parse_ingredients_text(self, ingredients_text: str) -> List[str]:
         """
@@ -101,68 +221,19 @@ class IBADataParser:
         Returns:
             Liste des noms d'ingrédients normalisés
         """
-        if not ingredients_text:
-            return []
-        
-        ingredients = []
-        
-        # Séparer par lignes
-        lines = ingredients_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Enlever les bullets (* ou -)
-            line = re.sub(r'^[\*\-]\s*', '', line)
+        return [line.name for line in parse_ingredient_lines(ingredients_text)]
 
-            # Enlever les quantités (nombres + unités)
-            # Ex: "30 ml gin" -> "gin", "1 dash bitters" -> "bitters"
-            line = re.sub(r'^\d+\.?\d*\s*(ml|cl|oz|dash|dashes|barspoon|teaspoon|tsp|tablespoon|tbsp|drop|drops|splash|piece|pieces|cube|cubes|slice|slices|splash|teaspoons|of)?\s+', '', line, flags=re.IGNORECASE)
-            
-            # Nettoyer les espaces multiples    
-            line = re.sub(r'\s+', ' ', line).strip()
-
-            
-            #Cas particulier, 1/4 barspoon Absinthe supprimer le 1/4
-            line = re.sub(r'^\d+\/\d+\s*(ml|cl|oz|dash|dashes|barspoon|teaspoon|tsp|tablespoon|tbsp|drop|drops|splash|piece|pieces|cube|cubes|slice|slices)?\s+', '', line, flags=re.IGNORECASE)
-
-            #Les cas rares Select/Aperol/Campari/Cynar garder que Cynar
-            line = re.sub(r'^(Select)\/', '', line, flags=re.IGNORECASE)
-            line = re.sub(r'^(Aperol)\/', '', line, flags=re.IGNORECASE)
-            line = re.sub(r'^(Campari)\/', '', line, flags=re.IGNORECASE)
-
-            #5.049216E8 supprimer cette ligne si elle est présente
-            line = re.sub(r'^5\.049216E8$', '', line, flags=re.IGNORECASE)
-
-            #Supprimer les splash
-            line = re.sub(r'^(splash of|splash|a splash of)\s+', '', line, flags=re.IGNORECASE)
-
-
-            #supprimer les barspoon of bar spoon
-            line = re.sub(r'^(barspoon of|bar spoon of|barspoon|bar spoon|bar spoons)\s+', '', line, flags=re.IGNORECASE)
-            
-            #supprimer les lignes qui commencent par 100%
-            line = re.sub(r'^(100%|100 %)\s+', '', line, flags=re.IGNORECASE)
-            
-            #Remplacer of Worcestershire sauce par Worcestershire sauce
-            line = re.sub(r'^(of)\s+Worcestershire sauce', 'Worcestershire sauce', line, flags=re.IGNORECASE)
-           
-            #to 8 mint leaves -> mint leaves
-            line = re.sub(r'^(to\s+8|to\s+6|to\s+4|to\s+2|to\s+1)\s+', '', line, flags=re.IGNORECASE)
-            
-            #Two dashes Peychaud's Bitters -> Peychaud's Bitters and Few dashes Angostura bitters -> Angostura bitters
-            line = re.sub(r'^(two|few|one|three|four|five|six|seven|eight|nine|ten)\s+dashes\s+', '', line, flags=re.IGNORECASE)
-            line = re.sub(r'^(two|few|one|three|four|five|six|seven|eight|nine|ten)\s+dash\s+', '', line, flags=re.IGNORECASE)
+    def _parse_ingredient_lines(self, ingredients_text: str) -> List[ParsedIngredientLine]:
+        """
+        Parse le texte des ingrédients en lignes structurées (nom, quantité, unité)
 
-            #Few drops of egg white -> egg white
-            line = re.sub(r'^(few|one|two|three|four|five|six|seven|eight|nine|ten)\s+drops?\s+(of\s+)?', '', line, flags=re.IGNORECASE)
+        Args:
+            ingredients_text: Texte brut contenant les ingrédients
 
-            if line and len(line) > 1:  # Ignorer les lignes vides ou trop courtes
-                ingredients.append(line)
-        
-        return ingredients
+        Returns:
+            Liste de ParsedIngredientLine
+        """
+        return parse_ingredient_lines(ingredients_text)
     
     def _normalize_ingredient_name(self, name: str) -> str:
         """
@@ -468,6 +539,74 @@ class IBADataParser:
         self._ingredients_cache = ingredient_list
         return ingredient_list
     
+    def get_ingredient_index(self) -> IngredientIndex:
+        """
+        Retourne l'index inversé ingrédient -> cocktails (construit une seule fois)
+        
+        Returns:
+            Instance IngredientIndex sur le catalogue des cocktails
+        """
+        if self._ingredient_index is None:
+            cocktails = self.get_all_cocktails()
+            with self._index_lock:
+                if self._ingredient_index is None:
+                    self._ingredient_index = IngredientIndex(cocktails, self._normalize_ingredient_name)
+        return self._ingredient_index
+
+    def get_cocktail_lookup(self) -> CocktailLookup:
+        """
+        Retourne les tables de correspondance id/URI/nom -> cocktail (construites une seule fois)
+        
+        Returns:
+            Instance CocktailLookup sur get_all_cocktails()
+        """
+        if self._cocktail_lookup is None:
+            cocktails = self.get_all_cocktails()
+            with self._index_lock:
+                if self._cocktail_lookup is None:
+                    self._cocktail_lookup = CocktailLookup(cocktails, slugify=self.generate_slug)
+        return self._cocktail_lookup
+
+    def get_cocktail_by_id(self, cocktail_id: str) -> Optional[Cocktail]:
+        """
+        Retourne un cocktail par son slug
+        
+        Args:
+            cocktail_id: Identifiant du cocktail (ex: "americano")
+        
+        Returns:
+            Instance Cocktail ou None
+        """
+        return self.get_cocktail_lookup().get_by_id(cocktail_id)
+
+    def get_similarity_table(self) -> CocktailSimilarityTable:
+        """
+        Retourne la table des voisins par ingrédients communs (Jaccard, calculée une seule fois)
+        
+        Returns:
+            Instance CocktailSimilarityTable sur get_all_cocktails()
+        """
+        if self._similarity_table is None:
+            cocktails = self.get_all_cocktails()
+            with self._index_lock:
+                if self._similarity_table is None:
+                    self._similarity_table = CocktailSimilarityTable(cocktails)
+        return self._similarity_table
+
+    def get_ingredient_quantities(self) -> IngredientQuantities:
+        """
+        Retourne les quantités structurées des ingrédients (construites une seule fois)
+        
+        Returns:
+            Instance IngredientQuantities alignée sur get_all_cocktails()
+        """
+        if self._ingredient_quantities is None:
+            cocktails = self.get_all_cocktails()
+            with self._index_lock:
+                if self._ingredient_quantities is None:
+                    self._ingredient_quantities = IngredientQuantities(cocktails)
+        return self._ingredient_quantities
+    
     def get_cocktails_by_ingredients(self, ingredient_names: List[str]) -> List[Cocktail]:
         """
         Trouve les cocktails qui contiennent tous les ingrédients donnés
@@ -478,37 +617,48 @@ class IBADataParser:
         Returns:
             Liste d'instances Cocktail correspondantes
         """
-        # Normaliser les noms d'ingrédients recherchés
-        search_ingredients = set(self._normalize_ingredient_name(ing) for ing in ingredient_names)
-        
-        matching_cocktails = []
+        return self.get_ingredient_index().cocktails_with_all(ingredient_names)
+    
+    def get_search_index(self) -> CocktailSearchIndex:
+        """
+        Retourne l'index de recherche par nom/label (construit une seule fois)
         
-        for cocktail in self.get_all_cocktails():
-            cocktail_ingredients = set(cocktail.parsed_ingredients or [])
-            
-            # Vérifier si tous les ingrédients recherchés sont présents
-            if search_ingredients.issubset(cocktail_ingredients):
-                matching_cocktails.append(cocktail)
+        Returns:
+            Instance CocktailSearchIndex sur get_all_cocktails()
+        """
+        if self._search_index is None:
+            cocktails = self.get_all_cocktails()
+            with self._index_lock:
+                if self._search_index is None:
+                    self._search_index = CocktailSearchIndex(cocktails)
+        return self._search_index
+
+    def get_ingredient_search_index(self) -> IngredientSearchIndex:
+        """
+        Retourne l'index de recherche floue des ingrédients (construit une seule fois)
         
-        return matching_cocktails
-    
-    def search_cocktails(self, query_text: str) -> List[Cocktail]:
+        Returns:
+            Instance IngredientSearchIndex sur get_all_ingredients()
+        """
+        if self._ingredient_search_index is None:
+            ingredients = self.get_all_ingredients()
+            with self._index_lock:
+                if self._ingredient_search_index is None:
+                    self._ingredient_search_index = IngredientSearchIndex(ingredients)
+        return self._ingredient_search_index
+
+    def search_cocktails(self, query_text: str, limit: Optional[int] = None) -> List[Cocktail]:
         """
-        Recherche des cocktails par nom
+        Recherche des cocktails par nom, label multilingue ou nom alternatif
         
         Args:
-            query_text: Texte à rechercher dans les noms
+            query_text: Texte à rechercher (préfixe, sous-chaîne ou nom approché)
+            limit: Nombre maximal de résultats (None: tous)
         
         Returns:
-            Liste d'instances Cocktail correspondantes
+            Liste d'instances Cocktail, de la plus à la moins pertinente
         """
-        all_cocktails = self.get_all_cocktails()
-        query_lower = query_text.lower()
-        
-        return [
-            c for c in all_cocktails
-            if query_lower in c.name.lower()
-        ]
+        return self.get_search_index().search(query_text, limit=limit)
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -525,12 +675,13 @@ class IBADataParser:
         avg_ingredients = total_ingredients / len(cocktails) if cocktails else 0
         
         return {
-            "total_triples": len(self.graph),
+            "total_triples": self.triple_count,
             "total_cocktails": len(cocktails),
             "total_unique_ingredients": len(ingredients),
             "avg_ingredients_per_cocktail": round(avg_ingredients, 2),
             "most_used_ingredient": ingredients[0].name if ingredients else None,
-            "most_used_ingredient_count": len(ingredients[0].related_concepts) if ingredients else 0
+            "most_used_ingredient_count": len(ingredients[0].related_concepts) if ingredients else 0,
+            "cocktail_id_collisions": len(self.get_cocktail_lookup().collisions)
         }
     
     def execute_sparql(self, sparql_query: str) -> List[Dict[str, Any]]:
@@ -579,14 +730,38 @@ def get_all_ingredients() -> List[Ingredient]:
     """Retourne tous les ingrédients"""
     return get_parser().get_all_ingredients()
 
-def search_cocktails(query: str) -> List[Cocktail]:
+def search_cocktails(query: str, limit: Optional[int] = None) -> List[Cocktail]:
     """Recherche des cocktails"""
-    return get_parser().search_cocktails(query)
+    return get_parser().search_cocktails(query, limit=limit)
 
 def get_cocktails_by_ingredients(ingredients: List[str]) -> List[Cocktail]:
     """Trouve les cocktails par ingrédients"""
     return get_parser().get_cocktails_by_ingredients(ingredients)
 
+def get_ingredient_index() -> IngredientIndex:
+    """Retourne l'index inversé des ingrédients"""
+    return get_parser().get_ingredient_index()
+
+def get_cocktail_lookup() -> CocktailLookup:
+    """Retourne les tables de correspondance des cocktails"""
+    return get_parser().get_cocktail_lookup()
+
+def get_cocktail_by_id(cocktail_id: str) -> Optional[Cocktail]:
+    """Retourne un cocktail par son slug"""
+    return get_parser().get_cocktail_by_id(cocktail_id)
+
+def get_similarity_table() -> CocktailSimilarityTable:
+    """Retourne la table des cocktails similaires par ingrédients"""
+    return get_parser().get_similarity_table()
+
+def get_ingredient_quantities() -> IngredientQuantities:
+    """Retourne les quantités structurées des ingrédients"""
+    return get_parser().get_ingredient_quantities()
+
+def get_ingredient_search_index() -> IngredientSearchIndex:
+    """Retourne l'index de recherche floue des ingrédients"""
+    return get_parser().get_ingredient_search_index()
+
 def get_stats() -> Dict[str, Any]:
     """Retourne les statistiques"""
     return get_parser().get_stats()
@@ -1,45 +1,112 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes.cocktails import router as cocktails
+from backend.routes.cocktails import router as cocktails, similarity_service
 from backend.routes.ingredients import router as ingredients
 from backend.routes.planner import router as planner
 from backend.routes.llm import router as llm
 from backend.routes.graphs import router as graphs
 from backend.utils.front_server import mount_frontend
 from backend.utils.graph_loader import get_shared_graph
-from backend.data.ttl_parser import get_all_cocktails, get_all_ingredients
+from backend.data.ttl_parser import get_all_cocktails, get_all_ingredients, get_parser
+from backend.services.inventory_store import get_inventory_store
+from backend.services.vibe_clustering import WARM_N_CLUSTERS
 from rdflib import Graph
 from pathlib import Path
 from contextlib import asynccontextmanager
+import os
+import threading
 import time
 
+def _print_startup_report(timings):
+    width = max(len(name) for name in timings)
+    print("Startup timings:")
+    for name, seconds in timings.items():
+        print(f"   {name:<{width}}  {seconds:7.3f}s")
+
+
+def _warm_up_clusters():
+    for n_clusters in WARM_N_CLUSTERS:
+        similarity_service.schedule_clusters(n_clusters)
+
+
+def _warm_up_similarity(sweep):
+    similarity_service.warm_up()
+    _warm_up_clusters()
+    if sweep:
+        similarity_service.schedule_cluster_sweep()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("\nMarmiTonic API Starting...")
     start_time = time.time()
+    timings = {}
+    # The shutdown below closes the query encoder: a restarted app (reload, reused TestClient) needs a new one
+    similarity_service.open_encoder()
     
     print("Loading RDF graph...")
+    step = time.time()
     RDF_GRAPH = get_shared_graph()
+    timings["rdf_graph"] = time.time() - step
     
     print("Pre-warming data caches...")
     
     cache_start = time.time()
     cocktails = get_all_cocktails()
     print(f"   Loaded {len(cocktails)} cocktails")
+    timings["cocktails"] = time.time() - cache_start
     
+    step = time.time()
     ingredients = get_all_ingredients()
     print(f"   Loaded {len(ingredients)} ingredients")
+    timings["ingredients"] = time.time() - step
     
     cache_time = time.time() - cache_start
+
+    parser = get_parser()
+    if not parser.loaded_from_snapshot:
+        # Next cold start (or the next worker) loads the binary snapshot instead of the TTL
+        step = time.time()
+        try:
+            snapshot_path = parser.save_snapshot()
+            print(f"   Data snapshot written to {snapshot_path.name}")
+        except Exception as e:
+            print(f"   Could not write data snapshot: {e}")
+        timings["snapshot"] = time.time() - step
+
+    # The embedding model and FAISS index load lazily on the first semantic request;
+    # MARMITONIC_SIMILARITY_WARMUP=background (default) loads them right after startup
+    # without delaying it, "blocking" waits for them, "off" leaves them to the first request
+    # Once warm, the default vibe clusters are computed (or loaded) in the background;
+    # MARMITONIC_CLUSTER_SWEEP=on also precomputes every other n_clusters (one worker at a
+    # time trains each of them, the others load the saved result)
+    warmup = os.getenv("MARMITONIC_SIMILARITY_WARMUP", "background").lower()
+    sweep = os.getenv("MARMITONIC_CLUSTER_SWEEP", "off").lower() == "on"
+    if warmup == "blocking":
+        step = time.time()
+        similarity_service.warm_up()
+        timings["similarity"] = time.time() - step
+        _warm_up_clusters()
+        if sweep:
+            similarity_service.schedule_cluster_sweep()
+    elif warmup == "background":
+        threading.Thread(target=_warm_up_similarity, args=(sweep,), name="similarity-warmup", daemon=True).start()
+        print("   Similarity model and index warming up in the background")
+
     total_time = time.time() - start_time
     
     print(f"Cache pre-warmed in {cache_time:.3f}s")
+    _print_startup_report(timings)
     print(f"Server ready in {total_time:.3f}s\n")
     
     yield
     
     # Shutdown
     print("\nMarmiTonic API Shutting down...")
+    get_inventory_store().flush()
+    similarity_service.encoder.close(timeout=5)
+    if similarity_service.query_cache.save():
+        print(f"   Query embedding cache saved ({len(similarity_service.query_cache)} queries)")
 
 app = FastAPI(lifespan=lifespan)
 
@@ -1,9 +1,14 @@
+import asyncio
+from collections import Counter
 from fastapi import APIRouter, HTTPException, Query, Response
-from typing import List
+from pydantic import BaseModel
+from typing import List, Optional
 from ..services.cocktail_service import CocktailService
 from ..services.similarity_service import SimilarityService
+from ..services.vibe_clustering import N_CLUSTERS_RANGE, WARM_N_CLUSTERS
 
 router = APIRouter()
+# Cheap to construct: the embedding model and the index are loaded on first use
 similarity_service = SimilarityService()
 cocktail_service = CocktailService()
 
@@ -11,11 +16,20 @@ cocktail_service = CocktailService()
 def get_cocktail_service():
     return cocktail_service
 
+class UserInventory(BaseModel):
+    user_id: str
+    # Omitted: use the inventory stored for this user
+    ingredients: Optional[List[str]] = None
+
+class BatchFeasibilityRequest(BaseModel):
+    inventories: List[UserInventory]
+    max_missing: int = 2
+
 @router.get("/")
-async def get_cocktails(q: str = None):
+async def get_cocktails(q: str = None, limit: int = Query(20, ge=1, le=100)):
     try:
         if q:
-            return get_cocktail_service().search_cocktails(q)
+            return get_cocktail_service().search_cocktails(q, limit=limit)
         else:
             return get_cocktail_service().get_all_cocktails()
     except Exception as e:
@@ -28,6 +42,24 @@ async def get_feasible_cocktails(user_id: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid user_id or query failure: {str(e)}")
 
+@router.post("/feasible/batch")
+async def get_feasible_cocktails_batch(request: BatchFeasibilityRequest):
+    """Feasible and almost-feasible cocktail ids for many users in one call"""
+    counts = Counter(inv.user_id for inv in request.inventories)
+    duplicates = sorted(user_id for user_id, count in counts.items() if count > 1)
+    if duplicates:
+        # Results are keyed by user: a repeated user_id would silently lose rows
+        raise HTTPException(status_code=422, detail=f"Duplicate user_id in batch: {', '.join(duplicates)}")
+    try:
+        inventories = {inv.user_id: inv.ingredients for inv in request.inventories}
+        # One users x cocktails computation per call: keep it off the event loop
+        results = await asyncio.to_thread(
+            get_cocktail_service().get_feasible_cocktails_batch, inventories, max_missing=request.max_missing
+        )
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Batch feasibility failure: {str(e)}")
+
 @router.get("/almost-feasible/{user_id}")
 async def get_almost_feasible_cocktails(user_id: str):
     try:
@@ -46,7 +78,7 @@ async def get_cocktails_by_ingredients(ingredients: List[str] = Query(..., descr
 @router.get("/similar/{cocktail_id}")
 async def get_similar_cocktails(cocktail_id: str, limit: int = Query(5, ge=1, le=20)):
     try:
-        results = similarity_service.find_similar_cocktails(cocktail_id, top_k=limit)
+        results = await asyncio.to_thread(similarity_service.find_similar_cocktails, cocktail_id, top_k=limit)
         return {"cocktail_id": cocktail_id, "similar_cocktails": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding similar cocktails: {str(e)}")
@@ -54,15 +86,26 @@ async def get_similar_cocktails(cocktail_id: str, limit: int = Query(5, ge=1, le
 @router.get("/search-semantic")
 async def search_cocktails_semantic(query: str = Query(...), top_k: int = Query(5, ge=1, le=20)):
     try:
-        results = similarity_service.find_similar_by_text(query, top_k=top_k)
+        results = await similarity_service.find_similar_by_text_async(query, top_k=top_k)
         return {"query": query, "results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in semantic search: {str(e)}")
 
+@router.get("/search-semantic/stats")
+async def get_semantic_search_stats():
+    """Hit/miss counters of the query embedding, title and cluster caches, batching counters of the encoder and load timings"""
+    return {
+        "cache": similarity_service.query_cache.stats(),
+        "title_cache": similarity_service.title_cache.stats(),
+        "clusters_cache": similarity_service.clusters_cache.stats(),
+        "encoder": similarity_service.encoder.stats(),
+        "timings": similarity_service.timings,
+    }
+
 @router.get("/similar-by-ingredients")
 async def get_similar_by_ingredients(ingredients: List[str] = Query(...), top_k: int = Query(5, ge=1, le=20)):
     try:
-        results = similarity_service.find_similar_by_ingredients(ingredients, top_k=top_k)
+        results = await similarity_service.find_similar_by_ingredients_async(ingredients, top_k=top_k)
         return {"ingredients": ingredients, "similar_cocktails": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding similar cocktails: {str(e)}")
@@ -70,7 +113,11 @@ async def get_similar_by_ingredients(ingredients: List[str] = Query(...), top_k:
 @router.post("/build-index")
 async def build_similarity_index(force_rebuild: bool = False, response: Response = None):
     try:
-        similarity_service.build_index(force_rebuild=force_rebuild)
+        # Encoding the catalog and building the index block for seconds: keep them off the event loop
+        await asyncio.to_thread(similarity_service.build_index, force_rebuild=force_rebuild)
+        # The home page clusters are computed right after, in the background
+        for n_clusters in WARM_N_CLUSTERS:
+            similarity_service.schedule_clusters(n_clusters)
         return {"status": "success", "message": f"Index built with {len(similarity_service.cocktails)} cocktails"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error building index: {str(e)}")
@@ -78,7 +125,8 @@ async def build_similarity_index(force_rebuild: bool = False, response: Response
 @router.post("/create-clusters")
 async def create_cocktail_clusters(n_clusters: int = Query(6, ge=2, le=20)):
     try:
-        clusters = similarity_service.create_cocktails_clusters(n_clusters=n_clusters)
+        # k-means and the title requests run on a worker thread, off the event loop
+        clusters = await asyncio.to_thread(similarity_service.create_cocktails_clusters, n_clusters=n_clusters)
         # Convert dict to list for easier serialization
         clusters_list = [cluster.dict() for cluster in clusters.values()]
         return {"status": "success", "n_clusters": n_clusters, "clusters": clusters_list}
@@ -98,19 +146,23 @@ async def get_random_cocktail():
         raise HTTPException(status_code=500, detail=f"Error getting random cocktail: {str(e)}")
 
 @router.get("/clusters")
-async def get_cocktail_clusters(n_clusters: int = Query(6, ge=2, le=20), with_cocktails: bool = Query(True)):
+async def get_cocktail_clusters(response: Response, n_clusters: int = Query(6, ge=2, le=20),
+                                with_cocktails: bool = Query(True)):
     """Get vibe clusters with full cocktail details"""
     try:
-        # Generate clusters
-        clusters = similarity_service.create_cocktails_clusters(n_clusters=n_clusters)
+        # Saved clusters only: k-means runs in the background, never on this request
+        clusters = similarity_service.get_clusters(n_clusters=n_clusters)
+        if clusters is None:
+            response.status_code = 202
+            response.headers["Retry-After"] = "2"
+            return {"status": "computing", "clusters": []}
         
         if not with_cocktails:
             # Just return cluster metadata
             return {"clusters": [cluster.dict() for cluster in clusters.values()]}
         
         # Enrich with full cocktail details
-        all_cocktails = get_cocktail_service().get_all_cocktails()
-        cocktails_dict = {c.id: c for c in all_cocktails}
+        cocktails_dict = get_cocktail_service().get_cocktail_lookup().by_id
         
         enriched_clusters = []
         for cluster in clusters.values():
@@ -128,6 +180,24 @@ async def get_cocktail_clusters(n_clusters: int = Query(6, ge=2, le=20), with_co
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting clusters: {str(e)}")
 
+@router.get("/clusters/scores")
+async def get_cluster_scores():
+    """Silhouette score of each precomputed n_clusters and the recommended one"""
+    try:
+        scores = similarity_service.cluster_scores()
+        # Only reports what is there: the sweep runs from the lifespan (MARMITONIC_CLUSTER_SWEEP=on) or the CLI
+        if len(scores) >= len(N_CLUSTERS_RANGE):
+            status = "complete"
+        else:
+            status = "computing" if similarity_service.sweep_running else "partial"
+        return {
+            "scores": scores,
+            "recommended_n_clusters": similarity_service.recommended_n_clusters(),
+            "status": status,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting cluster scores: {str(e)}")
+
 @router.get("/same-vibe/{cocktail_id}")
 async def get_same_vibe_cocktails(cocktail_id: str, limit: int = Query(10, ge=1, le=50)):
     """Get cocktails in the same graph community/cluster as the given cocktail"""
@@ -22,9 +22,10 @@ async def get_all_ingredients():
         raise HTTPException(status_code=500, detail=f"Failed to retrieve ingredients: {str(e)}")
 
 @router.get("/search")
-async def search_ingredients(q: str = Query(..., description="Search query for ingredients")):
+async def search_ingredients(q: str = Query(..., description="Search query for ingredients"),
+                             limit: int = Query(20, ge=1, le=100)):
     try:
-        ingredients = service.search_ingredients(q)
+        ingredients = service.search_ingredients(q, limit=limit)
         return ingredients
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search ingredients: {str(e)}")
@@ -0,0 +1,143 @@
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+INDEX_MODES = ("auto", "flat", "hnsw", "ivfpq")
+
+# "auto" keeps exact search while it is cheap, then trades a little recall for latency/memory
+HNSW_MIN_SIZE = 20_000
+IVFPQ_MIN_SIZE = 1_000_000
+# Below this many vectors a product quantizer cannot be trained meaningfully
+IVFPQ_MIN_TRAIN = 256
+
+HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+DEFAULT_NPROBE = 16
+
+
+def choose_index_mode(n_vectors: int, mode: Optional[str] = None) -> str:
+    """
+    Concrete index mode for a corpus size.
+    mode (or MARMITONIC_FAISS_INDEX) is "auto" by default: flat below HNSW_MIN_SIZE vectors,
+    HNSW below IVFPQ_MIN_SIZE, IVF-PQ above. An explicit "ivfpq" falls back to flat when
+    there are too few vectors to train it.
+    """
+    mode = (mode or os.getenv("MARMITONIC_FAISS_INDEX", "auto")).lower()
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown FAISS index mode: {mode} (expected one of: {', '.join(INDEX_MODES)})")
+    if mode == "auto":
+        if n_vectors >= IVFPQ_MIN_SIZE:
+            return "ivfpq"
+        return "hnsw" if n_vectors >= HNSW_MIN_SIZE else "flat"
+    if mode == "ivfpq" and n_vectors < IVFPQ_MIN_TRAIN:
+        return "flat"
+    return mode
+
+
+def index_factory_string(mode: str, n_vectors: int, dimension: int) -> str:
+    """faiss.index_factory description of the id-mapped index for a mode."""
+    if mode == "flat":
+        return "IDMap2,Flat"
+    if mode == "hnsw":
+        return f"IDMap2,HNSW{HNSW_M},Flat"
+    if mode == "ivfpq":
+        # ~4 sqrt(n) lists, each with at least 39 training points
+        nlist = max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+        # Sub-vectors of ~8 dimensions; 8-bit codes once there is enough data to train 256 centroids each
+        m = max(d for d in range(1, max(1, dimension // 8) + 1) if dimension % d == 0)
+        nbits = 8 if n_vectors >= 256 * 39 else 4
+        return f"IDMap2,IVF{nlist},PQ{m}x{nbits}"
+    raise ValueError(f"Unknown FAISS index mode: {mode}")
+
+
+def configure_search(index: faiss.Index, ef_search: Optional[int] = None, nprobe: Optional[int] = None) -> None:
+    """Apply query-time parameters (MARMITONIC_FAISS_EF_SEARCH / MARMITONIC_FAISS_NPROBE); not stored in the index file."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = ef_search or int(os.getenv("MARMITONIC_FAISS_EF_SEARCH", DEFAULT_EF_SEARCH))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe or int(os.getenv("MARMITONIC_FAISS_NPROBE", DEFAULT_NPROBE))
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    """HNSW graphs cannot drop vectors: such indexes are rebuilt from the stored embeddings instead."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else faiss.downcast_index(index)
+    return not isinstance(inner, faiss.IndexHNSW)
+
+
+def build_ann_index(embeddings: np.ndarray, labels: np.ndarray, mode: str) -> faiss.Index:
+    """Create, train if needed, and fill an id-mapped inner-product index."""
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    index = faiss.index_factory(embeddings.shape[1], index_factory_string(mode, len(embeddings), embeddings.shape[1]),
+                                faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add_with_ids(embeddings, np.asarray(labels, dtype=np.int64))
+    configure_search(index)
+    return index
+
+
+def benchmark_index_modes(embeddings: np.ndarray, k: int = 10, n_queries: int = 200,
+                          modes: Sequence[str] = ("flat", "hnsw", "ivfpq"), seed: int = 0) -> List[Dict[str, float]]:
+    """
+    Recall@k and latency of each index mode against exact search, using corpus vectors as queries.
+
+    Returns one row per mode: factory string, build seconds, mean query latency (ms) and recall@k.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    labels = np.arange(len(embeddings), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    queries = embeddings[rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False)]
+    k = min(k, len(embeddings))
+
+    exact = faiss.IndexFlatIP(embeddings.shape[1])
+    exact.add(embeddings)
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for mode in modes:
+        start = time.perf_counter()
+        index = build_ann_index(embeddings, labels, mode)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = np.vstack([index.search(query[None, :], k)[1] for query in queries])
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(truth, found)])
+        rows.append({
+            "mode": mode,
+            "factory": index_factory_string(mode, len(embeddings), embeddings.shape[1]),
+            "build_s": build_seconds,
+            "latency_ms": latency_ms,
+            "recall": float(recall),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recall vs latency of the FAISS index modes")
+    parser.add_argument("--embeddings", default="backend/data/faiss_embeddings.npy",
+                        help="Saved cocktail embeddings (ignored with --synthetic)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark N random unit vectors instead")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = np.random.default_rng(0).standard_normal((args.synthetic, args.dimension)).astype(np.float32)
+        faiss.normalize_L2(vectors)
+    else:
+        vectors = np.load(args.embeddings)
+    print(f"{len(vectors)} vectors of dimension {vectors.shape[1]}, k={args.k}")
+    print(f"{'mode':<6} {'factory':<24} {'build':>8} {'latency':>10} {'recall':>7}")
+    for row in benchmark_index_modes(vectors, k=args.k, n_queries=args.queries):
+        print(f"{row['mode']:<6} {row['factory']:<24} {row['build_s']:7.2f}s {row['latency_ms']:8.3f}ms {row['recall']:7.3f}")
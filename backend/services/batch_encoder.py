@@ -0,0 +1,120 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+_STOP = object()
+
+
+class BatchEncoder:
+    """
+    Micro-batching front end for an embedding model.
+
+    Callers submit single texts and get a Future back. A worker thread takes the first
+    pending text, waits up to max_wait_ms for more (or until max_batch_size texts are
+    queued), encodes them in one call and resolves every Future with its own row. Under
+    concurrent load this turns many batch-of-one forward passes into a few larger ones,
+    and async routes await the Future instead of blocking the event loop.
+
+    Settings default to MARMITONIC_ENCODER_MAX_BATCH and MARMITONIC_ENCODER_MAX_WAIT_MS.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: Optional[int] = None,
+                 max_wait_ms: Optional[float] = None):
+        self._encode = encode
+        self.max_batch_size = max(1, max_batch_size if max_batch_size is not None
+                                  else int(os.getenv("MARMITONIC_ENCODER_MAX_BATCH", "32")))
+        self.max_wait_ms = max(0.0, max_wait_ms if max_wait_ms is not None
+                               else float(os.getenv("MARMITONIC_ENCODER_MAX_WAIT_MS", "5")))
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding; the Future resolves to its float32 vector."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchEncoder is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="batch-encoder", daemon=True)
+                self._thread.start()
+            self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        return self.submit(text).result(timeout)
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch) -> None:
+        pending = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+        # Identical texts in the same window are encoded once
+        rows: Dict[str, int] = {}
+        for text, _ in pending:
+            rows.setdefault(text, len(rows))
+        try:
+            vectors = np.asarray(self._encode(list(rows)), dtype=np.float32)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(pending)
+        for text, future in pending:
+            future.set_result(vectors[rows[text]])
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish the queued work and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
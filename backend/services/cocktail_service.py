@@ -1,11 +1,15 @@
 from .ingredient_service import IngredientService
+from .feasibility_cache import get_feasibility_cache
 from ..models.cocktail import Cocktail
 from typing import List, Dict, Any, Optional
 from ..data.ttl_parser import (
     get_all_cocktails as get_local_cocktails,
     get_cocktails_by_ingredients as get_local_cocktails_by_ingredients,
     search_cocktails as search_local_cocktails,
-    get_cocktail_details as get_local_cocktail_details
+    get_cocktail_details as get_local_cocktail_details,
+    get_ingredient_index as get_local_ingredient_index,
+    get_cocktail_lookup as get_local_cocktail_lookup,
+    get_similarity_table as get_local_similarity_table
 )
 
 
@@ -29,45 +33,66 @@ class CocktailService:
         """Get all cocktails from local TTL data using centralized parser"""
         return get_local_cocktails()
 
-    def search_cocktails(self, query: str) -> List[Cocktail]:
-        """Search cocktails by name"""
-        return search_local_cocktails(query)
+    def get_cocktail_lookup(self):
+        """Get the O(1) id/uri/name -> cocktail maps built by the parser"""
+        return get_local_cocktail_lookup()
+
+    def get_cocktail_by_id(self, cocktail_id: str) -> Optional[Cocktail]:
+        """Get a cocktail by its slug id"""
+        return get_local_cocktail_lookup().get_by_id(cocktail_id)
+
+    def search_cocktails(self, query: str, limit: Optional[int] = None) -> List[Cocktail]:
+        """Search cocktails by name, label or alternative name, best matches first"""
+        return search_local_cocktails(query, limit=limit)
+
+    def _get_feasibility(self, user_id: str):
+        inventory = self.ingredient_service.get_inventory(user_id)
+        # Only ingredients changed since the last call are applied to the cached state
+        return get_feasibility_cache().sync(user_id, inventory, get_local_ingredient_index())
 
     def get_feasible_cocktails(self, user_id: str) -> List[Cocktail]:
         """Get cocktails that can be made with the user's inventory"""
-        all_cocktails = self.get_all_cocktails()
-        # Ensure we're comparing normalized ingredient names
-        inventory = {ing.lower() for ing in self.ingredient_service.get_inventory(user_id)}
-        
-        feasible = []
-        for cocktail in all_cocktails:
-            if cocktail.parsed_ingredients:
-                # Use the robustly parsed ingredients from ttl_parser
-                cocktail_ingredients = {ing.lower() for ing in cocktail.parsed_ingredients}
-                
-                if cocktail_ingredients.issubset(inventory):
-                    feasible.append(cocktail)
-        
-        return feasible
+        return self._get_feasibility(user_id).feasible
 
     def get_almost_feasible_cocktails(self, user_id: str) -> List[Dict[str, Any]]:
         """Get cocktails that are almost feasible (missing 1-2 ingredients)"""
-        all_cocktails = self.get_all_cocktails()
-        inventory = {ing.lower() for ing in self.ingredient_service.get_inventory(user_id)}
-        
-        almost_feasible = []
-        for cocktail in all_cocktails:
-            if cocktail.parsed_ingredients:
-                cocktail_ingredients = {ing.lower() for ing in cocktail.parsed_ingredients}
-                missing = list(cocktail_ingredients - inventory)
-                
-                if 1 <= len(missing) <= 2:
-                    almost_feasible.append({
-                        "cocktail": cocktail,
-                        "missing": missing
-                    })
-        
-        return almost_feasible
+        return self._get_feasibility(user_id).almost_feasible
+
+    def get_feasible_cocktails_batch(self, inventories: Dict[str, Optional[List[str]]],
+                                     max_missing: int = 2) -> List[Dict[str, Any]]:
+        """
+        Get feasible and almost-feasible cocktail ids for many users at once.
+        A user mapped to None is evaluated against their stored inventory.
+        Missing counts are computed in vectorised blocks of users and reduced to position lists.
+        """
+        index = get_local_ingredient_index()
+        user_ids = list(inventories)
+        stored = self.ingredient_service.get_inventories(
+            [user_id for user_id in user_ids if inventories[user_id] is None]
+        )
+        user_inventories = [
+            inventories[user_id] if inventories[user_id] is not None else stored[user_id]
+            for user_id in user_ids
+        ]
+
+        positions = index.feasibility_many(index.encode_many(user_inventories), max_missing=max_missing)
+
+        results = []
+        for row, user_id in enumerate(user_ids):
+            feasible_positions, almost_positions = positions[row]
+            inventory_keys = {index.normalize(ing) for ing in user_inventories[row]}
+            results.append({
+                "user_id": user_id,
+                "feasible": [index.cocktails[i].id for i in feasible_positions],
+                "almost_feasible": [
+                    {
+                        "cocktail_id": index.cocktails[i].id,
+                        "missing": [key for key in index.cocktail_ingredients[i] if key not in inventory_keys]
+                    }
+                    for i in almost_positions
+                ]
+            })
+        return results
 
     def get_cocktails_by_ingredients(self, ingredients: List[str]) -> List[Cocktail]:
         """Get cocktails that contain all specified ingredients"""
@@ -79,52 +104,18 @@ class CocktailService:
 
     def get_similar_cocktails(self, cocktail_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get cocktails similar to the given cocktail based on ingredient overlap"""
-        all_cocktails = self.get_all_cocktails()
-
-        # Find the target cocktail
-        target_cocktail = None
-        for cocktail in all_cocktails:
-            if cocktail.id == cocktail_id:
-                target_cocktail = cocktail
-                break
-
-        if not target_cocktail or not target_cocktail.parsed_ingredients:
-            return []
-
-        target_ingredients = set(ing.lower() for ing in target_cocktail.parsed_ingredients)
-        similarities = []
-
-        for cocktail in all_cocktails:
-            if cocktail.id == cocktail_id or not cocktail.parsed_ingredients:
-                continue
-
-            cocktail_ingredients = set(ing.lower() for ing in cocktail.parsed_ingredients)
-            intersection = len(target_ingredients & cocktail_ingredients)
-            union = len(target_ingredients | cocktail_ingredients)
-
-            if union > 0:
-                similarity_score = intersection / union
-                similarities.append({
-                    "cocktail": cocktail,
-                    "similarity_score": similarity_score
-                })
-
-        # Sort by similarity score descending and return top limit
-        similarities.sort(key=lambda x: x["similarity_score"], reverse=True)
-        return similarities[:limit]
+        # Precomputed top-k Jaccard neighbours, ties kept in catalogue order
+        return [
+            {"cocktail": cocktail, "similarity_score": score}
+            for cocktail, score in get_local_similarity_table().similar(cocktail_id, limit=limit)
+        ]
 
     def get_same_vibe_cocktails(self, cocktail_id: str, limit: int = 10) -> List[Cocktail]:
         """Get cocktails in the same graph community/cluster as the given cocktail"""
         from .graph_service import GraphService  # Import locally to avoid circular imports
 
-        all_cocktails = self.get_all_cocktails()
-
-        # Find the target cocktail
-        target_cocktail = None
-        for cocktail in all_cocktails:
-            if cocktail.id == cocktail_id:
-                target_cocktail = cocktail
-                break
+        lookup = self.get_cocktail_lookup()
+        target_cocktail = lookup.get_by_id(cocktail_id)
 
         if not target_cocktail:
             return []
@@ -142,24 +133,19 @@ class CocktailService:
         communities = analysis.get('communities', {})
 
         # Find the community of the target cocktail (using cocktail id, not name)
-        target_community = None
-        for node, community_id in communities.items():
-            if node == target_cocktail.id:
-                target_community = community_id
-                break
-
+        target_community = communities.get(target_cocktail.id)
         if target_community is None:
             return []
 
-        # Find all cocktails in the same community
-        same_vibe_cocktails = []
-        for cocktail in all_cocktails:
-            if cocktail.id != cocktail_id and cocktail.id in communities:
-                if communities[cocktail.id] == target_community:
-                    same_vibe_cocktails.append(cocktail)
+        # Community members that are cocktails, kept in catalogue order
+        same_vibe_ids = [
+            node for node, community_id in communities.items()
+            if community_id == target_community and node != cocktail_id and node in lookup.by_id
+        ]
+        same_vibe_ids.sort(key=lookup.position)
 
         # Return up to limit cocktails
-        return same_vibe_cocktails[:limit]
+        return [lookup.by_id[node] for node in same_vibe_ids[:limit]]
 
     def get_bridge_cocktails(self, limit: int = 10) -> List[Cocktail]:
         """Get cocktails that connect different communities (bridge cocktails)"""
@@ -0,0 +1,151 @@
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+BACKENDS = ("torch", "onnx")
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into sentence embeddings (one float32 row per text, not normalised)."""
+
+    # Identifies the vectors a backend produces: indexes and caches built with another name are not reused
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """float32 array of shape (len(texts), dimension)."""
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Full PyTorch SentenceTransformer, fp32 on CPU."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, show_progress_bar=show_progress_bar), dtype=np.float32)
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Average of the token embeddings over the non-padding tokens (the MiniLM pooling layer)."""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    return (summed / np.clip(mask.sum(axis=1), 1e-9, None)).astype(np.float32)
+
+
+def default_onnx_dir(model_name: str) -> Path:
+    return Path(__file__).parent.parent / "data" / "onnx" / model_name.replace("/", "__")
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    ONNX Runtime session over an exported transformer (int8-quantised by default).
+
+    Only onnxruntime and tokenizers are needed at runtime: torch is used once, by
+    export_onnx_model, to produce model_dir (see `python -m backend.services.embedding_backends`).
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, model_dir: Optional[str] = None, quantized: bool = True,
+                 max_seq_length: int = 256, batch_size: int = 32):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding backend needs onnxruntime: pip install onnxruntime") from e
+
+        self.model_dir = Path(model_dir) if model_dir else default_onnx_dir(model_name)
+        model_path = self.model_dir / ("model_int8.onnx" if quantized else "model.onnx")
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"{model_path} not found; export it with: python -m backend.services.embedding_backends --model {model_name}"
+            )
+        self.name = f"{model_name}+onnx{'-int8' if quantized else ''}"
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = int(os.getenv("MARMITONIC_ONNX_THREADS", "0"))
+        self.session = onnxruntime.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + self.batch_size])
+            inputs = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            outputs = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})
+            rows.append(mean_pool(outputs[0], inputs["attention_mask"]))
+        return np.concatenate(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+
+def _selected_backend(backend: Optional[str]) -> str:
+    backend = (backend or os.getenv("MARMITONIC_EMBEDDING_BACKEND", "torch")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of: {', '.join(BACKENDS)})")
+    return backend
+
+
+def embedding_backend_name(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None) -> str:
+    """Name get_embedding_backend would give its backend, without loading the model."""
+    return f"{model_name}+onnx-int8" if _selected_backend(backend) == "onnx" else model_name
+
+
+def get_embedding_backend(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Embedding backend selected by name, or by MARMITONIC_EMBEDDING_BACKEND ("torch" by default).
+    "onnx" loads the int8 model from MARMITONIC_ONNX_MODEL_DIR (or backend/data/onnx/<model>).
+    """
+    if _selected_backend(backend) == "onnx":
+        return OnnxEmbeddingBackend(model_name, model_dir=os.getenv("MARMITONIC_ONNX_MODEL_DIR"))
+    return SentenceTransformerBackend(model_name)
+
+
+def export_onnx_model(model_name: str = DEFAULT_MODEL, output_dir: Optional[str] = None, quantize: bool = True) -> Path:
+    """Export the transformer of a SentenceTransformer model to ONNX, plus a dynamically int8-quantised copy."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    output = Path(output_dir) if output_dir else default_onnx_dir(model_name)
+    output.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(str(output))
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["Negroni: gin, Campari, sweet vermouth"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    fp32_path = output / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in input_names), str(fp32_path),
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=17, dynamo=False)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(fp32_path), str(output / "model_int8.onnx"), weight_type=QuantType.QInt8)
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX for the onnx backend")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+    print(f"ONNX model written to {export_onnx_model(args.model, args.output, quantize=not args.no_quantize)}")
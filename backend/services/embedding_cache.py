@@ -0,0 +1,76 @@
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from backend.services.lru_cache import LRUCache
+
+
+def normalize_query(text: str) -> str:
+    """Cache key of a query: surrounding and repeated whitespace does not change the embedding."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache(LRUCache):
+    """
+    LRU cache of L2-normalised query embeddings, persisted to an .npz file.
+
+    Entries are keyed by the normalised query text and never expire. When a path is given,
+    the cache is restored from it on creation (only if it was written for the same model)
+    and written back by save(), so popular queries survive a restart.
+    """
+
+    def __init__(self, max_size: int = 1024, path: Optional[str] = None, model_name: Optional[str] = None):
+        super().__init__(ttl=None, max_size=max_size)
+        self.path = path
+        self.model_name = model_name
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, text: str, default: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return super().get(normalize_query(text), default)
+
+    def set(self, text: str, vector: np.ndarray) -> None:
+        vector = np.array(vector, dtype=np.float32).reshape(-1)
+        vector.setflags(write=False)
+        super().set(normalize_query(text), vector)
+
+    def save(self) -> bool:
+        """Write the cache to its path (least recently used first); returns False without a path."""
+        if not self.path:
+            return False
+        entries = self.items()
+        keys = [key for key, _ in entries]
+        vectors = [vector for _, vector in entries]
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    model_name=np.array(self.model_name or ""),
+                    keys=np.array(keys, dtype=np.str_),
+                    vectors=np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32),
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+
+    def load(self) -> int:
+        """Restore entries saved by save(); returns the number of entries loaded."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model_name"]) != (self.model_name or ""):
+                    print(f"Query embedding cache ignored: built for model {data['model_name']}")
+                    return 0
+                keys, vectors = data["keys"], data["vectors"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not load query embedding cache: {e}")
+            return 0
+        for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+            self.set(str(key), vector)
+        return len(self)
@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.data.ingredient_index import FeasibilityState, IngredientIndex
+from backend.models.cocktail import Cocktail
+
+
+class FeasibilitySnapshot:
+    """
+    Feasible and almost-feasible cocktails of a user at one point in time.
+
+    Only the positions and missing counts are copied from the state, under the cache lock;
+    each list is built from them on first access, so an endpoint pays for the one it reads.
+    """
+
+    def __init__(self, state: FeasibilityState):
+        self._index = state.index
+        self._feasible = sorted(state.feasible)
+        self._almost = sorted((position, state.missing[position]) for position in state.almost)
+        # update() replaces inventory_keys instead of mutating it
+        self._inventory_keys = state.inventory_keys
+
+    @cached_property
+    def feasible(self) -> List[Cocktail]:
+        return [self._index.cocktails[position] for position in self._feasible]
+
+    @cached_property
+    def almost_feasible(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "cocktail": self._index.cocktails[position],
+                "missing": [key for key in self._index.cocktail_ingredients[position] if key not in self._inventory_keys],
+            }
+            for position, missing in self._almost
+            if 1 <= missing <= 2
+        ]
+
+
+class FeasibilityCache:
+    """
+    Per-user feasibility state, kept up to date incrementally.
+
+    Each read reconciles the cached state with the user's current inventory: only the
+    ingredients added or removed since the last call touch the state, so inventories
+    written by another worker are picked up without a full recomputation. The snapshot
+    handed out is reused until the inventory changes.
+    """
+
+    def __init__(self, max_users: int = 10000):
+        self.max_users = max_users
+        # user_id: (state, snapshot of it or None once the state has changed)
+        self._states: "OrderedDict[str, Tuple[FeasibilityState, Optional[FeasibilitySnapshot]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._states
+
+    def sync(self, user_id: str, inventory: List[str], index: IngredientIndex) -> FeasibilitySnapshot:
+        """Align the user's state with the given inventory and return a snapshot of it"""
+        with self._lock:
+            state, snapshot = self._states.get(user_id, (None, None))
+            if state is None or state.index is not index:
+                state, snapshot = FeasibilityState(index, inventory), None
+            elif any(state.update(inventory)):
+                snapshot = None
+            if snapshot is None:
+                # The state keeps changing under later updates: only copies leave the lock
+                snapshot = FeasibilitySnapshot(state)
+            self._states[user_id] = (state, snapshot)
+            self._states.move_to_end(user_id)
+            while len(self._states) > self.max_users:
+                self._states.popitem(last=False)
+            return snapshot
+
+    def refresh(self, user_id: str, inventory: List[str], index: IngredientIndex) -> bool:
+        """
+        Apply an inventory update to an already cached state; the next sync builds the snapshot.
+        Returns False for unknown users and for states built on another catalog (those are dropped).
+        """
+        with self._lock:
+            state, _ = self._states.get(user_id, (None, None))
+            if state is None:
+                return False
+            if state.index is not index:
+                del self._states[user_id]
+                return False
+            if any(state.update(inventory)):
+                self._states[user_id] = (state, None)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+_cache_instance: Optional[FeasibilityCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_feasibility_cache() -> FeasibilityCache:
+    """Shared feasibility cache for the process"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = FeasibilityCache()
+        return _cache_instance
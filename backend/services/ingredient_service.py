@@ -4,18 +4,31 @@ from backend.models.ingredient import Ingredient
 from typing import List, Dict
 from pathlib import Path
 from backend.utils.graph_loader import get_shared_graph
-from backend.data.ttl_parser import get_all_ingredients as get_local_ingredients
+from backend.data.ttl_parser import (
+    get_all_ingredients as get_local_ingredients,
+    get_ingredient_search_index as get_local_ingredient_search_index,
+    get_ingredient_index as get_local_ingredient_index
+)
+from backend.data.ingredient_search import IngredientSearchIndex
+from backend.services.inventory_store import InventoryStore, get_inventory_store
+from backend.services.feasibility_cache import get_feasibility_cache
 
 class IngredientService:
-    def __init__(self, local_ingredient_loader=None):
+    def __init__(self, local_ingredient_loader=None, inventory_store: InventoryStore = None):
         # SparqlService now defaults to using the shared graph
         self.sparql_service = SparqlService()
-        self.inventories: Dict[str, List[str]] = {}  # user_id -> list of ingredient names
+        # Inventories live in a store shared by every service and worker
+        self._inventory_store = inventory_store
+        self._search_index = None
         if local_ingredient_loader:
             self._local_ingredient_loader = local_ingredient_loader
         else:
             self._local_ingredient_loader = get_local_ingredients
 
+    @property
+    def inventory_store(self) -> InventoryStore:
+        return self._inventory_store or get_inventory_store()
+
     def get_all_ingredients(self) -> List[Ingredient]:
         # First, load parsed ingredients from the local TTL parser
         # These are the "canonical" ingredients used in our cocktail database
@@ -103,19 +116,30 @@ class IngredientService:
             print(f"Error querying local ingredient {uri}: {e}")
 
         return None
-    def search_ingredients(self, query: str) -> List[Ingredient]:
+    def _get_search_index(self) -> IngredientSearchIndex:
+        if self._local_ingredient_loader is get_local_ingredients:
+            return get_local_ingredient_search_index()
+        # Custom loader: index its current list, rebuilt only when the list changes
+        ingredients = self._local_ingredient_loader()
+        if self._search_index is None or self._search_index.ingredients is not ingredients:
+            self._search_index = IngredientSearchIndex(ingredients)
+        return self._search_index
+
+    def search_ingredients(self, query: str, limit: int = 20, include_dbpedia: bool = False) -> List[Ingredient]:
+        """
+        Typo-tolerant search over local ingredients, ranked best first.
+        Autocomplete stays in memory; DBpedia is only queried when include_dbpedia is set.
+        """
         # 1. Search locally first (fast and relevant)
         local_matches = []
-        query_lower = query.lower()
-        
         try:
-            all_local = self._local_ingredient_loader()
-            for ing in all_local:
-                if query_lower in ing.name.lower():
-                    local_matches.append(ing)
-        except Exception:
-            pass
-            
+            local_matches = self._get_search_index().search(query, limit=limit)
+        except Exception as e:
+            print(f"Error searching local ingredients: {e}")
+
+        if not include_dbpedia:
+            return local_matches
+
         # 2. Setup DBpedia search for broader results
         sparql_query = f"""
         SELECT ?id ?name ?category ?description WHERE {{
@@ -151,10 +175,20 @@ class IngredientService:
         return local_matches + dbpedia_matches
 
     def update_inventory(self, user_id: str, ingredients: List[str]):
-        self.inventories[user_id] = ingredients
+        self.inventory_store.set(user_id, ingredients)
+        # Apply the added/removed ingredients to the cached feasibility state now,
+        # so the follow-up feasible/almost-feasible read has nothing left to do
+        feasibility_cache = get_feasibility_cache()
+        if user_id in feasibility_cache:
+            # A cached state means the ingredient index is already built
+            feasibility_cache.refresh(user_id, ingredients, get_local_ingredient_index())
 
     def get_inventory(self, user_id: str) -> List[str]:
-        return self.inventories.get(user_id, [])
+        return self.inventory_store.get(user_id)
+
+    def get_inventories(self, user_ids: List[str]) -> Dict[str, List[str]]:
+        """Fetch several inventories in one store round trip"""
+        return self.inventory_store.get_many(user_ids)
 
     def get_ingredient_by_uri(self, uri: str) -> Ingredient:
         # Try local first
@@ -0,0 +1,244 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class InventoryStore(ABC):
+    """Storage backend for user inventories (user_id -> list of ingredient names)."""
+
+    @abstractmethod
+    def get(self, user_id: str) -> List[str]:
+        """Ingredients of the user, empty for an unknown user."""
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, List[str]]:
+        return {user_id: self.get(user_id) for user_id in user_ids}
+
+    @abstractmethod
+    def set(self, user_id: str, ingredients: List[str]) -> None:
+        """Replace the ingredients of the user."""
+
+    def flush(self) -> None:
+        """Persist any buffered writes."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class InMemoryInventoryStore(InventoryStore):
+    """Process-local store, used by tests and single-worker development servers."""
+
+    def __init__(self):
+        self._inventories: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> List[str]:
+        with self._lock:
+            return list(self._inventories.get(user_id, []))
+
+    def set(self, user_id: str, ingredients: List[str]) -> None:
+        with self._lock:
+            self._inventories[user_id] = list(ingredients)
+
+
+class SQLiteInventoryStore(InventoryStore):
+    """
+    SQLite-backed store in WAL mode, shared by every uvicorn worker on the host.
+
+    Reads go through a per-process LRU cache. The cache is dropped whenever another
+    connection commits (PRAGMA data_version changes), so workers never serve an
+    inventory older than the last commit. Cache misses are read outside the store lock,
+    on one connection per thread, so concurrent reads do not queue behind each other.
+
+    Writes are committed before set() returns, so an acknowledged update is durable and
+    visible to every worker. With write_behind=True they are instead buffered and
+    committed in one transaction when batch_size is reached or after flush_interval
+    seconds, trading that guarantee for fewer transactions.
+    """
+
+    def __init__(self, path: str, cache_size: int = 4096, write_behind: bool = False, batch_size: int = 256,
+                 flush_interval: float = 0.05):
+        self.path = str(path)
+        self.cache_size = cache_size
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._pending: Dict[str, List[str]] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        # Bumped by every set() and cache reset: a read that raced with one does not fill the cache
+        self._generation = 0
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS inventories ("
+            " user_id TEXT PRIMARY KEY,"
+            " ingredients TEXT NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._data_version = self._read_data_version()
+        atexit.register(self.close)
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_with_other_writers(self):
+        # data_version only changes when *another* connection commits
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
+            self._generation += 1
+
+    def _reader(self) -> sqlite3.Connection:
+        """Read connection of the calling thread (WAL readers do not block each other)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _cache_put(self, user_id: str, ingredients: List[str]):
+        self._cache[user_id] = ingredients
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, user_id: str) -> List[str]:
+        return self.get_many([user_id])[user_id]
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, List[str]]:
+        user_ids = list(user_ids)
+        results: Dict[str, List[str]] = {}
+        with self._lock:
+            self._sync_with_other_writers()
+            generation = self._generation
+            to_load = []
+            for user_id in user_ids:
+                if user_id in self._pending:
+                    results[user_id] = list(self._pending[user_id])
+                elif user_id in self._cache:
+                    self._cache.move_to_end(user_id)
+                    results[user_id] = list(self._cache[user_id])
+                else:
+                    to_load.append(user_id)
+
+        found: Dict[str, List[str]] = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(to_load), 500):
+            chunk = to_load[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._reader().execute(
+                f"SELECT user_id, ingredients FROM inventories WHERE user_id IN ({placeholders})", chunk
+            ).fetchall()
+            found.update((user_id, json.loads(raw)) for user_id, raw in rows)
+
+        if to_load:
+            with self._lock:
+                cacheable = generation == self._generation
+                for user_id in to_load:
+                    ingredients = found.get(user_id, [])
+                    if cacheable:
+                        self._cache_put(user_id, ingredients)
+                    results[user_id] = list(ingredients)
+
+        return {user_id: results[user_id] for user_id in user_ids}
+
+    def set(self, user_id: str, ingredients: List[str]) -> None:
+        ingredients = list(ingredients)
+        with self._lock:
+            self._pending[user_id] = ingredients
+            self._cache_put(user_id, ingredients)
+            self._generation += 1
+            if not self.write_behind or len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            now = time.time()
+            rows = [(user_id, json.dumps(ingredients), now) for user_id, ingredients in self._pending.items()]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO inventories (user_id, ingredients, updated_at) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+            with self._readers_lock:
+                for reader in self._readers:
+                    reader.close()
+                self._readers.clear()
+
+
+_store_instance: Optional[InventoryStore] = None
+_store_lock = threading.Lock()
+
+
+def _default_db_path() -> Path:
+    return Path(__file__).parent.parent / "data" / "inventories.db"
+
+
+def get_inventory_store() -> InventoryStore:
+    """
+    Shared inventory store for the process.
+    MARMITONIC_INVENTORY_STORE selects the backend ("sqlite" by default, or "memory");
+    MARMITONIC_INVENTORY_DB overrides the SQLite file location, and
+    MARMITONIC_INVENTORY_WRITE_BEHIND=on buffers SQLite writes instead of committing each one.
+    """
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            backend = os.getenv("MARMITONIC_INVENTORY_STORE", "sqlite").lower()
+            if backend == "memory":
+                _store_instance = InMemoryInventoryStore()
+            else:
+                db_path = os.getenv("MARMITONIC_INVENTORY_DB") or str(_default_db_path())
+                write_behind = os.getenv("MARMITONIC_INVENTORY_WRITE_BEHIND", "off").lower() == "on"
+                _store_instance = SQLiteInventoryStore(db_path, write_behind=write_behind)
+        return _store_instance
+
+
+def reset_inventory_store() -> None:
+    """Close and forget the shared store (the next call to get_inventory_store recreates it)."""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is not None:
+            _store_instance.close()
+        _store_instance = None
@@ -1,77 +1,86 @@
 from openai import OpenAI
 from os import getenv
 from dotenv import load_dotenv
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
 import hashlib
-import time
+import threading
+
+from backend.services.lru_cache import LRUCache
+
+DEFAULT_BASE_URL = 'https://openrouter.ai/api/v1'
+DEFAULT_LLM_MODEL = "mistralai/devstral-2512:free"
 
-class SimpleCache:
-    """Simple in-memory cache with TTL support."""
-    
-    def __init__(self, ttl: int = 3600, max_size: int = 100):
-        self.ttl = ttl
-        self.max_size = max_size
-        self.cache = {}  # key: (value, timestamp)
-    
-    def _cleanup(self):
-        """Remove expired entries from cache."""
-        current_time = time.time()
-        expired_keys = [key for key, (_, timestamp) in self.cache.items() 
-                      if current_time - timestamp > self.ttl]
-        for key in expired_keys:
-            del self.cache[key]
-    
-    def get(self, key):
-        """Get value from cache if not expired."""
-        self._cleanup()
-        if key in self.cache:
-            value, timestamp = self.cache[key]
-            return value
-        return None
-    
-    def set(self, key, value):
-        """Set value in cache with current timestamp."""
-        self._cleanup()
-        # Remove oldest entry if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.cache.items(), key=lambda x: x[1][1])[0]
-            del self.cache[oldest_key]
-        self.cache[key] = (value, time.time())
 
 class LLMService:
-    def __init__(self, cache_ttl: int = 3600, cache_size: int = 100):
+    def __init__(self, cache_ttl: int = 3600, cache_size: int = 100, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None):
         load_dotenv()
         API_KEY = getenv("OPENAI_API_KEY")
+        # A slow provider fails the request after MARMITONIC_LLM_TIMEOUT seconds instead of holding a worker
+        self.timeout = timeout if timeout is not None else float(getenv("MARMITONIC_LLM_TIMEOUT", "20"))
         self.client = OpenAI(
-            base_url='https://openrouter.ai/api/v1',
-            api_key=API_KEY)
-        # Create custom cache instance
-        self.cache = SimpleCache(ttl=cache_ttl, max_size=cache_size)
+            base_url=getenv("MARMITONIC_LLM_BASE_URL", DEFAULT_BASE_URL),
+            api_key=API_KEY,
+            timeout=self.timeout,
+            max_retries=max_retries if max_retries is not None else int(getenv("MARMITONIC_LLM_MAX_RETRIES", "1")))
+        # Answers by prompt: O(1) LRU with lazy TTL expiry, shared by the request threads
+        self.cache = LRUCache(ttl=cache_ttl, max_size=cache_size)
+        # Requests in progress by cache key: identical prompts sent meanwhile wait for the same answer
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self.coalesced = 0
     
     def _get_cache_key(self, prompt: str, method: str) -> str:
         # Generate a unique cache key based on prompt and method
         key_string = f"{method}:{prompt}"
         return hashlib.md5(key_string.encode('utf-8')).hexdigest()
     
-    def example(self, prompt: str):
-        cache_key = self._get_cache_key(prompt, "example")
+    def _single_flight(self, cache_key: str, call: Callable[[], str]) -> str:
+        """Run call unless the same request is already in flight, in which case share its result."""
+        with self._in_flight_lock:
+            future = self._in_flight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[cache_key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            result = call()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[cache_key]
+
+    def _complete(self, method: str, prompt: str, messages: List[Dict[str, str]]) -> str:
+        cache_key = self._get_cache_key(prompt, method)
         cached_result = self.cache.get(cache_key)
         if cached_result:
             return cached_result
 
-        response = self.client.chat.completions.create(
-            model="mistralai/devstral-2512:free",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        result = response.choices[0].message.content
-        self.cache.set(cache_key, result)
-        return result
+        def call():
+            # Answered by a request that completed after the check above
+            cached_result = self.cache.get(cache_key)
+            if cached_result:
+                return cached_result
+            response = self.client.chat.completions.create(model=DEFAULT_LLM_MODEL, messages=messages)
+            result = response.choices[0].message.content
+            self.cache.set(cache_key, result)
+            return result
+
+        return self._single_flight(cache_key, call)
+
+    def example(self, prompt: str):
+        return self._complete("example", prompt, [{"role": "user", "content": prompt}])
     
     def nl2sparql(self, prompt: str):
-        cache_key = self._get_cache_key(prompt, "nl2sparql")
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            return cached_result
-
         header = """You are a SPARQL query generator for cocktail data in RDF/Turtle format.
 
 IMPORTANT: The RDF graph contains 56 cocktails with 2419 triples. Cocktails are NOT declared with 'a dbo:Cocktail' (no rdf:type declaration). Instead, cocktails are identified by having properties like dbp:ingredients, dbp:prep, etc.
@@ -105,16 +114,10 @@ HOW TO QUERY COCKTAILS:
 Examples of cocktails in the graph: Black Russian, Moscow mule, Bloody Mary, Cosmopolitan, Espresso martini, French martini, Long Island iced tea, Vesper, Martini, Mojito, Margarita, Daiquiri, etc.
 
 Generate a valid SPARQL SELECT query that answers the natural language question. Use the actual structure of the graph. Do NOT use 'a dbo:Cocktail' as it doesn't exist in this graph. Return only the SPARQL query without explanations or markdown formatting."""
-        response = self.client.chat.completions.create(
-            model="mistralai/devstral-2512:free",
-            messages=[
-                {"role": "system", "content": header},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        result = response.choices[0].message.content
-        self.cache.set(cache_key, result)
-        return result
+        return self._complete("nl2sparql", prompt, [
+            {"role": "system", "content": header},
+            {"role": "user", "content": prompt}
+        ])
     
 if __name__ == "__main__":
     llm_service = LLMService()
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache whose entries expire ttl seconds after they are set.
+
+    Entries live in an OrderedDict kept in recency order, so get and set are O(1):
+    a hit moves the entry to the end, a full cache drops the entry at the front.
+    Expiry is lazy: an expired entry is removed when it is looked up (a miss) or
+    when it reaches the front. ttl=None keeps entries until they are evicted.
+    """
+
+    def __init__(self, ttl: Optional[float] = 3600, max_size: int = 100, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self._clock = clock
+        # key: (value, expiry time or None)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._live(key) is not None
+
+    def _live(self, key: Hashable) -> Optional[Tuple[Any, Optional[float]]]:
+        """Entry for key unless missing or expired (expired entries are removed); caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            now = self._clock()
+            self._entries[key] = (value, now + self.ttl if self.ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                _, (_, expires) = self._entries.popitem(last=False)
+                if expires is not None and expires <= now:
+                    self.expirations += 1
+                else:
+                    self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Live entries, least recently used first; does not count as a lookup or touch their recency."""
+        with self._lock:
+            now = self._clock()
+            return [(key, value) for key, (value, expires) in self._entries.items() if expires is None or expires > now]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
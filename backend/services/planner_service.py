@@ -1,6 +1,6 @@
 from backend.services.cocktail_service import CocktailService
 from backend.services.ingredient_service import IngredientService
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
 
 class PlannerService:
@@ -18,7 +18,15 @@ class PlannerService:
             else:
                 self.cocktail_ingredients[cocktail.name] = set()
 
-  
+    def _resolve_name(self, cocktail_name: str) -> Optional[str]:
+        """Map an id, uri, name or label to the cocktail name used as mapping key."""
+        if cocktail_name in self.cocktail_ingredients:
+            return cocktail_name
+        cocktail = self.cocktail_service.get_cocktail_lookup().resolve(cocktail_name)
+        if cocktail is not None and cocktail.name in self.cocktail_ingredients:
+            return cocktail.name
+        return None
+
 
     def optimize_playlist_mode(self, cocktail_names: List[str]) -> Dict[str, List]:
         """
@@ -29,7 +37,11 @@ class PlannerService:
             return {'selected_ingredients': [], 'covered_cocktails': []}
 
         # Filter to existing cocktails
-        valid_cocktails = [c for c in cocktail_names if c in self.cocktail_ingredients]
+        valid_cocktails = []
+        for cocktail_name in cocktail_names:
+            resolved = self._resolve_name(cocktail_name)
+            if resolved is not None and resolved not in valid_cocktails:
+                valid_cocktails.append(resolved)
         if not valid_cocktails:
             return {'selected_ingredients': [], 'covered_cocktails': []}
 
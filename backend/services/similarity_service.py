@@ -1,42 +1,200 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional
+import asyncio
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import pickle
+import json
 import os
 import hashlib
+import tempfile
+import threading
 import time
+from backend.data.cocktail_lookup import CocktailLookup
 from backend.models.cocktail import Cocktail
 from backend.models.vibe_cluster import VibeCluster
+from backend.services.ann_index import build_ann_index, choose_index_mode, configure_search, index_factory_string, supports_removal
+from backend.services.batch_encoder import BatchEncoder
 from backend.services.cocktail_service import CocktailService
-from backend.services.llm_service import LLMService, SimpleCache
+from backend.services.embedding_backends import DEFAULT_MODEL, EmbeddingBackend, embedding_backend_name, get_embedding_backend
+from backend.services.embedding_cache import QueryEmbeddingCache
+from backend.services.llm_service import LLMService
+from backend.services.lru_cache import LRUCache
+from backend.services.vibe_clustering import (N_CLUSTERS_RANGE, Clustering, SilhouetteSample, assign_clusters, load_clustering,
+                                               clustering_lock, save_clustering, silhouette_sample, silhouette_score, train_kmeans,
+                                               warm_start_centroids)
+
+
+class IndexState(NamedTuple):
+    """
+    Everything a search reads, replaced as a single reference: a reader takes one local copy
+    and never maps the ids of a new index through the labels or cocktails of the old one.
+    """
+    index: Optional[faiss.Index]
+    index_mode: Optional[str]
+    cocktails: List[Cocktail]
+    cocktail_lookup: CocktailLookup
+    embeddings: Optional[np.ndarray]
+    text_hashes: List[str]
+    # _corpus_hash of the index: keys the clusterings computed from it
+    corpus_hash: Optional[str]
+    # FAISS ids of the rows of embeddings (a stable 63-bit hash of each cocktail id), and their sort order
+    labels: np.ndarray
+    label_order: np.ndarray
+    # Precomputed top-K neighbours of every cocktail (row i includes i itself)
+    neighbor_ids: Optional[np.ndarray] = None
+    neighbor_scores: Optional[np.ndarray] = None
+
+
+def _state_field(name: str) -> property:
+    return property(lambda self: getattr(self._state, name), doc=f"{name} of the current index state")
 
 
 class SimilarityService:
     """Service de recherche de cocktails similaires avec FAISS et RAG."""
+
+    FALLBACK_CLUSTER_TITLE = "Cluster Vibe"
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", cache_ttl: int = 3600, cache_size: int = 100):
+    def __init__(self, model_name: str = DEFAULT_MODEL, cache_ttl: int = 3600, cache_size: int = 100,
+                 neighbor_k: int = 50, query_cache_size: int = 1024, query_cache_path: Optional[str] = None,
+                 encoder_max_batch_size: Optional[int] = None, encoder_max_wait_ms: Optional[float] = None,
+                 embedding_backend: Optional[EmbeddingBackend] = None, index_mode: Optional[str] = None,
+                 title_concurrency: Optional[int] = None):
         self.cocktail_service = CocktailService()
-        self.llm_service = LLMService(cache_ttl=cache_ttl, cache_size=cache_size)
-        self.model = SentenceTransformer(model_name)
-        self.index: Optional[faiss.Index] = None
-        self.cocktails: List[Cocktail] = []
-        self.embeddings: Optional[np.ndarray] = None
+        # The LLM client, the embedding model and the index are loaded on first use (or by warm_up),
+        # so importing the routes or constructing the service stays cheap
+        self._cache_ttl, self._cache_size = cache_ttl, cache_size
+        self._llm_service: Optional[LLMService] = None
+        # PyTorch SentenceTransformer or ONNX Runtime int8, see MARMITONIC_EMBEDDING_BACKEND
+        self._model_name_arg = model_name
+        self._embedding_backend = embedding_backend
+        # Name of the vectors the backend produces (model + runtime): keys the saved index and query cache
+        self.model_name = embedding_backend.name if embedding_backend else embedding_backend_name(model_name)
+        self._load_lock = threading.Lock()
+        self._llm_lock = threading.Lock()
+        # Seconds spent loading each component, for the startup report
+        self.timings: Dict[str, float] = {}
+        # Inner-product index wrapped in an id map keyed by a hash of the cocktail id; flat, HNSW or
+        # IVF-PQ depending on the catalog size or MARMITONIC_FAISS_INDEX (see ann_index.choose_index_mode)
+        self.index_mode_setting = index_mode
+        # Index, cocktails, embeddings, labels and neighbour table, see IndexState
+        self._state = self._make_state(None, None, [], None, [], None)
+        # Serialises add/update/remove; readers keep using the previous state until the swap
+        self._write_lock = threading.RLock()
         self.index_path = "backend/data/faiss_index.bin"
-        self.cocktails_path = "backend/data/cocktails_cache.pkl"
-        self.embeddings_path = "backend/data/embeddings_cache.pkl"
+        # Embeddings are memory-mapped read-only so workers share them through the page cache;
+        # cocktails are stored as ids only and re-hydrated from the parser
+        self.embeddings_path = "backend/data/faiss_embeddings.npy"
+        self.cocktail_ids_path = "backend/data/faiss_cocktail_ids.npy"
+        # Hash of each cocktail's embedding text, to re-encode only what changed
+        self.text_hashes_path = "backend/data/faiss_text_hashes.npy"
+        self.manifest_path = "backend/data/faiss_manifest.json"
+        # Precomputed top-K neighbours of every cocktail (row i includes i itself)
+        self.neighbors_path = "backend/data/faiss_neighbors.npz"
+        self.neighbor_k = neighbor_k
+        # Embeddings of recent search queries; MARMITONIC_QUERY_CACHE persists them across restarts
+        self.query_cache = QueryEmbeddingCache(
+            max_size=query_cache_size,
+            path=query_cache_path or os.getenv("MARMITONIC_QUERY_CACHE"),
+            model_name=self.model_name,
+        )
+        # Concurrent query encodes are grouped into small batches on a worker thread
+        self.encoder = BatchEncoder(self._encode_texts, max_batch_size=encoder_max_batch_size, max_wait_ms=encoder_max_wait_ms)
         # Create custom cache for cluster title generation
-        self.title_cache = SimpleCache(ttl=cache_ttl, max_size=cache_size)
+        self.title_cache = LRUCache(ttl=cache_ttl, max_size=cache_size)
+        # Cluster titles requested from the LLM at the same time (MARMITONIC_LLM_CONCURRENCY)
+        self.title_concurrency = max(1, title_concurrency if title_concurrency is not None
+                                     else int(os.getenv("MARMITONIC_LLM_CONCURRENCY", "4")))
         # Create cache for clusters
-        self.clusters_cache = SimpleCache(ttl=cache_ttl, max_size=cache_size)
+        self.clusters_cache = LRUCache(ttl=cache_ttl, max_size=cache_size)
+        # k-means results per n_clusters, with the corpus hash they were computed from
+        self.clusters_path = "backend/data/faiss_clusters_{n_clusters}.npz"
+        # One k-means at a time; n_clusters values being computed in the background
+        self._clusters_lock = threading.Lock()
+        self._pending_clusters = set()
+        self._pending_lock = threading.Lock()
+        self._sweep_running = False
+        # Silhouette score of each n_clusters, with the corpus hash it was measured on
+        self._cluster_scores: Dict[int, tuple] = {}
+        # Distances between sampled embeddings, computed once per corpus for all the silhouette scores
+        self._silhouette_sample: Optional[tuple] = None
     
+    index = _state_field("index")
+    index_mode = _state_field("index_mode")
+    cocktails = _state_field("cocktails")
+    cocktail_lookup = _state_field("cocktail_lookup")
+    embeddings = _state_field("embeddings")
+    text_hashes = _state_field("text_hashes")
+    corpus_hash = _state_field("corpus_hash")
+    labels = _state_field("labels")
+    neighbor_ids = _state_field("neighbor_ids")
+    neighbor_scores = _state_field("neighbor_scores")
+
+    @property
+    def embedding_backend(self) -> EmbeddingBackend:
+        if self._embedding_backend is None:
+            with self._load_lock:
+                if self._embedding_backend is None:
+                    start = time.perf_counter()
+                    self._embedding_backend = get_embedding_backend(self._model_name_arg)
+                    self.timings["embedding_model"] = time.perf_counter() - start
+        return self._embedding_backend
+
+    @property
+    def llm_service(self) -> LLMService:
+        if self._llm_service is None:
+            with self._llm_lock:
+                if self._llm_service is None:
+                    self._llm_service = LLMService(cache_ttl=self._cache_ttl, cache_size=self._cache_size)
+        return self._llm_service
+
+    @llm_service.setter
+    def llm_service(self, value: LLMService) -> None:
+        self._llm_service = value
+
+    def ensure_index(self) -> bool:
+        """Load (or build) the index once, however many threads ask for it at the same time."""
+        if self.index is None:
+            with self._write_lock:
+                if self.index is None:
+                    start = time.perf_counter()
+                    self.build_index()
+                    self.timings["index"] = time.perf_counter() - start
+        state = self._state
+        return state.index is not None and bool(state.cocktails)
+
+    def open_encoder(self) -> None:
+        """Replace the encoder closed by a previous app shutdown with a new one, same settings."""
+        if self.encoder.closed:
+            self.encoder = BatchEncoder(self._encode_texts, max_batch_size=self.encoder.max_batch_size,
+                                        max_wait_ms=self.encoder.max_wait_ms)
+
+    def warm_up(self) -> Dict[str, float]:
+        """Load the embedding model and the index ahead of the first request; returns the timings."""
+        start = time.perf_counter()
+        self.embedding_backend
+        self.ensure_index()
+        self.timings["warm_up"] = time.perf_counter() - start
+        print("Similarity service ready: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()))
+        return dict(self.timings)
+
     def _get_cluster_cache_key(self, cocktails: List[Cocktail]) -> str:
+        return self._title_cache_key([cocktail.id for cocktail in cocktails])
+
+    @staticmethod
+    def _title_cache_key(cocktail_ids: List[str]) -> str:
         # Generate a unique cache key based on cocktail IDs
-        cocktail_ids = sorted([cocktail.id for cocktail in cocktails])
+        cocktail_ids = sorted(cocktail_ids)
         key_string = "|".join(cocktail_ids)
         return hashlib.md5(key_string.encode('utf-8')).hexdigest()
-        self.embeddings_path = "backend/data/embeddings_cache.pkl"
-        
+
+    def _make_state(self, index: Optional[faiss.Index], index_mode: Optional[str], cocktails: List[Cocktail],
+                    embeddings: Optional[np.ndarray], text_hashes: List[str], corpus_hash: Optional[str]) -> IndexState:
+        # Index rows follow cocktails, so positions come from a lookup over that list
+        labels = np.array([self._label(c.id) for c in cocktails], dtype=np.int64)
+        if len(np.unique(labels)) != len(labels):
+            raise ValueError("Collision d'identifiants FAISS entre cocktails")
+        return IndexState(index, index_mode, cocktails, CocktailLookup(cocktails), embeddings, text_hashes, corpus_hash,
+                          labels, np.argsort(labels))
+
     def _create_cocktail_text(self, cocktail: Cocktail) -> str:
         ingredients = cocktail.ingredients or []
         ingredients_str = ', '.join(str(i) for i in ingredients if i)
@@ -53,119 +211,410 @@ class SimilarityService:
             related_str = ', '.join(cocktail.related_ingredients)
             parts.append(f"Ingrédients liés: {related_str}")
         return " | ".join(parts)
+
+    def _text_hash(self, cocktail: Cocktail) -> str:
+        return hashlib.blake2b(self._create_cocktail_text(cocktail).encode('utf-8'), digest_size=16).hexdigest()
+
+    def _corpus_hash(self, cocktail_ids: List[str], text_hashes: List[str]) -> str:
+        """Fingerprint of the embedded texts: changes whenever a cocktail is added, removed or edited."""
+        digest = hashlib.sha256()
+        for cocktail_id, text_hash in sorted(zip(cocktail_ids, text_hashes)):
+            digest.update(f"{cocktail_id}\0{text_hash}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.ascontiguousarray(self.embedding_backend.encode(texts, show_progress_bar=len(texts) > 100), dtype=np.float32)
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _encode(self, cocktails: List[Cocktail]) -> np.ndarray:
+        return self._encode_texts([self._create_cocktail_text(c) for c in cocktails])
+
+    @staticmethod
+    def _label(cocktail_id: str) -> int:
+        """Stable FAISS id of a cocktail, independent of its position in the catalog."""
+        return int.from_bytes(hashlib.blake2b(cocktail_id.encode('utf-8'), digest_size=8).digest(), 'little') & 0x7FFFFFFFFFFFFFFF
+
+    @staticmethod
+    def _labels_to_positions(labels: np.ndarray, state: IndexState) -> np.ndarray:
+        """Map FAISS ids returned by a search of state.index back to rows of state.cocktails (-1 stays -1)."""
+        sorted_labels = state.labels[state.label_order]
+        slots = np.clip(np.searchsorted(sorted_labels, labels), 0, max(len(sorted_labels) - 1, 0))
+        if not len(sorted_labels):
+            return np.full(labels.shape, -1, dtype=np.int64)
+        found = sorted_labels[slots] == labels
+        return np.where(found, state.label_order[slots], -1)
+
+    def _search(self, queries: np.ndarray, k: int, state: Optional[IndexState] = None):
+        """index.search returning row positions instead of FAISS ids (on the current state by default)."""
+        state = state or self._state
+        scores, labels = state.index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+        return scores, self._labels_to_positions(labels, state)
+
+    def _install(self, index: faiss.Index, index_mode: str, cocktails: List[Cocktail], embeddings: np.ndarray,
+                 text_hashes: List[str]) -> None:
+        """Build the new state with its neighbour table, swap it in and persist everything."""
+        state = self._make_state(index, index_mode, cocktails, embeddings, text_hashes,
+                                 self._corpus_hash([c.id for c in cocktails], text_hashes))
+        print(f"Index construit avec {index.ntotal} cocktails")
+        state = self._with_neighbor_table(state)
+        self._state = state
+        self.save_index(state)
     
     def build_index(self, force_rebuild: bool = False) -> None:
-        if not force_rebuild and os.path.exists(self.index_path) and os.path.exists(self.cocktails_path):
+        if not force_rebuild and os.path.exists(self.manifest_path):
             print("Chargement de l'index existant...")
-            self.load_index()
-            return
+            if self.load_index() or self._refresh_index():
+                return
         
         print("Construction de l'index FAISS...")
-        self.cocktails = self.cocktail_service.get_all_cocktails()
-        print(f"Nombre de cocktails récupérés: {len(self.cocktails)}")
+        # One row per cocktail id (the first one wins on a slug collision)
+        cocktails = list({c.id: c for c in reversed(self.cocktail_service.get_all_cocktails())}.values())[::-1]
+        print(f"Nombre de cocktails récupérés: {len(cocktails)}")
         
-        if not self.cocktails:
+        if not cocktails:
             print("Aucun cocktail trouvé")
+            self._state = self._make_state(None, None, [], None, [], None)
             return
         
-        print("Génération des textes des cocktails pour les embeddings...")
-        cocktail_texts = [self._create_cocktail_text(c) for c in self.cocktails]
         print("Génération des embeddings...")
-        self.embeddings = self.model.encode(cocktail_texts, show_progress_bar=True)
-        faiss.normalize_L2(self.embeddings)
-        
-        dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)
-        self.index.add(self.embeddings)
-        
-        print(f"Index construit avec {self.index.ntotal} cocktails")
-        
-        self.save_index()
+        embeddings = self._encode(cocktails)
+        index_mode = choose_index_mode(len(cocktails), self.index_mode_setting)
+        index = build_ann_index(embeddings, np.array([self._label(c.id) for c in cocktails], dtype=np.int64), index_mode)
+        with self._write_lock:
+            self._install(index, index_mode, cocktails, embeddings, [self._text_hash(c) for c in cocktails])
+
+    def _apply_changes(self, index: faiss.Index, index_mode: str, cocktails: List[Optional[Cocktail]],
+                       cocktail_ids: List[str], embeddings: np.ndarray, text_hashes: List[str],
+                       upserts: List[Cocktail], removed_ids: List[str]) -> None:
+        """
+        Remove then (re-)add rows on a copy of the index: only the upserted cocktails are encoded.
+        A trained IVF-PQ index keeps its trained quantizers; an HNSW index, or a catalog that now
+        calls for another index mode, is rebuilt from the stored embeddings instead.
+        """
+        upsert_ids = {c.id for c in upserts}
+        dropped = set(removed_ids) | upsert_ids
+        keep = [row for row, cocktail_id in enumerate(cocktail_ids) if cocktail_id not in dropped]
+        new_embeddings = self._encode(upserts) if upserts else np.empty((0, embeddings.shape[1]), dtype=np.float32)
+        merged = np.concatenate([np.asarray(embeddings[keep], dtype=np.float32), new_embeddings])
+        merged_cocktails = [cocktails[row] for row in keep] + list(upserts)
+
+        target_mode = choose_index_mode(len(merged), self.index_mode_setting)
+        if target_mode == index_mode and supports_removal(index):
+            index = faiss.clone_index(index)
+            stale_labels = [self._label(cocktail_id) for cocktail_id in cocktail_ids if cocktail_id in dropped]
+            if stale_labels:
+                index.remove_ids(np.array(stale_labels, dtype=np.int64))
+            if upserts:
+                index.add_with_ids(new_embeddings, np.array([self._label(c.id) for c in upserts], dtype=np.int64))
+            configure_search(index)
+        else:
+            print(f"Reconstruction de l'index {target_mode} depuis les embeddings enregistrés")
+            labels = np.array([self._label(c.id) for c in merged_cocktails], dtype=np.int64)
+            index = build_ann_index(merged, labels, target_mode)
+        self._install(
+            index,
+            target_mode,
+            merged_cocktails,
+            merged,
+            [text_hashes[row] for row in keep] + [self._text_hash(c) for c in upserts],
+        )
+
+    def add_cocktails(self, cocktails: List[Cocktail]) -> int:
+        """Encode and index new cocktails; returns the number added."""
+        with self._write_lock:
+            self.ensure_index()
+            state = self._state
+            existing = [c.id for c in cocktails if c.id in state.cocktail_lookup.by_id]
+            if existing:
+                raise ValueError(f"Cocktails déjà indexés: {', '.join(existing)}")
+            if cocktails:
+                self._apply_changes(state.index, state.index_mode, state.cocktails, [c.id for c in state.cocktails],
+                                    state.embeddings, state.text_hashes, cocktails, [])
+            return len(cocktails)
+
+    def update_cocktails(self, cocktails: List[Cocktail]) -> int:
+        """Re-encode cocktails whose data changed; returns the number updated."""
+        with self._write_lock:
+            self.ensure_index()
+            state = self._state
+            unknown = [c.id for c in cocktails if c.id not in state.cocktail_lookup.by_id]
+            if unknown:
+                raise ValueError(f"Cocktails non indexés: {', '.join(unknown)}")
+            if cocktails:
+                self._apply_changes(state.index, state.index_mode, state.cocktails, [c.id for c in state.cocktails],
+                                    state.embeddings, state.text_hashes, cocktails, [])
+            return len(cocktails)
+
+    def remove_cocktails(self, cocktail_ids: List[str]) -> int:
+        """Drop cocktails from the index; unknown ids are ignored. Returns the number removed."""
+        with self._write_lock:
+            self.ensure_index()
+            state = self._state
+            removed = [cocktail_id for cocktail_id in set(cocktail_ids) if cocktail_id in state.cocktail_lookup.by_id]
+            if removed:
+                self._apply_changes(state.index, state.index_mode, state.cocktails, [c.id for c in state.cocktails],
+                                    state.embeddings, state.text_hashes, [], removed)
+            return len(removed)
+
+    def _refresh_index(self) -> bool:
+        """Bring a stale saved index up to date, re-encoding only added or edited cocktails."""
+        try:
+            persisted = self._read_persisted()
+            if persisted is None:
+                return False
+            manifest, saved_ids, saved_hashes, saved_embeddings = persisted
+            index = faiss.read_index(self.index_path)
+        except Exception as e:
+            print(f"Erreur chargement index: {e}")
+            return False
+        catalog = {}
+        for cocktail in self.cocktail_service.get_all_cocktails():
+            catalog.setdefault(cocktail.id, cocktail)
+        if not catalog:
+            return False
+
+        saved_hashes_by_id = dict(zip(saved_ids, saved_hashes))
+        removed = [cocktail_id for cocktail_id in saved_ids if cocktail_id not in catalog]
+        upserts = [c for cocktail_id, c in catalog.items() if saved_hashes_by_id.get(cocktail_id) != self._text_hash(c)]
+        print(f"Index mis à jour: {len(upserts)} cocktails ré-encodés, {len(removed)} retirés, "
+              f"{len(catalog) - len(upserts)} réutilisés")
+        with self._write_lock:
+            self._apply_changes(index, manifest["index_mode"], [catalog.get(cocktail_id) for cocktail_id in saved_ids], saved_ids,
+                                saved_embeddings, saved_hashes, upserts, removed)
+        return True
+
+    def _with_neighbor_table(self, state: IndexState) -> IndexState:
+        """All-pairs top-K search in one batched call; K + 1 columns so exclude_self still leaves K."""
+        if state.index is None or state.embeddings is None or state.index.ntotal == 0:
+            return state._replace(neighbor_ids=None, neighbor_scores=None)
+        width = min(self.neighbor_k + 1, state.index.ntotal)
+        scores, ids = self._search(state.embeddings, width, state)
+        return state._replace(neighbor_ids=ids.astype(np.int32), neighbor_scores=scores.astype(np.float32))
+
+    def _load_neighbor_table(self, state: IndexState) -> Optional[IndexState]:
+        try:
+            with np.load(self.neighbors_path) as data:
+                ids, scores = data["ids"], data["scores"]
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Table des voisins illisible: {e}")
+            return None
+        if ids.shape[0] != len(state.cocktails) or ids.shape != scores.shape:
+            print("Table des voisins obsolète")
+            return None
+        return state._replace(neighbor_ids=ids, neighbor_scores=scores)
     
-    def save_index(self) -> None:
-        if self.index is None:
+    @classmethod
+    def _atomic_write(cls, path: str, write) -> None:
+        """Write to a temporary file then rename it, so readers mapping the old file are never truncated."""
+        cls._replace_all([(path, write)])
+
+    @staticmethod
+    def _replace_all(writes) -> None:
+        """
+        Write every (path, write) pair to a temporary file first, then rename them in order.
+        Nothing is replaced until every file is written, and the last pair lands last.
+        """
+        staged = []
+        try:
+            for path, write in writes:
+                directory = os.path.dirname(path) or "."
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=os.path.splitext(path)[1])
+                staged.append((tmp_path, path))
+                with os.fdopen(fd, 'wb') as f:
+                    write(f)
+        except BaseException:
+            for tmp_path, _ in staged:
+                os.unlink(tmp_path)
+            raise
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+
+    def save_index(self, state: Optional[IndexState] = None) -> None:
+        state = state or self._state
+        if state.index is None:
             return
         os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-        faiss.write_index(self.index, self.index_path)
-        with open(self.cocktails_path, 'wb') as f:
-            pickle.dump(self.cocktails, f)
-        with open(self.embeddings_path, 'wb') as f:
-            pickle.dump(self.embeddings, f)
+        cocktail_ids = np.array([c.id for c in state.cocktails], dtype=np.str_)
+        manifest = {
+            "model_name": self.model_name,
+            "index_mode": state.index_mode,
+            "index_type": index_factory_string(state.index_mode, state.index.ntotal, int(state.embeddings.shape[1])),
+            "dimension": int(state.embeddings.shape[1]),
+            "count": len(state.cocktails),
+            "corpus_hash": state.corpus_hash,
+        }
+        writes = [
+            (self.index_path, lambda f: f.write(faiss.serialize_index(state.index).tobytes())),
+            (self.embeddings_path, lambda f: np.save(f, np.ascontiguousarray(state.embeddings, dtype=np.float32))),
+            (self.cocktail_ids_path, lambda f: np.save(f, cocktail_ids)),
+            (self.text_hashes_path, lambda f: np.save(f, np.array(state.text_hashes, dtype=np.str_))),
+        ]
+        if state.neighbor_ids is not None:
+            writes.append((self.neighbors_path, lambda f: np.savez(f, ids=state.neighbor_ids, scores=state.neighbor_scores)))
+        # The manifest stays in place and is replaced last: a worker starting meanwhile still finds an
+        # index to load, and load_index rejects files that do not match the manifest's corpus hash
+        writes.append((self.manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8'))))
+        self._replace_all(writes)
         print("Index sauvegardé")
+
+    def _save_neighbor_table(self, state: IndexState) -> None:
+        self._atomic_write(self.neighbors_path, lambda f: np.savez(f, ids=state.neighbor_ids, scores=state.neighbor_scores))
     
+    def _read_persisted(self) -> Optional[tuple]:
+        """Manifest, cocktail ids, text hashes and memory-mapped embeddings saved for the current model."""
+        paths = (self.manifest_path, self.index_path, self.embeddings_path, self.cocktail_ids_path, self.text_hashes_path)
+        if not all(os.path.exists(p) for p in paths):
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("model_name") != self.model_name:
+            print(f"Index construit avec un autre modèle ({manifest.get('model_name')})")
+            return None
+        if manifest.get("index_mode") not in ("flat", "hnsw", "ivfpq"):
+            print("Manifeste sans type d'index: reconstruction")
+            return None
+        cocktail_ids = [str(i) for i in np.load(self.cocktail_ids_path, allow_pickle=False)]
+        text_hashes = [str(h) for h in np.load(self.text_hashes_path, allow_pickle=False)]
+        embeddings = np.load(self.embeddings_path, mmap_mode='r', allow_pickle=False)
+        if embeddings.shape != (len(cocktail_ids), manifest.get("dimension")) or len(text_hashes) != len(cocktail_ids):
+            print("Embeddings incohérents avec le manifeste")
+            return None
+        return manifest, cocktail_ids, text_hashes, embeddings
+
     def load_index(self) -> bool:
+        """Load the saved index if it still matches the catalog (same model, same embedding texts)."""
         try:
-            if not os.path.exists(self.index_path) or not os.path.exists(self.cocktails_path):
+            persisted = self._read_persisted()
+            if persisted is None:
+                return False
+            manifest, cocktail_ids, _, embeddings = persisted
+
+            # Re-hydrate the cocktails from the parser instead of unpickling copies
+            lookup = self.cocktail_service.get_cocktail_lookup()
+            cocktails = [lookup.get_by_id(cocktail_id) for cocktail_id in cocktail_ids]
+            if any(c is None for c in cocktails) or len(cocktails) != len(lookup.by_id):
+                print("Index obsolète: le catalogue a changé")
+                return False
+            text_hashes = [self._text_hash(c) for c in cocktails]
+            if self._corpus_hash(cocktail_ids, text_hashes) != manifest.get("corpus_hash"):
+                print("Index obsolète: des textes de cocktails ont changé")
+                return False
+            if manifest["index_mode"] != choose_index_mode(len(cocktails), self.index_mode_setting):
+                print(f"Index {manifest['index_mode']} à remplacer par un index {choose_index_mode(len(cocktails), self.index_mode_setting)}")
+                return False
+
+            # Trained quantizers (IVF-PQ) and graphs (HNSW) come back as saved: nothing is retrained
+            index = faiss.read_index(self.index_path)
+            if index.ntotal != len(cocktails):
+                print("Index FAISS incohérent avec le manifeste")
                 return False
-            self.index = faiss.read_index(self.index_path)
-            with open(self.cocktails_path, 'rb') as f:
-                self.cocktails = pickle.load(f)
-            if os.path.exists(self.embeddings_path):
-                with open(self.embeddings_path, 'rb') as f:
-                    self.embeddings = pickle.load(f)
-            print(f"Index chargé: {len(self.cocktails)} cocktails")
+            configure_search(index)
+
+            state = self._make_state(index, manifest["index_mode"], cocktails, embeddings, text_hashes,
+                                     manifest["corpus_hash"])
+            loaded = self._load_neighbor_table(state) if os.path.exists(self.neighbors_path) else None
+            if loaded is None:
+                # Index saved before the neighbour table existed: compute it once and persist it
+                loaded = self._with_neighbor_table(state)
+                if loaded.neighbor_ids is not None:
+                    self._save_neighbor_table(loaded)
+            self._state = loaded
+            print(f"Index chargé: {len(cocktails)} cocktails")
             return True
         except Exception as e:
             print(f"Erreur chargement index: {e}")
             return False
     
     def find_similar_cocktails(self, cocktail_id: str, top_k: int = 5, exclude_self: bool = True) -> List[Dict[str, Any]]:
-        if self.index is None or not self.cocktails:
-            self.build_index()
-        if self.index is None or not self.cocktails:
+        if not self.ensure_index():
             return []
+        state = self._state
         
-        original_cocktail_idx = None
-        for idx, cocktail in enumerate(self.cocktails):
-            if cocktail.id == cocktail_id:
-                original_cocktail_idx = idx
-                break
+        original_cocktail_idx = state.cocktail_lookup.position(cocktail_id)
         if original_cocktail_idx is None:
             return []
+
+        if state.neighbor_ids is not None and top_k <= state.neighbor_ids.shape[1] - 1:
+            return self._similar_from_table(state, original_cocktail_idx, top_k, exclude_self)
         
-        query_embedding = self.embeddings[original_cocktail_idx:original_cocktail_idx+1]
+        query_embedding = state.embeddings[original_cocktail_idx:original_cocktail_idx+1]
         k = top_k + 1 if exclude_self else top_k
-        distances, indices = self.index.search(query_embedding, k)
+        distances, indices = self._search(query_embedding, k, state)
         
         results = []
         for idx, (distance, result_idx) in enumerate(zip(distances[0], indices[0])):
-            if exclude_self and result_idx == original_cocktail_idx:
+            if result_idx < 0 or (exclude_self and result_idx == original_cocktail_idx):
                 continue
             if len(results) >= top_k:
                 break
-            cocktail = self.cocktails[result_idx]
+            cocktail = state.cocktails[result_idx]
             results.append({"cocktail": cocktail, "similarity_score": float(distance), "rank": len(results) + 1})
         return results
     
-    def find_similar_by_text(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Recherche sémantique de cocktails par texte libre (RAG)."""
-        if self.index is None or not self.cocktails:
-            self.build_index()
-        if self.index is None or not self.cocktails:
-            return []
-        
-        query_embedding = self.model.encode([query_text])
-        faiss.normalize_L2(query_embedding)
-        distances, indices = self.index.search(query_embedding, top_k)
+    @staticmethod
+    def _similar_from_table(state: IndexState, position: int, top_k: int, exclude_self: bool) -> List[Dict[str, Any]]:
+        results = []
+        for result_idx, score in zip(state.neighbor_ids[position], state.neighbor_scores[position]):
+            if result_idx < 0 or (exclude_self and result_idx == position):
+                continue
+            if len(results) >= top_k:
+                break
+            results.append({"cocktail": state.cocktails[result_idx], "similarity_score": float(score), "rank": len(results) + 1})
+        return results
+
+    def _encode_query(self, query_text: str) -> np.ndarray:
+        """Normalised embedding of a search query, shape (1, dim), served from the LRU cache when possible."""
+        vector = self.query_cache.get(query_text)
+        if vector is None:
+            vector = self.encoder.encode(query_text)
+            self.query_cache.set(query_text, vector)
+        return vector.reshape(1, -1)
+
+    async def _encode_query_async(self, query_text: str) -> np.ndarray:
+        vector = self.query_cache.get(query_text)
+        if vector is None:
+            vector = await self.encoder.encode_async(query_text)
+            self.query_cache.set(query_text, vector)
+        return vector.reshape(1, -1)
+
+    def _results_for_query(self, query_embedding: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        state = self._state
+        distances, indices = self._search(query_embedding, top_k, state)
         
         results = []
-        for idx, (distance, cocktail_idx) in enumerate(zip(distances[0], indices[0])):
-            cocktail = self.cocktails[cocktail_idx]
-            results.append({"cocktail": cocktail, "similarity_score": float(distance), "rank": idx + 1})
+        for distance, cocktail_idx in zip(distances[0], indices[0]):
+            if cocktail_idx < 0:
+                continue
+            cocktail = state.cocktails[cocktail_idx]
+            results.append({"cocktail": cocktail, "similarity_score": float(distance), "rank": len(results) + 1})
         return results
+
+    def find_similar_by_text(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Recherche sémantique de cocktails par texte libre (RAG)."""
+        if not self.ensure_index():
+            return []
+        return self._results_for_query(self._encode_query(query_text), top_k)
+
+    async def find_similar_by_text_async(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Same as find_similar_by_text, awaiting the batched encoder instead of blocking the event loop."""
+        if self.index is None:
+            await asyncio.to_thread(self.ensure_index)
+        if not self.cocktails:
+            return []
+        return self._results_for_query(await self._encode_query_async(query_text), top_k)
     
+    @staticmethod
+    def _ingredients_query(ingredients: List[str]) -> str:
+        return f"Cocktail avec les ingrédients: {', '.join(ingredients)}"
+
     def find_similar_by_ingredients(self, ingredients: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
-        query_text = f"Cocktail avec les ingrédients: {', '.join(ingredients)}"
-        return self.find_similar_by_text(query_text, top_k)
-    
-    def _generate_cluster_title(self, cocktails: List[Cocktail]) -> str:
-        """Generate a vibe/title for a cluster using LLM based on cocktail characteristics."""
-        # Check cache first
-        cache_key = self._get_cluster_cache_key(cocktails)
-        cached_title = self.title_cache.get(cache_key)
-        if cached_title:
-            return cached_title
+        return self.find_similar_by_text(self._ingredients_query(ingredients), top_k)
 
+    async def find_similar_by_ingredients_async(self, ingredients: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
+        return await self.find_similar_by_text_async(self._ingredients_query(ingredients), top_k)
+    
+    def _cluster_title_prompt(self, cocktails: List[Cocktail]) -> str:
         # Create a summary of the cocktails in the cluster
         cocktail_info = []
         for cocktail in cocktails[:5]:  # Use top 5 closest cocktails
@@ -181,95 +630,297 @@ class SimilarityService:
         
         cocktails_text = "\n".join(cocktail_info)
         
-        prompt = f"""Based on these cocktails, generate a short, catchy title (2-4 words) that captures the common vibe or theme of the group. The title should be evocative and creative, like "Tropical Paradise", "Classic Elegance", "Bold & Spicy", "Citrus Dreams", etc.
+        return f"""Based on these cocktails, generate a short, catchy title (2-4 words) that captures the common vibe or theme of the group. The title should be evocative and creative, like "Tropical Paradise", "Classic Elegance", "Bold & Spicy", "Citrus Dreams", etc.
                      Cocktails: 
                      {cocktails_text}
                      Respond with ONLY the title, nothing else."""
-        
+
+    def _generate_cluster_title(self, cocktails: List[Cocktail]) -> str:
+        """Generate a vibe/title for a cluster using LLM based on cocktail characteristics."""
+        # Check cache first
+        cache_key = self._get_cluster_cache_key(cocktails)
+        cached_title = self.title_cache.get(cache_key)
+        if cached_title:
+            return cached_title
+
         try:
-            title = self.llm_service.example(prompt).strip()
+            # Timeouts and identical in-flight prompts are handled by the LLM service
+            title = self.llm_service.example(self._cluster_title_prompt(cocktails)).strip()
             # Remove quotes if present
             title = title.strip('"').strip("'")
+            if not title:
+                return self.FALLBACK_CLUSTER_TITLE
             # Cache the result
             self.title_cache.set(cache_key, title)
             return title
         except Exception as e:
             print(f"Error generating cluster title: {e}")
-            return f"Cluster Vibe"
+            return self.FALLBACK_CLUSTER_TITLE
+
+    async def _generate_cluster_titles_async(self, groups: List[List[Cocktail]]) -> List[str]:
+        """Titles of several clusters, with at most title_concurrency LLM requests at a time."""
+        semaphore = asyncio.Semaphore(self.title_concurrency)
+
+        async def generate(cocktails: List[Cocktail]) -> str:
+            cached_title = self.title_cache.get(self._get_cluster_cache_key(cocktails))
+            if cached_title:
+                return cached_title
+            async with semaphore:
+                return await asyncio.to_thread(self._generate_cluster_title, cocktails)
+
+        return list(await asyncio.gather(*(generate(cocktails) for cocktails in groups)))
+
+    def _generate_cluster_titles(self, groups: List[List[Cocktail]]) -> List[str]:
+        """Blocking front end of _generate_cluster_titles_async (for worker threads, not the event loop)."""
+        if not groups:
+            return []
+        return asyncio.run(self._generate_cluster_titles_async(groups))
     
+    def _clusters_file(self, n_clusters: int) -> str:
+        return self.clusters_path.format(n_clusters=n_clusters)
+
+    def _clusters_lock_path(self) -> str:
+        return os.path.join(os.path.dirname(self.clusters_path) or ".", "faiss_clusters.lock")
+
+    def _clusters_from(self, clustering: Clustering) -> Dict[int, VibeCluster]:
+        """VibeClusters of a clustering (empty clusters are left out)."""
+        clusters: Dict[int, VibeCluster] = {}
+        for cocktail_id, label in zip(clustering.cocktail_ids, clustering.assignments):
+            label_int = int(label)
+            if label_int not in clusters:
+                clusters[label_int] = VibeCluster(
+                    cluster_id=label_int,
+                    title=clustering.titles[label_int] or None,
+                    center=clustering.centroids[label_int].tolist(),
+                    cocktail_ids=[],
+                    closest_to_center=clustering.closest[label_int]
+                )
+            clusters[label_int].cocktail_ids.append(cocktail_id)
+        return dict(sorted(clusters.items()))
+
+    def _use_clusters(self, clustering: Clustering) -> Dict[int, VibeCluster]:
+        """Cache the clusters of a clustering of the current catalog and tag its cocktails."""
+        clusters = self._clusters_from(clustering)
+        for cocktail_id, label in zip(clustering.cocktail_ids, clustering.assignments):
+            cocktail = self.cocktail_lookup.get_by_id(cocktail_id)
+            if cocktail is not None:
+                cocktail.vibe_id = int(label)
+        self.clusters_cache.set(f"clusters_{clustering.n_clusters}_{clustering.corpus_hash}", clusters)
+        self._cluster_scores[clustering.n_clusters] = (clustering.corpus_hash, clustering.silhouette)
+        return clusters
+
+    def _silhouette_sample_for(self, corpus_hash: str, embeddings: np.ndarray) -> SilhouetteSample:
+        if self._silhouette_sample is None or self._silhouette_sample[0] != corpus_hash:
+            self._silhouette_sample = (corpus_hash, silhouette_sample(embeddings))
+        return self._silhouette_sample[1]
+
+    def _load_clusters(self, n_clusters: int) -> Optional[Clustering]:
+        clustering = load_clustering(self._clusters_file(n_clusters))
+        if clustering is None or clustering.model_name != self.model_name or clustering.n_clusters != n_clusters:
+            return None
+        return clustering
+
+    def get_clusters(self, n_clusters: int = 6) -> Optional[Dict[int, VibeCluster]]:
+        """
+        Clusters for the request path: never trains k-means.
+
+        Returns the clusters of the current catalog from memory or disk. When they are missing
+        or were computed from an older catalog (or the index is not loaded yet), they are
+        computed in the background and the saved clusters, if any, are returned meanwhile.
+        None means there is nothing to show yet.
+        """
+        state = self._state
+        if state.index is not None:
+            cached_clusters = self.clusters_cache.get(f"clusters_{n_clusters}_{state.corpus_hash}")
+            if cached_clusters:
+                return cached_clusters
+        clustering = self._load_clusters(n_clusters)
+        if clustering is not None and state.index is not None and clustering.corpus_hash == state.corpus_hash:
+            return self._use_clusters(clustering)
+        self.schedule_clusters(n_clusters)
+        return self._clusters_from(clustering) if clustering is not None else None
+
+    def schedule_clusters(self, n_clusters: int) -> bool:
+        """Compute the clusters in a background thread unless that is already under way."""
+        with self._pending_lock:
+            if n_clusters in self._pending_clusters:
+                return False
+            self._pending_clusters.add(n_clusters)
+
+        def run():
+            try:
+                self.create_cocktails_clusters(n_clusters)
+            except Exception as e:
+                print(f"Error computing clusters (n_clusters={n_clusters}): {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending_clusters.discard(n_clusters)
+
+        threading.Thread(target=run, name=f"clusters-{n_clusters}", daemon=True).start()
+        return True
+
     def create_cocktails_clusters(self, n_clusters: int = 6) -> Dict[int, VibeCluster]:
         """Regroupe les cocktails en clusters basés sur leurs embeddings."""
+        if not self.ensure_index():
+            return {}
+
         # Check cache first
-        cache_key = f"clusters_{n_clusters}"
+        cache_key = f"clusters_{n_clusters}_{self.corpus_hash}"
         cached_clusters = self.clusters_cache.get(cache_key)
         if cached_clusters:
             print(f"Using cached clusters (n_clusters={n_clusters})")
             return cached_clusters
 
-        if self.index is None or not self.cocktails:
-            self.build_index()
-        if self.index is None or not self.cocktails:
-            return {}
-        
-        d = self.embeddings.shape[1]
-
-        kmeans = faiss.Kmeans(
-            d=d,
-            k=n_clusters,
-            niter=50,
-            nredo=5,
-            verbose=True,
-            gpu=False
-        )
-        kmeans.train(self.embeddings)
-        labels = kmeans.index.search(self.embeddings, 1)[1].flatten()
-        distances = kmeans.index.search(self.embeddings, 1)[0].flatten()
+        with self._clusters_lock:
+            # Consistent snapshot of the index state, even if cocktails are added meanwhile
+            state = self._state
+            cocktails, embeddings, corpus_hash = state.cocktails, state.embeddings, state.corpus_hash
 
-        #create clusters dictionary
-        clusters: Dict[int, VibeCluster] = {}
-        for idx, label in enumerate(labels):
-            cocktail = self.cocktails[idx]
-            distance = float(distances[idx])  # Convert numpy to Python float
-            label_int = int(label)  # Convert numpy.int64 to Python int
-            if label_int not in clusters:
-                clusters[label_int] = VibeCluster(
-                    cluster_id=label_int,
-                    title=None,
-                    center=None,
-                    cocktail_ids=[],
-                    closest_to_center=[]
+            # Workers sharing backend/data train each clustering once: the others wait, then load it
+            with clustering_lock(self._clusters_lock_path()):
+                previous = self._load_clusters(n_clusters)
+                if previous is not None and previous.corpus_hash == corpus_hash:
+                    print(f"Using saved clusters (n_clusters={n_clusters})")
+                    return self._use_clusters(previous)
+
+                cocktail_ids = [c.id for c in cocktails]
+                init_centroids = warm_start_centroids(previous, self.model_name, cocktail_ids, embeddings.shape[1])
+                print(f"Clustering {len(cocktails)} cocktails (n_clusters={n_clusters}, "
+                      f"{'warm start' if init_centroids is not None else 'cold start'})")
+                centroids = train_kmeans(embeddings, n_clusters, init_centroids=init_centroids)
+                assignments, closest_positions = assign_clusters(embeddings, centroids)
+                silhouette = silhouette_score(self._silhouette_sample_for(corpus_hash, embeddings), assignments)
+
+                # Titles of clusters whose closest cocktails did not change are reused without the LLM
+                if previous is not None:
+                    for closest, title in zip(previous.closest, previous.titles):
+                        if title and title != self.FALLBACK_CLUSTER_TITLE and closest[:5]:
+                            self.title_cache.set(self._title_cache_key(closest[:5]), title)
+
+                closest = []
+                title_groups = {}
+                for cluster_id in range(n_clusters):
+                    members = assignments == cluster_id
+                    # Keep track of the top 10 closest to center that belong to the cluster
+                    closest.append([cocktail_ids[int(i)] for i in closest_positions[cluster_id]
+                                    if i >= 0 and members[int(i)]])
+                    closest_cocktails = [cocktails[int(i)] for i in closest_positions[cluster_id]
+                                         if i >= 0 and members[int(i)]][:5]
+                    if closest_cocktails:
+                        title_groups[cluster_id] = closest_cocktails
+
+                # One LLM request per cluster, sent concurrently
+                generated = dict(zip(title_groups, self._generate_cluster_titles(list(title_groups.values()))))
+                titles = []
+                for cluster_id in range(n_clusters):
+                    size = int((assignments == cluster_id).sum())
+                    if not size:
+                        titles.append("")
+                    elif cluster_id in generated:
+                        titles.append(generated[cluster_id])
+                        print(f"Cluster {cluster_id}: '{titles[-1]}' with {size} cocktails.")
+                    else:
+                        titles.append(f"Vibe {cluster_id}")
+                        print(f"Cluster {cluster_id} has {size} cocktails.")
+
+                clustering = Clustering(
+                    n_clusters=n_clusters,
+                    model_name=self.model_name,
+                    corpus_hash=corpus_hash,
+                    cocktail_ids=cocktail_ids,
+                    assignments=assignments,
+                    centroids=centroids,
+                    closest=closest,
+                    titles=titles,
+                    silhouette=silhouette,
                 )
-            clusters[label_int].cocktail_ids.append(cocktail.id)
-            cocktail.vibe_id = label_int
+                try:
+                    save_clustering(self._clusters_file(n_clusters), clustering)
+                except OSError as e:
+                    print(f"Could not save clusters: {e}")
+                # Cache the clusters
+                clusters = self._use_clusters(clustering)
+                print(f"Clusters cached (n_clusters={n_clusters}, silhouette {silhouette:.3f})")
         
-        # Keep track of closest cocktails to center
-        centroids = kmeans.centroids
-        index_centroid = faiss.IndexFlatIP(d)
-        index_centroid.add(self.embeddings)
-
-        D, I = index_centroid.search(
-            centroids,
-            10  # Top 10 closest to center
-        )
+        return clusters
 
-        for cluster_id, cluster in clusters.items():
-            closest_ids = I[cluster_id]
-            closest_cocktail_ids = [self.cocktails[int(i)].id for i in closest_ids if self.cocktails[int(i)].id in cluster.cocktail_ids]
-            cluster.closest_to_center = closest_cocktail_ids
-            # Convert centroid to Python list of floats
-            cluster.center = centroids[cluster_id].tolist()
-
-        for cluster_id, cluster in clusters.items():
-            closest_cocktails = [c for c in self.cocktails if c.id in cluster.closest_to_center[:5]]
-            if closest_cocktails:
-                cluster.title = self._generate_cluster_title(closest_cocktails)
-                print(f"Cluster {cluster_id}: '{cluster.title}' with {len(cluster.cocktail_ids)} cocktails.")
+    def precompute_clusters(self, n_values=N_CLUSTERS_RANGE) -> Dict[int, float]:
+        """
+        Compute (or load) the clusters of every n_clusters the API accepts, so that requests are
+        lookups. All of them share the index embeddings and one silhouette sample; returns the scores.
+        """
+        if not self.ensure_index():
+            return {}
+        start = time.perf_counter()
+        # Clusterings already saved for this catalog (by another worker or an earlier run) are only loaded
+        saved = self.cluster_scores()
+        for n_clusters in n_values:
+            if n_clusters > len(self.cocktails):
+                break
+            if n_clusters in saved:
+                self.get_clusters(n_clusters)
             else:
-                cluster.title = f"Vibe {cluster_id}"
-                print(f"Cluster {cluster_id} has {len(cluster.cocktail_ids)} cocktails.")
+                self.create_cocktails_clusters(n_clusters)
+        self.timings["cluster_sweep"] = time.perf_counter() - start
+        scores = self.cluster_scores()
+        print(f"Clusters ready for n_clusters in {list(scores)} in {self.timings['cluster_sweep']:.2f}s, "
+              f"recommended: {self.recommended_n_clusters()}")
+        return scores
 
-        # Cache the clusters
-        self.clusters_cache.set(cache_key, clusters)
-        print(f"Clusters cached (n_clusters={n_clusters})")
-        
-        return clusters
\ No newline at end of file
+    def schedule_cluster_sweep(self) -> bool:
+        """Run precompute_clusters in a background thread unless a sweep is already running."""
+        with self._pending_lock:
+            if self._sweep_running:
+                return False
+            self._sweep_running = True
+
+        def run():
+            try:
+                self.precompute_clusters()
+            except Exception as e:
+                print(f"Error computing the cluster sweep: {e}")
+            finally:
+                with self._pending_lock:
+                    self._sweep_running = False
+
+        threading.Thread(target=run, name="cluster-sweep", daemon=True).start()
+        return True
+
+    @property
+    def sweep_running(self) -> bool:
+        return self._sweep_running
+
+    def cluster_scores(self) -> Dict[int, float]:
+        """Silhouette score of each n_clusters already clustered for the current catalog (no training)."""
+        state = self._state
+        if state.index is None:
+            return {}
+        scores = {}
+        for n_clusters in N_CLUSTERS_RANGE:
+            if self._cluster_scores.get(n_clusters, (None,))[0] != state.corpus_hash:
+                clustering = self._load_clusters(n_clusters)
+                if clustering is None or clustering.corpus_hash != state.corpus_hash:
+                    continue
+                self._cluster_scores[n_clusters] = (clustering.corpus_hash, clustering.silhouette)
+            scores[n_clusters] = self._cluster_scores[n_clusters][1]
+        return scores
+
+    def recommended_n_clusters(self) -> Optional[int]:
+        """n_clusters with the best silhouette score among the computed ones."""
+        scores = self.cluster_scores()
+        return max(scores, key=scores.get) if scores else None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the vibe clusters of every n_clusters the API accepts")
+    parser.add_argument("--min", type=int, default=N_CLUSTERS_RANGE.start)
+    parser.add_argument("--max", type=int, default=N_CLUSTERS_RANGE.stop - 1)
+    args = parser.parse_args()
+    service = SimilarityService()
+    scores = service.precompute_clusters(range(args.min, args.max + 1))
+    recommended = service.recommended_n_clusters()
+    print(f"{'n_clusters':>10} {'silhouette':>10}")
+    for n_clusters, score in scores.items():
+        print(f"{n_clusters:>10} {score:10.3f}{'  <- recommended' if n_clusters == recommended else ''}")
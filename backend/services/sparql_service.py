@@ -11,22 +11,35 @@ class SparqlService:
         # ONLY LOCAL GRAPH - NO EXTERNAL DBPEDIA QUERIES ALLOWED
         self.local_graph_path = "data.ttl"
 
+        self._local_graph: Optional[Graph] = None
+
         # If local_graph is a Graph object, use it directly
         if isinstance(local_graph, Graph):
-            self.local_graph = local_graph
+            self._local_graph = local_graph
             self.parser = None
             return
 
         # Use the singleton parser - it handles caching internally
         try:
             self.parser = IBADataParser()
-            self.local_graph = self.parser.graph
         except Exception as e:
             print(f"Error loading parser: {e}")
             # Fallback to shared graph if parser fails
-            self.local_graph = get_shared_graph()
+            self._local_graph = get_shared_graph()
             self.parser = None
 
+    @property
+    def local_graph(self) -> Optional[Graph]:
+        # Resolved on first use: when the parser was loaded from its binary
+        # snapshot, the RDF graph is only rebuilt once a query needs it
+        if self._local_graph is None and self.parser is not None:
+            self._local_graph = self.parser.graph
+        return self._local_graph
+
+    @local_graph.setter
+    def local_graph(self, graph: Optional[Graph]):
+        self._local_graph = graph
+
     def execute_query(self, query: str):
         """Execute SPARQL query - ONLY ON LOCAL GRAPH"""
         # All queries go to local graph - no external access
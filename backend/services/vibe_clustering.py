@@ -0,0 +1,200 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import List, NamedTuple, Optional, Tuple
+
+import faiss
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock between processes, each worker may cluster on its own
+    fcntl = None
+
+KMEANS_NITER = 50
+KMEANS_NREDO = 5
+# A warm start begins next to the answer: a few iterations and a single run are enough
+WARM_START_NITER = 10
+# Share of the previous clustering's cocktails still in the catalog needed to reuse its centroids
+WARM_START_MIN_OVERLAP = 0.8
+CLOSEST_TO_CENTER = 10
+# n_clusters values accepted by the API, all precomputed by the sweep
+N_CLUSTERS_RANGE = range(2, 21)
+# Computed right after the warm-up: the /cocktails/clusters default and the home page's collections
+WARM_N_CLUSTERS = (6, 3)
+# Silhouette scores are estimated on a sample: exact pairwise distances are quadratic
+SILHOUETTE_SAMPLE_SIZE = 1000
+
+
+class Clustering(NamedTuple):
+    """A k-means clustering of the catalog, as persisted per n_clusters."""
+    n_clusters: int
+    model_name: str
+    # Fingerprint of the embedded texts the clustering was computed from (SimilarityService._corpus_hash)
+    corpus_hash: str
+    cocktail_ids: List[str]
+    # Cluster of each cocktail in cocktail_ids
+    assignments: np.ndarray
+    centroids: np.ndarray
+    # Per cluster, ids of the cocktails of that cluster closest to its centroid
+    closest: List[List[str]]
+    titles: List[str]
+    # Mean silhouette coefficient of the clustering (higher is better, in [-1, 1])
+    silhouette: float = 0.0
+
+
+class SilhouetteSample(NamedTuple):
+    """Rows sampled from an embedding matrix and their pairwise distances, shared by every k of a sweep."""
+    positions: np.ndarray
+    distances: np.ndarray
+
+
+def train_kmeans(embeddings: np.ndarray, n_clusters: int, init_centroids: Optional[np.ndarray] = None,
+                 seed: int = 1234) -> np.ndarray:
+    """Centroids of a k-means over the embeddings, refined from init_centroids when given."""
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    warm = init_centroids is not None
+    kmeans = faiss.Kmeans(
+        d=embeddings.shape[1],
+        k=n_clusters,
+        niter=WARM_START_NITER if warm else KMEANS_NITER,
+        nredo=1 if warm else KMEANS_NREDO,
+        seed=seed,
+        verbose=False,
+        gpu=False,
+    )
+    kmeans.train(embeddings, init_centroids=np.ascontiguousarray(init_centroids, dtype=np.float32) if warm else None)
+    return kmeans.centroids
+
+
+def assign_clusters(embeddings: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster of each embedding (one search against the centroids) and, per centroid,
+    the positions of the CLOSEST_TO_CENTER embeddings with the highest inner product (-1 padded).
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+    centroid_index = faiss.IndexFlatL2(centroids.shape[1])
+    centroid_index.add(centroids)
+    assignments = centroid_index.search(embeddings, 1)[1][:, 0].astype(np.int32)
+
+    embedding_index = faiss.IndexFlatIP(embeddings.shape[1])
+    embedding_index.add(embeddings)
+    closest = embedding_index.search(centroids, min(CLOSEST_TO_CENTER, len(embeddings)))[1]
+    return assignments, closest
+
+
+def silhouette_sample(embeddings: np.ndarray, sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+                      seed: int = 0) -> SilhouetteSample:
+    """Euclidean distances between (at most sample_size) rows of the embeddings."""
+    n = len(embeddings)
+    if n > sample_size:
+        positions = np.sort(np.random.default_rng(seed).choice(n, size=sample_size, replace=False))
+    else:
+        positions = np.arange(n)
+    vectors = np.asarray(embeddings[positions], dtype=np.float32)
+    norms = (vectors * vectors).sum(axis=1)
+    squared = norms[:, None] + norms[None, :] - 2 * vectors @ vectors.T
+    return SilhouetteSample(positions, np.sqrt(np.clip(squared, 0, None)))
+
+
+def silhouette_score(sample: SilhouetteSample, assignments: np.ndarray) -> float:
+    """
+    Mean silhouette coefficient of the sampled rows: (b - a) / max(a, b), with a the mean distance
+    to the rest of their cluster and b the mean distance to the nearest other cluster.
+    Rows alone in their cluster count as 0; a single cluster scores 0.
+    """
+    labels = np.asarray(assignments)[sample.positions]
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return 0.0
+    members = labels[None, :] == clusters[:, None]
+    sizes = members.sum(axis=1)
+    # Mean distance from every sampled row to every cluster
+    sums = sample.distances @ members.T.astype(sample.distances.dtype)
+    own = np.searchsorted(clusters, labels)
+    rows = np.arange(len(labels))
+    own_sizes = sizes[own]
+    a = np.divide(sums[rows, own], own_sizes - 1, out=np.zeros(len(labels)), where=own_sizes > 1)
+    means = sums / sizes[None, :]
+    means[rows, own] = np.inf
+    b = means.min(axis=1)
+    scores = np.where(own_sizes > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+    return float(scores.mean())
+
+
+def warm_start_centroids(previous: Optional[Clustering], model_name: str, cocktail_ids: List[str],
+                         dimension: int) -> Optional[np.ndarray]:
+    """Centroids of a previous clustering worth refining instead of starting over, if any."""
+    if previous is None or previous.model_name != model_name or previous.centroids.shape[1] != dimension:
+        return None
+    if not previous.cocktail_ids:
+        return None
+    kept = len(set(previous.cocktail_ids) & set(cocktail_ids))
+    if kept / len(previous.cocktail_ids) < WARM_START_MIN_OVERLAP:
+        return None
+    return previous.centroids
+
+
+@contextmanager
+def clustering_lock(path: str):
+    """Exclusive lock on path shared by every process (flock), held for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def save_clustering(path: str, clustering: Clustering) -> None:
+    """Write a clustering atomically (npz, no pickles)."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    width = max([len(ids) for ids in clustering.closest] + [1])
+    closest = np.array([ids + [""] * (width - len(ids)) for ids in clustering.closest], dtype=np.str_)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(
+                f,
+                n_clusters=np.array(clustering.n_clusters),
+                model_name=np.array(clustering.model_name),
+                corpus_hash=np.array(clustering.corpus_hash),
+                cocktail_ids=np.array(clustering.cocktail_ids, dtype=np.str_),
+                assignments=np.asarray(clustering.assignments, dtype=np.int32),
+                centroids=np.asarray(clustering.centroids, dtype=np.float32),
+                closest=closest,
+                titles=np.array(clustering.titles, dtype=np.str_),
+                silhouette=np.array(clustering.silhouette, dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_clustering(path: str) -> Optional[Clustering]:
+    """Clustering written by save_clustering, or None if missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return Clustering(
+                n_clusters=int(data["n_clusters"]),
+                model_name=str(data["model_name"]),
+                corpus_hash=str(data["corpus_hash"]),
+                cocktail_ids=[str(i) for i in data["cocktail_ids"]],
+                assignments=data["assignments"],
+                centroids=data["centroids"],
+                closest=[[str(i) for i in row if i] for row in data["closest"]],
+                titles=[str(t) for t in data["titles"]],
+                silhouette=float(data["silhouette"]) if "silhouette" in data.files else 0.0,
+            )
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Could not load clustering {path}: {e}")
+        return None
@@ -11,6 +11,11 @@ from pathlib import Path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
+# Keep inventories in memory instead of the SQLite file under backend/data
+os.environ.setdefault("MARMITONIC_INVENTORY_STORE", "memory")
+# Do not load the embedding model in the background whenever a test starts the app
+os.environ.setdefault("MARMITONIC_SIMILARITY_WARMUP", "off")
+
 
 @pytest.fixture(scope="session")
 def test_data_dir():
@@ -22,4 +27,7 @@ def test_data_dir():
 def reset_singletons():
     """Reset any singleton instances between tests"""
     yield
-    # Add cleanup code here if needed
+    from backend.services.inventory_store import reset_inventory_store
+    from backend.services.feasibility_cache import get_feasibility_cache
+    reset_inventory_store()
+    get_feasibility_cache().clear()
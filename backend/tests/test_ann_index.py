@@ -0,0 +1,71 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import faiss
+import numpy as np
+
+from backend.services.ann_index import (
+    HNSW_MIN_SIZE, IVFPQ_MIN_SIZE, benchmark_index_modes, build_ann_index, choose_index_mode,
+    index_factory_string, supports_removal,
+)
+
+
+@pytest.fixture
+def vectors():
+    x = np.random.default_rng(0).standard_normal((1000, 16)).astype(np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+def test_choose_index_mode(monkeypatch):
+    assert choose_index_mode(54) == "flat"
+    assert choose_index_mode(HNSW_MIN_SIZE) == "hnsw"
+    assert choose_index_mode(IVFPQ_MIN_SIZE) == "ivfpq"
+    assert choose_index_mode(54, "hnsw") == "hnsw"
+    # Too few vectors to train a product quantizer
+    assert choose_index_mode(54, "ivfpq") == "flat"
+    monkeypatch.setenv("MARMITONIC_FAISS_INDEX", "hnsw")
+    assert choose_index_mode(54) == "hnsw"
+    with pytest.raises(ValueError):
+        choose_index_mode(54, "lsh")
+
+
+def test_index_factory_strings():
+    assert index_factory_string("flat", 54, 384) == "IDMap2,Flat"
+    assert index_factory_string("hnsw", 50_000, 384) == "IDMap2,HNSW32,Flat"
+    assert index_factory_string("ivfpq", 1_000_000, 384) == "IDMap2,IVF4000,PQ48x8"
+    assert index_factory_string("ivfpq", 1000, 16) == "IDMap2,IVF25,PQ2x4"
+
+
+@pytest.mark.parametrize("mode", ["flat", "hnsw", "ivfpq"])
+def test_build_returns_labels(vectors, mode):
+    labels = np.arange(len(vectors), dtype=np.int64) * 7 + 3
+    index = build_ann_index(vectors, labels, mode)
+    assert index.is_trained and index.ntotal == len(vectors)
+    _, found = index.search(vectors[:10], 3)
+    assert set(found.ravel()) <= set(labels)
+    assert supports_removal(index) == (mode != "hnsw")
+
+
+def test_ivfpq_survives_serialization_and_updates(vectors):
+    index = build_ann_index(vectors, np.arange(len(vectors), dtype=np.int64), "ivfpq")
+    restored = faiss.deserialize_index(faiss.serialize_index(index))
+    centroids = faiss.extract_index_ivf(restored).quantizer.reconstruct_n(0, 4)
+
+    restored.remove_ids(np.array([0, 1], dtype=np.int64))
+    restored.add_with_ids(vectors[:2], np.array([5000, 5001], dtype=np.int64))
+    # Updates reuse the persisted training
+    np.testing.assert_array_equal(faiss.extract_index_ivf(restored).quantizer.reconstruct_n(0, 4), centroids)
+    assert restored.ntotal == len(vectors)
+
+
+def test_benchmark_reports_recall_and_latency(vectors):
+    rows = {row["mode"]: row for row in benchmark_index_modes(vectors, k=5, n_queries=50)}
+    assert rows["flat"]["recall"] == 1.0
+    assert rows["hnsw"]["recall"] >= 0.9
+    assert 0.0 < rows["ivfpq"]["recall"] <= 1.0
+    assert all(row["latency_ms"] > 0 for row in rows.values())
@@ -38,7 +38,7 @@ def test_get_cocktails(mock_service):
     response = client.get("/cocktails/?q=mojito")
     assert response.status_code == 200
     assert len(response.json()) == 1
-    mock_service.search_cocktails.assert_called_with("mojito")
+    mock_service.search_cocktails.assert_called_with("mojito", limit=20)
 
 @patch("backend.routes.cocktails.cocktail_service")
 def test_get_feasible_cocktails(mock_service):
@@ -96,7 +96,7 @@ def test_search_ingredients(mock_service):
     response = client.get("/ingredients/search?q=rum")
     assert response.status_code == 200
     assert response.json()[0]["name"] == "Rum"
-    mock_service.search_ingredients.assert_called_with("rum")
+    mock_service.search_ingredients.assert_called_with("rum", limit=20)
 
 @patch("backend.routes.ingredients.service")
 def test_inventory_operations(mock_service):
@@ -121,6 +121,36 @@ class TestCocktailsEndpoints:
         assert response.status_code == 400
         assert "Invalid user_id or query failure" in response.json()["detail"]
 
+    @patch('backend.routes.cocktails.get_cocktail_service')
+    def test_get_feasible_cocktails_batch(self, mock_get_service, client):
+        """Test POST /cocktails/feasible/batch"""
+        mock_get_service.return_value.get_feasible_cocktails_batch.return_value = [
+            {"user_id": "u1", "feasible": ["mojito"], "almost_feasible": []},
+            {"user_id": "u2", "feasible": [], "almost_feasible": [{"cocktail_id": "mojito", "missing": ["mint"]}]}
+        ]
+
+        payload = {"inventories": [
+            {"user_id": "u1", "ingredients": ["White Rum", "Mint"]},
+            {"user_id": "u2"}
+        ]}
+        response = client.post("/cocktails/feasible/batch", json=payload)
+
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 2
+        mock_get_service.return_value.get_feasible_cocktails_batch.assert_called_with(
+            {"u1": ["White Rum", "Mint"], "u2": None}, max_missing=2
+        )
+
+    @patch('backend.routes.cocktails.get_cocktail_service')
+    def test_get_feasible_cocktails_batch_rejects_duplicate_users(self, mock_get_service, client):
+        """Test POST /cocktails/feasible/batch with a repeated user_id"""
+        payload = {"inventories": [{"user_id": "u1", "ingredients": ["Gin"]}, {"user_id": "u1"}]}
+        response = client.post("/cocktails/feasible/batch", json=payload)
+
+        assert response.status_code == 422
+        assert "u1" in response.json()["detail"]
+        mock_get_service.return_value.get_feasible_cocktails_batch.assert_not_called()
+
     @patch('backend.routes.cocktails.get_cocktail_service')
     def test_get_almost_feasible_cocktails(self, mock_get_service, client, mock_cocktail):
         """Test GET /cocktails/almost-feasible/{user_id}"""
@@ -221,10 +251,37 @@ class TestCocktailsEndpoints:
         mock_service.get_bridge_cocktails.return_value = []
 
         response = client.get("/cocktails/bridge?limit=20")
-        
+
         assert response.status_code == 200
         mock_service.get_bridge_cocktails.assert_called_once_with(limit=20)
 
+    @patch('backend.routes.cocktails.similarity_service')
+    def test_get_clusters_while_computing(self, mock_service, client):
+        """Test GET /cocktails/clusters before any clustering is available"""
+        mock_service.get_clusters.return_value = None
+
+        response = client.get("/cocktails/clusters?n_clusters=3")
+
+        assert response.status_code == 202
+        assert response.json() == {"status": "computing", "clusters": []}
+        assert response.headers["Retry-After"] == "2"
+        mock_service.get_clusters.assert_called_once_with(n_clusters=3)
+        mock_service.create_cocktails_clusters.assert_not_called()
+
+    @patch('backend.routes.cocktails.similarity_service')
+    def test_get_cluster_scores(self, mock_service, client):
+        """Test GET /cocktails/clusters/scores while the sweep is incomplete"""
+        mock_service.cluster_scores.return_value = {2: 0.1, 3: 0.4}
+        mock_service.recommended_n_clusters.return_value = 3
+        mock_service.sweep_running = False
+
+        response = client.get("/cocktails/clusters/scores")
+
+        assert response.status_code == 200
+        assert response.json() == {"scores": {"2": 0.1, "3": 0.4}, "recommended_n_clusters": 3, "status": "partial"}
+        # Reporting never starts a sweep
+        mock_service.schedule_cluster_sweep.assert_not_called()
+
 
 class TestIngredientsEndpoints:
     """Test ingredients API endpoints"""
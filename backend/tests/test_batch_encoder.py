@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from backend.services.batch_encoder import BatchEncoder
+
+
+class RecordingEncoder:
+    """Encodes a text as [len(text), number of the batch] and records each batch"""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+        self.started = threading.Event()
+
+    def __call__(self, texts):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(texts))
+        return np.array([[len(text), len(self.batches)] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def blocked():
+    """An encoder stuck on its first batch, so that later submissions pile up in the queue"""
+    gate = threading.Event()
+    encode = RecordingEncoder(gate)
+    yield encode, gate
+    gate.set()
+
+
+def test_concurrent_requests_share_a_batch(blocked):
+    encode, gate = blocked
+    encoder = BatchEncoder(encode, max_batch_size=8, max_wait_ms=50)
+    first = encoder.submit("warm-up")
+    assert encode.started.wait(5)
+    futures = {text: encoder.submit(text) for text in ["a", "bb", "ccc", "bb"]}
+    gate.set()
+
+    assert first.result(5).tolist() == [7, 1]
+    for text, future in futures.items():
+        assert future.result(5).tolist() == [len(text), 2]
+    # Duplicate texts of one window are encoded once
+    assert encode.batches[1] == ["a", "bb", "ccc"]
+    assert encoder.stats()["batches"] == 2
+    encoder.close()
+
+
+def test_max_batch_size_is_respected(blocked):
+    encode, gate = blocked
+    encoder = BatchEncoder(encode, max_batch_size=2, max_wait_ms=50)
+    encoder.submit("warm-up")
+    assert encode.started.wait(5)
+    futures = [encoder.submit(f"text {i}") for i in range(5)]
+    gate.set()
+
+    assert [f.result(5)[0] for f in futures] == [6.0] * 5
+    assert [len(batch) for batch in encode.batches] == [1, 2, 2, 1]
+    encoder.close()
+
+
+def test_errors_are_set_on_every_future():
+    def failing(texts):
+        raise RuntimeError("model crashed")
+
+    encoder = BatchEncoder(failing, max_wait_ms=0)
+    future = encoder.submit("mojito")
+    with pytest.raises(RuntimeError, match="model crashed"):
+        future.result(5)
+    encoder.close()
+
+
+def test_encode_async_and_close():
+    encoder = BatchEncoder(RecordingEncoder(), max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(*(encoder.encode_async(text) for text in ["x", "yy"]))
+
+    vectors = asyncio.run(run())
+    assert [v[0] for v in vectors] == [1.0, 2.0]
+    encoder.close()
+    with pytest.raises(RuntimeError):
+        encoder.submit("late")
+
+
+def test_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("MARMITONIC_ENCODER_MAX_BATCH", "4")
+    monkeypatch.setenv("MARMITONIC_ENCODER_MAX_WAIT_MS", "2.5")
+    encoder = BatchEncoder(RecordingEncoder())
+    assert (encoder.max_batch_size, encoder.max_wait_ms) == (4, 2.5)
+    assert BatchEncoder(RecordingEncoder(), max_batch_size=16).max_batch_size == 16
@@ -0,0 +1,74 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.data.cocktail_lookup import CocktailLookup
+from backend.data.ttl_parser import IBADataParser
+from backend.models.cocktail import Cocktail
+
+
+@pytest.fixture
+def cocktails():
+    return [
+        Cocktail(uri="http://dbpedia.org/resource/Americano_(cocktail)", id="americano", name="Americano",
+                 labels={"en": "Americano (cocktail)", "fr": "Américano"}),
+        Cocktail(uri="http://dbpedia.org/resource/Negroni", id="negroni", name="Negroni",
+                 alternative_names=["Negroni Sbagliato"]),
+        Cocktail(uri="http://dbpedia.org/resource/Mojito", id="mojito", name="Mojito"),
+    ]
+
+
+@pytest.fixture
+def lookup(cocktails):
+    return CocktailLookup(cocktails, slugify=IBADataParser.generate_slug)
+
+
+def test_lookup_by_each_key(lookup, cocktails):
+    assert lookup.get_by_id("negroni") is cocktails[1]
+    assert lookup.get_by_uri("http://dbpedia.org/resource/Mojito") is cocktails[2]
+    assert lookup.get_by_name("  AMERICANO ") is cocktails[0]
+    assert lookup.get_by_name("américano") is cocktails[0]
+    assert lookup.get_by_name("negroni sbagliato") is cocktails[1]
+    assert lookup.position("mojito") == 2
+    assert lookup.get_by_id("missing") is None
+    assert lookup.position("missing") is None
+
+
+def test_resolve_tries_every_map(lookup, cocktails):
+    assert lookup.resolve("mojito") is cocktails[2]
+    assert lookup.resolve("http://dbpedia.org/resource/Negroni") is cocktails[1]
+    assert lookup.resolve("Americano (cocktail)") is cocktails[0]
+    # Falls back to the slug of the given name
+    assert lookup.resolve("Mojito!") is cocktails[2]
+    assert lookup.resolve("") is None
+    assert lookup.resolve("Daiquiri") is None
+
+
+def test_slug_collisions_are_detected(cocktails):
+    duplicate = Cocktail(uri="http://dbpedia.org/resource/Mojito_(variant)", id="mojito", name="Mojito (variant)")
+    lookup = CocktailLookup(cocktails + [duplicate])
+
+    # The first cocktail keeps the id, the collision is reported
+    assert lookup.get_by_id("mojito") is cocktails[2]
+    assert lookup.collisions == {"mojito": ["http://dbpedia.org/resource/Mojito",
+                                            "http://dbpedia.org/resource/Mojito_(variant)"]}
+    assert lookup.get_by_uri("http://dbpedia.org/resource/Mojito_(variant)") is duplicate
+
+    with pytest.raises(ValueError):
+        CocktailLookup(cocktails + [duplicate], strict=True)
+
+
+def test_parser_lookup_matches_catalogue():
+    parser = IBADataParser()
+    cocktails = parser.get_all_cocktails()
+    lookup = parser.get_cocktail_lookup()
+
+    assert lookup is parser.get_cocktail_lookup()
+    assert not lookup.collisions
+    for position, cocktail in enumerate(cocktails):
+        assert parser.get_cocktail_by_id(cocktail.id) is cocktail
+        assert lookup.get_by_uri(cocktail.uri) is cocktail
+        assert lookup.position(cocktail.id) == position
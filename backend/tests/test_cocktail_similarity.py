@@ -0,0 +1,91 @@
+import itertools
+import random
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.data.cocktail_similarity import CocktailSimilarityTable
+from backend.models.cocktail import Cocktail
+
+
+@pytest.fixture
+def cocktails():
+    return [
+        Cocktail(uri="http://example.com/Martini", id="martini", name="Martini",
+                 parsed_ingredients=["Gin", "Vermouth"]),
+        Cocktail(uri="http://example.com/Negroni", id="negroni", name="Negroni",
+                 parsed_ingredients=["Gin", "Vermouth", "Campari"]),
+        Cocktail(uri="http://example.com/Americano", id="americano", name="Americano",
+                 parsed_ingredients=["Campari", "vermouth", "Soda Water"]),
+        Cocktail(uri="http://example.com/Daiquiri", id="daiquiri", name="Daiquiri",
+                 parsed_ingredients=["White Rum", "Lime Juice", "Sugar Syrup"]),
+        Cocktail(uri="http://example.com/Empty", id="empty", name="Empty", parsed_ingredients=[]),
+    ]
+
+
+def brute_force(cocktails, cocktail_id, limit):
+    target = next(c for c in cocktails if c.id == cocktail_id)
+    if not target.parsed_ingredients:
+        return []
+    target_set = {i.lower() for i in target.parsed_ingredients}
+    scores = []
+    for c in cocktails:
+        if c.id == cocktail_id or not c.parsed_ingredients:
+            continue
+        other = {i.lower() for i in c.parsed_ingredients}
+        scores.append((c.id, len(target_set & other) / len(target_set | other)))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[:limit]
+
+
+def test_table_matches_pairwise_jaccard(cocktails):
+    table = CocktailSimilarityTable(cocktails, k=3)
+    for cocktail, limit in itertools.product(cocktails, [1, 2, 3, 10]):
+        result = [(c.id, score) for c, score in table.similar(cocktail.id, limit=limit)]
+        assert result == brute_force(cocktails, cocktail.id, limit)
+
+
+def test_neighbors_are_ranked(cocktails):
+    table = CocktailSimilarityTable(cocktails)
+    result = table.similar("martini", limit=2)
+    assert [c.id for c, _ in result] == ["negroni", "americano"]
+    assert result[0][1] == pytest.approx(2 / 3)
+    # Lowercase keys: "vermouth" and "Vermouth" are the same ingredient
+    assert result[1][1] == pytest.approx(1 / 4)
+
+
+def test_excluded_cocktails(cocktails):
+    table = CocktailSimilarityTable(cocktails)
+    assert table.similar("empty") == []
+    assert table.similar("missing") == []
+    assert table.similar("martini", limit=0) == []
+    assert all(c.id not in ("martini", "empty") for c, _ in table.similar("martini", limit=10))
+
+
+def test_cosine_metric(cocktails):
+    table = CocktailSimilarityTable(cocktails, metric="cosine")
+    negroni = dict((c.id, score) for c, score in table.similar("martini"))["negroni"]
+    assert negroni == pytest.approx(2 / (2 * 3) ** 0.5, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        CocktailSimilarityTable(cocktails, metric="euclidean")
+
+
+def test_small_blocks_and_ties_match_brute_force(monkeypatch):
+    # Few ingredients for many cocktails: lots of tied scores, and several blocks of a few rows
+    monkeypatch.setattr("backend.data.cocktail_similarity._BLOCK_BYTES", 40 * 30 * 7)
+    rng = random.Random(0)
+    names = ["Gin", "Vermouth", "Campari", "Soda Water", "Lime Juice", "Sugar Syrup"]
+    cocktails = [
+        Cocktail(uri=f"http://example.com/c{i}", id=f"c{i}", name=f"C{i}",
+                 parsed_ingredients=rng.sample(names, rng.randint(0, 3)))
+        for i in range(30)
+    ]
+    table = CocktailSimilarityTable(cocktails, k=5)
+    assert table._block_rows() == 7
+    for cocktail, limit in itertools.product(cocktails, [5, 12]):
+        result = [(c.id, score) for c, score in table.similar(cocktail.id, limit=limit)]
+        assert result == brute_force(cocktails, cocktail.id, limit)
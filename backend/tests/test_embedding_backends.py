@@ -0,0 +1,71 @@
+import importlib.util
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from backend.services.embedding_backends import (
+    DEFAULT_MODEL, OnnxEmbeddingBackend, default_onnx_dir, get_embedding_backend, mean_pool,
+)
+
+
+def test_mean_pool_ignores_padding():
+    tokens = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    np.testing.assert_allclose(mean_pool(tokens, mask), [[2.0, 3.0]])
+
+
+def test_backend_selected_by_config(monkeypatch):
+    with patch("sentence_transformers.SentenceTransformer") as mock_model:
+        monkeypatch.setenv("MARMITONIC_EMBEDDING_BACKEND", "torch")
+        backend = get_embedding_backend("some/model")
+    mock_model.assert_called_once_with("some/model")
+    assert backend.name == "some/model"
+
+    with pytest.raises(ValueError):
+        get_embedding_backend(backend="tensorflow")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("onnxruntime") is not None, reason="onnxruntime is installed")
+def test_onnx_backend_requires_onnxruntime():
+    with pytest.raises(ImportError, match="onnxruntime"):
+        get_embedding_backend(backend="onnx")
+
+
+def test_onnx_backend_parity_with_torch():
+    """Top-k neighbours of the int8 ONNX model match the PyTorch model on the real catalog"""
+    pytest.importorskip("onnxruntime")
+    if not (default_onnx_dir(DEFAULT_MODEL) / "model_int8.onnx").exists():
+        pytest.skip("ONNX model not exported (python -m backend.services.embedding_backends)")
+    from backend.data.ttl_parser import get_all_cocktails
+    from backend.services.similarity_service import SimilarityService
+
+    try:
+        torch_backend = get_embedding_backend(DEFAULT_MODEL, backend="torch")
+    except Exception as e:
+        pytest.skip(f"PyTorch model unavailable: {e}")
+    onnx_backend = OnnxEmbeddingBackend(DEFAULT_MODEL)
+    assert onnx_backend.name != torch_backend.name
+
+    texts = [SimilarityService._create_cocktail_text(None, c) for c in get_all_cocktails()]
+
+    def normalized(backend):
+        vectors = backend.encode(texts)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    reference, quantized = normalized(torch_backend), normalized(onnx_backend)
+    assert (reference * quantized).sum(axis=1).min() > 0.97
+
+    k = 5
+    def top_k(vectors):
+        scores = vectors @ vectors.T
+        np.fill_diagonal(scores, -np.inf)
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(top_k(reference), top_k(quantized))])
+    assert overlap >= 0.8
@@ -0,0 +1,62 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from backend.services.embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+def vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_normalize_query():
+    assert normalize_query("  rum   and\tlime ") == "rum and lime"
+
+
+def test_hits_misses_and_lru_eviction():
+    cache = QueryEmbeddingCache(max_size=2)
+    assert cache.get("mojito") is None
+    cache.set("mojito", vector(1))
+    cache.set("negroni", vector(2))
+    # Touching mojito makes negroni the least recently used entry
+    np.testing.assert_array_equal(cache.get(" mojito "), vector(1))
+    cache.set("sour", vector(3))
+
+    assert cache.get("negroni") is None
+    assert cache.get("mojito") is not None
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 2, "misses": 2, "evictions": 1, "expirations": 0,
+                             "hit_rate": 0.5}
+
+
+def test_cached_vectors_are_read_only():
+    cache = QueryEmbeddingCache()
+    source = vector(1)
+    cache.set("mojito", source)
+    source[0] = 5
+    cached = cache.get("mojito")
+    assert cached[0] == 1
+    with pytest.raises(ValueError):
+        cached[0] = 2
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "query_cache.npz")
+    cache = QueryEmbeddingCache(max_size=3, path=path, model_name="model-a")
+    for i, query in enumerate(["a", "b", "c"]):
+        cache.set(query, vector(i))
+    cache.get("a")
+    assert cache.save()
+
+    restored = QueryEmbeddingCache(max_size=2, path=path, model_name="model-a")
+    # Most recently used entries are kept when the new cache is smaller
+    assert len(restored) == 2
+    assert restored.get("b") is None
+    np.testing.assert_array_equal(restored.get("a"), vector(0))
+
+    assert len(QueryEmbeddingCache(path=path, model_name="model-b")) == 0
+    assert not QueryEmbeddingCache().save()
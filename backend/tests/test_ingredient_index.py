@@ -0,0 +1,153 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from backend.data.ingredient_index import FeasibilityState, IngredientIndex
+from backend.models.cocktail import Cocktail
+from backend.services.feasibility_cache import FeasibilityCache
+
+
+@pytest.fixture
+def cocktails():
+    return [
+        Cocktail(uri="http://example.com/Martini", id="martini", name="Martini",
+                 parsed_ingredients=["Gin", "Vermouth"]),
+        Cocktail(uri="http://example.com/Negroni", id="negroni", name="Negroni",
+                 parsed_ingredients=["Gin", "Vermouth", "Campari"]),
+        Cocktail(uri="http://example.com/Daiquiri", id="daiquiri", name="Daiquiri",
+                 parsed_ingredients=["White Rum", "Lime Juice", "Sugar Syrup"]),
+        Cocktail(uri="http://example.com/Screwdriver", id="screwdriver", name="Screwdriver",
+                 parsed_ingredients=["Vodka", "Orange Juice"]),
+        Cocktail(uri="http://example.com/Empty", id="empty", name="Empty", parsed_ingredients=[]),
+    ]
+
+
+@pytest.fixture
+def index(cocktails):
+    return IngredientIndex(cocktails, lambda name: name.lower().strip())
+
+
+def test_postings_and_bitmasks(index):
+    assert index.postings["gin"] == frozenset({0, 1})
+    assert index.postings["campari"] == frozenset({1})
+    assert (index.recipe_masks[0] == index.encode(["Gin", "Vermouth"])).all()
+    assert not index.recipe_masks[4].any()
+    assert index.recipe_sizes.tolist() == [2, 3, 3, 2, 0]
+
+
+def test_missing_vector(index):
+    missing = index.missing_vector(index.encode(["gin", "vermouth", "lime juice", "not an ingredient"]))
+    assert missing.tolist() == [0, 1, 2, 2, 0]
+
+
+def test_missing_matrix_matches_missing_vector(index):
+    inventories = [["gin", "vermouth"], [], ["vodka", "orange juice", "campari"]]
+    matrix = index.missing_matrix(index.encode_many(inventories))
+
+    assert matrix.shape == (3, 5)
+    for row, inventory in enumerate(inventories):
+        assert matrix[row].tolist() == index.missing_vector(index.encode(inventory)).tolist()
+    assert index.missing_matrix(index.encode_many([])).shape == (0, 5)
+
+
+def test_bitmasks_span_several_words():
+    many = [
+        Cocktail(uri=f"http://example.com/c{i}", id=f"c{i}", name=f"C{i}",
+                 parsed_ingredients=[f"ing{i}", f"ing{i + 1}"])
+        for i in range(150)
+    ]
+    index = IngredientIndex(many, str.lower)
+    assert index.word_count == 3
+
+    feasible = index.feasible_cocktails(["ing70", "ing71", "ing140", "ing141"])
+    assert [c.id for c in feasible] == ["c70", "c140"]
+
+
+def test_cocktails_with_all(index):
+    assert [c.id for c in index.cocktails_with_all(["gin", "VERMOUTH"])] == ["martini", "negroni"]
+    assert [c.id for c in index.cocktails_with_all(["Campari"])] == ["negroni"]
+    assert index.cocktails_with_all(["gin", "unknown"]) == []
+
+
+def test_feasible_cocktails(index):
+    feasible = index.feasible_cocktails(["gin", "vermouth", "vodka"])
+    assert [c.id for c in feasible] == ["martini"]
+    assert index.feasible_cocktails([]) == []
+
+
+def test_almost_feasible_cocktails(index):
+    results = index.almost_feasible_cocktails(["Gin", "Vermouth", "White Rum"])
+    by_id = {r["cocktail"].id: r["missing"] for r in results}
+
+    assert by_id["negroni"] == ["campari"]
+    assert by_id["daiquiri"] == ["lime juice", "sugar syrup"]
+    # Two-ingredient cocktails are almost feasible even with nothing in stock
+    assert by_id["screwdriver"] == ["vodka", "orange juice"]
+    assert "martini" not in by_id
+    assert "empty" not in by_id
+
+
+def test_feasibility_state_incremental_updates(index):
+    state = FeasibilityState(index, ["Gin"])
+    assert state.feasible_cocktails() == []
+    assert {index.cocktails[position].id for position in state.almost} == {"martini", "negroni", "screwdriver"}
+
+    state.update(["Gin", "Vermouth"])
+    assert [c.id for c in state.feasible_cocktails()] == ["martini"]
+    almost = {r["cocktail"].id: r["missing"] for r in state.almost_feasible_cocktails()}
+    assert almost["negroni"] == ["campari"]
+
+    added, removed = state.update(["Vermouth", "Campari"])
+    assert added == {"campari"} and removed == {"gin"}
+    assert state.feasible_cocktails() == []
+
+
+def test_feasibility_state_matches_full_recomputation(index):
+    state = FeasibilityState(index, [])
+    for inventory in (["gin"], ["gin", "vermouth", "vodka"], ["white rum", "lime juice"], [], ["campari", "gin", "vermouth"]):
+        state.update(inventory)
+        assert state.feasible_cocktails() == index.feasible_cocktails(inventory)
+        assert state.almost_feasible_cocktails() == index.almost_feasible_cocktails(inventory)
+        assert state.almost_feasible_cocktails(max_missing=3) == index.almost_feasible_cocktails(inventory, max_missing=3)
+
+
+def test_feasibility_cache_returns_snapshots(index):
+    cache = FeasibilityCache()
+    snapshot = cache.sync("alice", ["Gin", "Vermouth"], index)
+    assert [c.id for c in snapshot.feasible] == ["martini"]
+    assert [r["cocktail"].id for r in snapshot.almost_feasible] == ["negroni", "screwdriver"]
+    # Unchanged inventory: the same snapshot is handed out again
+    assert cache.sync("alice", ["Vermouth", "Gin"], index) is snapshot
+
+    # Later updates build new snapshots and leave the returned ones untouched
+    assert cache.refresh("alice", ["Gin", "Vermouth", "Campari"], index)
+    refreshed = cache.sync("alice", ["Gin", "Vermouth", "Campari"], index)
+    assert [c.id for c in refreshed.feasible] == ["martini", "negroni"]
+    assert [c.id for c in snapshot.feasible] == ["martini"]
+    assert not cache.refresh("bob", ["Gin"], index)
+
+    # A state built on another catalog is dropped instead of updated
+    other = IngredientIndex(index.cocktails, lambda name: name.lower().strip())
+    assert not cache.refresh("alice", ["Gin"], other)
+    assert "alice" not in cache
+
+
+def test_feasibility_many_matches_missing_matrix(index, monkeypatch):
+    # One inventory per block: results are reduced block by block
+    monkeypatch.setattr("backend.data.ingredient_index._BATCH_CHUNK_WORDS", 1)
+    inventories = [["gin", "vermouth"], [], ["vodka", "orange juice", "campari"], ["white rum"]]
+    masks = index.encode_many(inventories)
+    matrix = index.missing_matrix(masks)
+    assert matrix.dtype == np.uint8
+
+    results = index.feasibility_many(masks, max_missing=2)
+    assert len(results) == len(inventories)
+    for row, (feasible, almost) in enumerate(results):
+        assert feasible.tolist() == [p for p in range(5) if matrix[row, p] == 0 and index.recipe_sizes[p] > 0]
+        assert almost.tolist() == [p for p in range(5) if 1 <= matrix[row, p] <= 2]
+    assert [index.cocktails[p].id for p in results[0][0]] == ["martini"]
@@ -0,0 +1,59 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.data.ingredient_line import ParsedIngredientLine, parse_ingredient_line, parse_ingredient_lines
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("* 30 ml gin", ParsedIngredientLine("gin", 30.0, "ml")),
+    ("*22.5 ml Lime Juice", ParsedIngredientLine("Lime Juice", 22.5, "ml")),
+    ("- 9cl  Cognac", ParsedIngredientLine("Cognac", 9.0, "cl")),
+    ("*1/4 barspoon Absinthe", ParsedIngredientLine("Absinthe", 0.25, "barspoon")),
+    ("* 1 1/2 oz gin", ParsedIngredientLine("gin", 1.5, "oz")),
+    ("* 2 1/4 oz lime juice", ParsedIngredientLine("lime juice", 2.25, "oz")),
+    ("* 3/4 oz Lemon Juice", ParsedIngredientLine("Lemon Juice", 0.75, "oz")),
+    ("* 2 Dashes Angostura Bitters", ParsedIngredientLine("Angostura Bitters", 2.0, "dash")),
+    ("* Two dashes Peychaud's Bitters", ParsedIngredientLine("Peychaud's Bitters", 2, "dash")),
+    ("* Few drops of egg white", ParsedIngredientLine("egg white", None, "drop")),
+    ("* splash of Soda Water", ParsedIngredientLine("Soda Water", None, "splash")),
+    ("* 1 bar spoon of Sugar Syrup", ParsedIngredientLine("Sugar Syrup", 1.0, "barspoon")),
+    ("* 30 ml Select/Aperol/Campari/Cynar", ParsedIngredientLine("Cynar", 30.0, "ml")),
+    ("* 100% Agave Tequila", ParsedIngredientLine("Agave Tequila", None, None)),
+    ("* 2 of Worcestershire sauce", ParsedIngredientLine("Worcestershire sauce", 2.0, None)),
+    ("* 6 to 8 mint leaves", ParsedIngredientLine("mint leaves", 6.0, None)),
+    ("* Fresh orange peel", ParsedIngredientLine("Fresh orange peel", None, None)),
+])
+def test_parse_ingredient_line(raw, expected):
+    assert parse_ingredient_line(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", "   ", "*", "* x", "5.049216E8", "* 5.049216E8"])
+def test_parse_ingredient_line_without_ingredient(raw):
+    assert parse_ingredient_line(raw) is None
+
+
+def test_parse_ingredient_lines_skips_empty_lines():
+    text = "* 45 ml Gin\n\n* 15 ml Lemon Juice\n5.049216E8\n* splash Soda Water"
+    assert [line.name for line in parse_ingredient_lines(text)] == ["Gin", "Lemon Juice", "Soda Water"]
+    assert parse_ingredient_lines("") == []
+
+
+def test_parse_ingredient_line_is_memoized():
+    parse_ingredient_line.cache_clear()
+    first = parse_ingredient_line("* 60 ml Bourbon")
+    second = parse_ingredient_line("* 60 ml Bourbon")
+    assert first is second
+    assert parse_ingredient_line.cache_info().hits == 1
+
+
+@pytest.mark.parametrize("raw", ["* 1 sprig of mint (optional)", "* Salt to taste", "* Sugar syrup if desired"])
+def test_parse_ingredient_line_optional_flag(raw):
+    assert parse_ingredient_line(raw).optional is True
+
+
+def test_parse_ingredient_line_not_optional_by_default():
+    assert parse_ingredient_line("* 30 ml gin").optional is False
@@ -0,0 +1,87 @@
+import math
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import numpy as np
+
+from backend.data.ingredient_quantities import IngredientQuantities, IngredientQuantity
+from backend.models.cocktail import Cocktail
+
+
+@pytest.fixture
+def quantities():
+    cocktails = [
+        Cocktail(uri="http://example.com/Americano", id="americano", name="Americano",
+                 ingredients="* 3 cl Campari\n* 3 cl Sweet Vermouth\n* Splash of soda water",
+                 parsed_ingredients=["Campari", "Sweet Vermouth", "Soda Water"]),
+        Cocktail(uri="http://example.com/Sazerac", id="sazerac", name="Sazerac",
+                 ingredients="* 50 ml Rye whiskey\n* 1 sugar cube\n* Two dashes Peychaud's Bitters\n"
+                             "* 1/4 barspoon Absinthe (optional)",
+                 parsed_ingredients=["Rye Whiskey", "Sugar Cube", "Peychaud'S Bitters", "Absinthe (Optional)"]),
+        Cocktail(uri="http://example.com/Empty", id="empty", name="Empty"),
+    ]
+    return IngredientQuantities(cocktails)
+
+
+def test_columns_are_contiguous(quantities):
+    assert quantities.offsets.tolist() == [0, 3, 7, 7]
+    assert quantities.amounts.dtype == np.float32
+    assert quantities.unit_codes.dtype == np.uint8
+    assert len(quantities.names) == 7
+
+
+def test_entries_reuse_parsed_names_and_normalize_units(quantities):
+    entries = quantities.entries("americano")
+    assert entries[0] == IngredientQuantity("Campari", 3.0, "cl", 30.0, False)
+    # "Splash of" has an implicit quantity of 1
+    assert entries[2].name == "Soda Water"
+    assert entries[2].amount == 1.0
+    assert entries[2].amount_ml == pytest.approx(5.0)
+
+    sazerac = quantities.entries("sazerac")
+    assert sazerac[1].unit is None and sazerac[1].amount == 1.0 and sazerac[1].amount_ml is None
+    assert sazerac[2].unit == "dash" and sazerac[2].amount == 2.0
+    assert sazerac[3].amount == 0.25 and sazerac[3].optional is True
+
+
+def test_unknown_cocktail(quantities):
+    assert quantities.entries("missing") == []
+    assert quantities.volumes_ml("missing").size == 0
+    assert quantities.total_volume_ml("missing") == 0.0
+
+
+def test_volumes_and_scaling(quantities):
+    assert quantities.total_volume_ml("americano") == pytest.approx(65.0)
+    scaled = quantities.scaled_volumes_ml("americano", 4)
+    assert scaled.tolist() == pytest.approx([120.0, 120.0, 20.0])
+    assert math.isnan(quantities.volumes_ml("sazerac")[1])
+
+
+def test_total_volumes_match_per_cocktail(quantities):
+    totals = quantities.total_volumes_ml()
+    for position, cocktail_id in enumerate(quantities.cocktail_ids):
+        assert totals[position] == pytest.approx(quantities.total_volume_ml(cocktail_id))
+
+    without_optional = quantities.total_volumes_ml(include_optional=False)
+    assert without_optional[1] == pytest.approx(quantities.total_volume_ml("sazerac", include_optional=False))
+    assert without_optional[1] < totals[1]
+
+
+def test_weighted_totals(quantities):
+    alcohol_ml = quantities.weighted_totals({"campari": 0.25, "sweet vermouth": 0.15, "rye whiskey": 0.45})
+    assert alcohol_ml.tolist() == pytest.approx([12.0, 22.5, 0.0])
+
+
+def test_mixed_number_quantities_are_stored_in_full():
+    cocktail = Cocktail(uri="http://example.com/Sour", id="sour", name="Sour",
+                        ingredients="* 1 1/2 oz Gin\n* 2 1/4 oz Lime Juice\n* 3/4 oz Sugar Syrup",
+                        parsed_ingredients=["Gin", "Lime Juice", "Sugar Syrup"])
+    quantities = IngredientQuantities([cocktail])
+
+    assert [entry.amount for entry in quantities.entries("sour")] == [1.5, 2.25, 0.75]
+    assert quantities.volumes_ml("sour").tolist() == pytest.approx([45.0, 67.5, 22.5])
+    assert quantities.total_volume_ml("sour") == pytest.approx(135.0)
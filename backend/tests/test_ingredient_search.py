@@ -0,0 +1,64 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.data.ingredient_search import IngredientSearchIndex, edit_distance
+from backend.models.ingredient import Ingredient
+
+
+@pytest.fixture
+def index():
+    names = ["Lime Juice", "Gin", "Angostura Bitters", "Cointreau", "Triple Sec", "Sugar Syrup",
+             "Ginger Beer", "Cranberry Juice", "Crème De Cassis", "Kahlúa", "London Gin", "Vodka"]
+    return IngredientSearchIndex([Ingredient(id=str(i), name=name) for i, name in enumerate(names)])
+
+
+def names(results):
+    return [i.name for i in results]
+
+
+def test_edit_distance():
+    assert edit_distance("angostura", "angostura", 2) == 0
+    assert edit_distance("angostrua", "angostura", 2) == 1  # transposition
+    assert edit_distance("cointrau", "cointreau", 2) == 1
+    assert edit_distance("vodka", "whiskey", 2) == 3
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("angostura", "Angostura Bitters"),
+    ("angustura", "Angostura Bitters"),
+    ("angostrua bitters", "Angostura Bitters"),
+    ("cointrau", "Cointreau"),
+    ("vodak", "Vodka"),
+    ("lime jiuce", "Lime Juice"),
+])
+def test_typos_find_the_ingredient_first(index, query, expected):
+    assert names(index.search(query))[0] == expected
+
+
+def test_exact_and_prefix_ranking(index):
+    assert names(index.search("gin")) == ["Gin", "London Gin", "Ginger Beer"]
+    assert names(index.search("ang")) == ["Angostura Bitters"]
+    assert names(index.search("berry")) == ["Cranberry Juice"]
+
+
+def test_accents_and_synonyms(index):
+    assert names(index.search("creme de")) == ["Crème De Cassis"]
+    assert names(index.search("simple syrup")) == ["Sugar Syrup"]
+    # Cointreau is a triple sec: both directions are synonyms
+    assert names(index.search("triple sec")) == ["Triple Sec", "Cointreau"]
+    assert names(index.search("coffee liqueur")) == ["Kahlúa"]
+
+
+def test_short_words_are_not_fuzzy(index):
+    assert index.search("gn") == []
+    assert index.search("x") == []
+
+
+def test_limit(index):
+    assert len(index.search("juice", limit=1)) == 1
+    assert index.search("juice", limit=0) == []
+    assert index.search("") == []
@@ -65,6 +65,16 @@ def test_search_ingredients(ingredient_service):
     ]
     ingredient_service.sparql_service.execute_query.return_value = mock_results
     
-    results = ingredient_service.search_ingredients("vodka")
+    results = ingredient_service.search_ingredients("vodka", include_dbpedia=True)
     assert len(results) == 1
     assert results[0].name == "Vodka"
+
+def test_search_ingredients_autocomplete_stays_local(ingredient_service):
+    local = [Ingredient(id="1", name="Angostura Bitters"), Ingredient(id="2", name="Cointreau"),
+             Ingredient(id="3", name="Triple Sec")]
+    ingredient_service._local_ingredient_loader = MagicMock(return_value=local)
+
+    assert [i.name for i in ingredient_service.search_ingredients("angostrua")] == ["Angostura Bitters"]
+    assert [i.name for i in ingredient_service.search_ingredients("cointrau")] == ["Cointreau", "Triple Sec"]
+    assert ingredient_service.search_ingredients("zzz") == []
+    ingredient_service.sparql_service.execute_query.assert_not_called()
@@ -0,0 +1,134 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.inventory_store import (
+    InMemoryInventoryStore,
+    SQLiteInventoryStore,
+    get_inventory_store,
+)
+from backend.services.ingredient_service import IngredientService
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "inventories.db"
+
+
+@pytest.fixture
+def sqlite_store(db_path):
+    store = SQLiteInventoryStore(str(db_path), cache_size=2, write_behind=True, batch_size=3, flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_in_memory_store():
+    store = InMemoryInventoryStore()
+    assert store.get("u1") == []
+    store.set("u1", ["Gin"])
+    assert store.get("u1") == ["Gin"]
+    assert store.get_many(["u1", "u2"]) == {"u1": ["Gin"], "u2": []}
+
+
+def test_sqlite_store_persists_across_connections(sqlite_store, db_path):
+    sqlite_store.set("u1", ["Gin", "Vermouth"])
+    # Buffered writes are visible to the writing process before the flush
+    assert sqlite_store.get("u1") == ["Gin", "Vermouth"]
+    sqlite_store.flush()
+
+    reopened = SQLiteInventoryStore(str(db_path))
+    try:
+        assert reopened.get("u1") == ["Gin", "Vermouth"]
+        assert reopened.get("unknown") == []
+    finally:
+        reopened.close()
+
+
+def test_sqlite_store_writes_through_by_default(db_path):
+    writer = SQLiteInventoryStore(str(db_path))
+    other = SQLiteInventoryStore(str(db_path))
+    try:
+        assert other.get("u1") == []
+        writer.set("u1", ["Gin"])
+        # Committed before set() returns: another worker sees it at once
+        assert other.get("u1") == ["Gin"]
+        assert not writer._pending
+    finally:
+        writer.close()
+        other.close()
+
+
+def test_sqlite_reads_run_outside_the_store_lock(db_path):
+    store = SQLiteInventoryStore(str(db_path))
+    try:
+        store.set("u1", ["Gin"])
+        store._cache.clear()
+        connection = store._reader()
+
+        class WriteAfterSelect:
+            def execute(self, *args):
+                rows = connection.execute(*args).fetchall()
+                # Another thread can take the store lock while this read is in flight
+                writer = threading.Thread(target=store.set, args=("u1", ["Gin", "Campari"]))
+                writer.start()
+                writer.join(timeout=5)
+                assert not writer.is_alive()
+                return MagicMock(fetchall=MagicMock(return_value=rows))
+
+        store._reader = lambda: WriteAfterSelect()
+        assert store.get("u1") == ["Gin"]
+        del store._reader
+        # The read raced with a write, so its older result was not cached
+        assert store.get("u1") == ["Gin", "Campari"]
+    finally:
+        store.close()
+
+
+def test_sqlite_store_flushes_full_batches(sqlite_store, db_path):
+    other = SQLiteInventoryStore(str(db_path))
+    try:
+        sqlite_store.set("u1", ["Gin"])
+        sqlite_store.set("u2", ["Rum"])
+        assert other.get("u1") == []
+
+        sqlite_store.set("u3", ["Vodka"])  # batch_size reached
+        assert other.get_many(["u1", "u2", "u3"]) == {"u1": ["Gin"], "u2": ["Rum"], "u3": ["Vodka"]}
+    finally:
+        other.close()
+
+
+def test_sqlite_cache_sees_writes_from_other_workers(sqlite_store, db_path):
+    sqlite_store.set("u1", ["Gin"])
+    sqlite_store.flush()
+    assert sqlite_store.get("u1") == ["Gin"]  # now cached
+
+    other = SQLiteInventoryStore(str(db_path))
+    try:
+        other.set("u1", ["Gin", "Campari"])
+        other.flush()
+    finally:
+        other.close()
+
+    assert sqlite_store.get("u1") == ["Gin", "Campari"]
+
+
+def test_sqlite_cache_is_bounded(sqlite_store):
+    for i in range(5):
+        sqlite_store.set(f"u{i}", [f"ing{i}"])
+    sqlite_store.flush()
+    assert len(sqlite_store._cache) == 2
+    assert sqlite_store.get("u0") == ["ing0"]
+
+
+def test_services_share_the_store():
+    writer = IngredientService(local_ingredient_loader=lambda: [])
+    reader = IngredientService(local_ingredient_loader=lambda: [])
+
+    writer.update_inventory("u1", ["Gin"])
+    assert reader.get_inventory("u1") == ["Gin"]
+    assert isinstance(get_inventory_store(), InMemoryInventoryStore)
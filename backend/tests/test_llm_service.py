@@ -0,0 +1,148 @@
+import hashlib
+import json
+import pytest
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.models.cocktail import Cocktail
+from backend.services.embedding_backends import EmbeddingBackend
+from backend.services.llm_service import LLMService
+from backend.services.similarity_service import SimilarityService
+
+
+class StubChatServer(ThreadingHTTPServer):
+    """Local stand-in for the OpenRouter chat completions endpoint"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubChatHandler)
+        self.delay = 0.0
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        server = self.server
+        with server.lock:
+            server.prompts.append(prompt)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+        finally:
+            with server.lock:
+                server.active -= 1
+        answer = {
+            "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                "role": "assistant", "content": f'"Vibe {hashlib.sha256(prompt.encode()).hexdigest()[:6]}"'}}],
+        }
+        data = json.dumps(answer).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = StubChatServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("MARMITONIC_LLM_BASE_URL", server.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def similarity_service():
+    with patch("backend.services.similarity_service.CocktailService"):
+        return SimilarityService(embedding_backend=MagicMock(spec=EmbeddingBackend), title_concurrency=3)
+
+
+def make_groups(n):
+    return [[Cocktail(uri=f"http://example.com/c{i}", id=f"c{i}", name=f"Cocktail {i}", ingredients=f"* {i} ml Gin")]
+            for i in range(n)]
+
+
+def test_identical_prompts_in_flight_are_coalesced(stub_server):
+    stub_server.delay = 0.3
+    service = LLMService(max_retries=0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.example("Same prompt"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 1 and len(results) == 4
+    assert stub_server.prompts == ["Same prompt"]
+    assert service.coalesced == 3
+    # Later calls are answered by the cache
+    assert service.example("Same prompt") == results[0]
+    assert len(stub_server.prompts) == 1
+
+
+def test_slow_provider_times_out(stub_server):
+    stub_server.delay = 2
+    service = LLMService(timeout=0.2, max_retries=0)
+    start = time.perf_counter()
+    with pytest.raises(Exception):
+        service.example("Too slow")
+    assert time.perf_counter() - start < 1.5
+
+
+def test_cluster_titles_are_generated_concurrently(stub_server, similarity_service):
+    stub_server.delay = 0.2
+    similarity_service.llm_service = LLMService(max_retries=0)
+    groups = make_groups(6)
+
+    start = time.perf_counter()
+    titles = similarity_service._generate_cluster_titles(groups)
+    elapsed = time.perf_counter() - start
+
+    assert len(stub_server.prompts) == 6
+    assert stub_server.max_active == 3
+    # Two waves of three requests instead of six round trips
+    assert elapsed < 6 * 0.2
+    assert len(set(titles)) == 6 and all(t.startswith("Vibe ") for t in titles)
+    # Cached titles do not reach the LLM again
+    assert similarity_service._generate_cluster_titles(groups) == titles
+    assert len(stub_server.prompts) == 6
+
+
+def test_cluster_title_falls_back_on_timeout(stub_server, similarity_service):
+    stub_server.delay = 2
+    similarity_service.llm_service = LLMService(timeout=0.2, max_retries=0)
+
+    titles = similarity_service._generate_cluster_titles(make_groups(2))
+
+    assert titles == [SimilarityService.FALLBACK_CLUSTER_TITLE] * 2
+    # Fallback titles are not cached: the next attempt asks again
+    stub_server.delay = 0
+    assert similarity_service._generate_cluster_titles(make_groups(2))[0].startswith("Vibe ")
@@ -0,0 +1,109 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.lru_cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LRUCache(ttl=None, max_size=2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+
+
+def test_entries_expire_lazily(clock):
+    cache = LRUCache(ttl=10, max_size=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 5
+    cache.set("b", 2)
+    # A hit does not extend the lifetime of an entry
+    assert cache.get("a") == 1
+
+    clock.now = 10
+    assert len(cache) == 2
+    assert "a" not in cache
+    assert cache.get("a", "missing") == "missing"
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+    # Setting again restarts the lifetime
+    cache.set("b", 3)
+    clock.now = 19
+    assert cache.get("b") == 3
+
+
+def test_expired_entries_are_not_counted_as_evictions(clock):
+    cache = LRUCache(ttl=1, max_size=1, clock=clock)
+    cache.set("a", 1)
+    clock.now = 2
+    cache.set("b", 2)
+    assert cache.stats()["evictions"] == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_items_are_listed_least_recently_used_first(clock):
+    cache = LRUCache(ttl=10, max_size=3, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    clock.now = 5
+    cache.set("c", 3)
+    cache.get("a")
+    assert cache.items() == [("b", 2), ("c", 3), ("a", 1)]
+    # Listing is not a lookup, and skips expired entries
+    clock.now = 10
+    assert cache.items() == [("c", 3)]
+    assert cache.stats()["hits"] == 1
+
+
+def test_falsy_values_and_delete(clock):
+    cache = LRUCache(clock=clock)
+    cache.set("empty", [])
+    assert cache.get("empty") == []
+    assert cache.delete("empty")
+    assert not cache.delete("empty")
+    cache.set("x", 1)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_concurrent_access_keeps_the_bound():
+    cache = LRUCache(ttl=60, max_size=50)
+
+    def work(offset):
+        for i in range(2000):
+            cache.set((offset, i % 80), i)
+            cache.get((offset, (i * 7) % 80))
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["size"] == 50
+    assert stats["hits"] + stats["misses"] == 4 * 2000
@@ -59,3 +59,10 @@ class TestPlannerService:
     def test_optimize_playlist_mode_all_cocktails(self, planner_service):
         result = planner_service.optimize_playlist_mode(['C1', 'C2', 'C3'])
         assert set(result['covered_cocktails']) == {'C1', 'C2', 'C3'}
+
+    def test_optimize_playlist_mode_resolves_ids_and_labels(self, planner_service, mock_cocktails):
+        from backend.data.cocktail_lookup import CocktailLookup
+        planner_service.cocktail_service.get_cocktail_lookup.return_value = CocktailLookup(mock_cocktails)
+        result = planner_service.optimize_playlist_mode(['1', 'c2', 'C1'])
+        assert result['covered_cocktails'] == ['C1', 'C2']
+        assert result['selected_ingredients'] == ['A', 'B', 'C']
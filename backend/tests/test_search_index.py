@@ -0,0 +1,84 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.data.search_index import CocktailSearchIndex, fold_text
+from backend.models.cocktail import Cocktail
+
+
+@pytest.fixture
+def index():
+    cocktails = [
+        Cocktail(uri="http://example.com/Negroni", id="negroni", name="Negroni"),
+        Cocktail(uri="http://example.com/Margarita", id="margarita", name="Margarita"),
+        Cocktail(uri="http://example.com/Tommys", id="tommy-s-margarita", name="Tommy's margarita"),
+        Cocktail(uri="http://example.com/Martini", id="martini", name="Martini (cocktail)"),
+        Cocktail(uri="http://example.com/Vieux", id="vieux-carr", name="Vieux Carré"),
+        Cocktail(uri="http://example.com/Sour", id="whiskey-sour", name="Whiskey Sour",
+                 labels={"en": "Whiskey Sour", "fr": "Whisky sour à l'ancienne"}),
+    ]
+    return CocktailSearchIndex(cocktails)
+
+
+def ids(results):
+    return [c.id for c in results]
+
+
+def test_fold_text():
+    assert fold_text("Vieux Carré") == "vieux carre"
+    assert fold_text("Tommy's  Margarita!") == "tommy s margarita"
+    assert fold_text("Kahlúa") == "kahlua"
+
+
+def test_prefix_search_is_ranked(index):
+    # Name prefix before word prefix, shorter names first
+    assert ids(index.search("mar")) == ["margarita", "martini", "tommy-s-margarita"]
+    assert ids(index.search("margarita")) == ["margarita", "tommy-s-margarita"]
+
+
+def test_multi_word_prefixes(index):
+    assert ids(index.search("tom marg")) == ["tommy-s-margarita"]
+    assert ids(index.search("whis sou")) == ["whiskey-sour"]
+
+
+def test_accent_folding_and_labels(index):
+    assert ids(index.search("carre")) == ["vieux-carr"]
+    assert ids(index.search("CARRÉ")) == ["vieux-carr"]
+    # French label only
+    assert ids(index.search("ancienne")) == ["whiskey-sour"]
+
+
+def test_substring_and_typos(index):
+    assert ids(index.search("groni")) == ["negroni"]
+    assert ids(index.search("negorni")) == ["negroni"]
+    assert index.search("zzzzzz") == []
+
+
+def test_limit_bounds_results(index):
+    assert len(index.search("m", limit=2)) == 2
+    assert len(index.search("m", limit=None)) == 3
+    assert index.search("m", limit=0) == []
+    assert index.search("") == []
+    assert index.search("  !! ") == []
+
+
+def test_short_prefixes_rank_only_once_per_node():
+    names = ["Mai Tai", "Margarita", "Martini", "Manhattan", "Mojito", "Moscow Mule", "Mint Julep",
+             "Tommy's Margarita", "Dry Martini", "Espresso Martini", "Mimosa", "Mary Pickford"]
+    cocktails = [Cocktail(uri=f"http://example.com/{i}", id=fold_text(name).replace(" ", "-"), name=name,
+                          labels={"fr": f"Ma {name}"} if i % 3 == 0 else None)
+                 for i, name in enumerate(names)]
+    index = CocktailSearchIndex(cocktails)
+    for query in ["m", "ma", "mar", "mo"]:
+        for limit in [1, 3, 5]:
+            # Same order as ranking every candidate
+            assert ids(index.search(query, limit=limit)) == ids(index.search(query, limit=None)[:limit])
+
+    calls = []
+    rank = index._rank
+    index._rank = lambda *args: calls.append(args) or rank(*args)
+    assert len(index.search("ma", limit=3)) == 3
+    assert calls == []
@@ -0,0 +1,513 @@
+import asyncio
+import hashlib
+import json
+import os
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import faiss
+import numpy as np
+
+from backend.data.cocktail_lookup import CocktailLookup
+from backend.models.cocktail import Cocktail
+from backend.services.embedding_backends import EmbeddingBackend
+from backend.services.similarity_service import SimilarityService
+from backend.services.vibe_clustering import clustering_lock, silhouette_sample, train_kmeans
+
+DIMENSION = 16
+
+
+def fake_encode(texts, **kwargs):
+    """Deterministic pseudo-embeddings: one seeded random vector per text"""
+    vectors = []
+    for text in texts:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+        vectors.append(np.random.default_rng(seed).standard_normal(DIMENSION))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+@pytest.fixture
+def cocktails():
+    names = ["Martini", "Negroni", "Americano", "Daiquiri", "Mojito", "Margarita", "Manhattan", "Sidecar"]
+    return [
+        Cocktail(uri=f"http://example.com/{name}", id=name.lower(), name=name,
+                 ingredients=f"* 30 ml {name} base", parsed_ingredients=[f"{name} Base"])
+        for name in names
+    ]
+
+
+@pytest.fixture
+def make_service(tmp_path, cocktails):
+    def factory(**kwargs):
+        backend = MagicMock(spec=EmbeddingBackend)
+        backend.name = kwargs.pop("model_name", "sentence-transformers/all-MiniLM-L6-v2")
+        backend.encode.side_effect = fake_encode
+        with patch("backend.services.similarity_service.LLMService"), \
+             patch("backend.services.similarity_service.CocktailService") as mock_cocktail_service:
+            mock_cocktail_service.return_value.get_all_cocktails.return_value = cocktails
+            mock_cocktail_service.return_value.get_cocktail_lookup.return_value = CocktailLookup(cocktails)
+            service = SimilarityService(embedding_backend=backend, **kwargs)
+        service.index_path = str(tmp_path / "faiss_index.bin")
+        service.embeddings_path = str(tmp_path / "faiss_embeddings.npy")
+        service.cocktail_ids_path = str(tmp_path / "faiss_cocktail_ids.npy")
+        service.text_hashes_path = str(tmp_path / "faiss_text_hashes.npy")
+        service.manifest_path = str(tmp_path / "faiss_manifest.json")
+        service.neighbors_path = str(tmp_path / "faiss_neighbors.npz")
+        service.clusters_path = str(tmp_path / "faiss_clusters_{n_clusters}.npz")
+        service.llm_service = MagicMock()
+        service.llm_service.example.return_value = "Shaken Classics"
+        return service
+    return factory
+
+
+def search_directly(service, cocktail_id, top_k, exclude_self):
+    """Reference answer straight from the FAISS index"""
+    position = service.cocktail_lookup.position(cocktail_id)
+    scores, labels = service.index.search(np.asarray(service.embeddings[position:position + 1]), len(service.cocktails))
+    by_label = {int(label): cocktail.id for label, cocktail in zip(service.labels, service.cocktails)}
+    results = [(by_label[int(label)], float(score)) for label, score in zip(labels[0], scores[0])
+               if not (exclude_self and by_label[int(label)] == cocktail_id)]
+    return [(result_id, pytest.approx(score, abs=1e-6)) for result_id, score in results[:top_k]]
+
+
+def assert_same_index(service, expected):
+    """Same embeddings and neighbours per cocktail id, whatever the row order"""
+    for cocktail in expected.cocktails:
+        row = service.cocktail_lookup.position(cocktail.id)
+        expected_row = expected.cocktail_lookup.position(cocktail.id)
+        np.testing.assert_allclose(service.embeddings[row], expected.embeddings[expected_row], atol=1e-6)
+        assert [r["cocktail"].id for r in service.find_similar_cocktails(cocktail.id, top_k=4)] == \
+            [r["cocktail"].id for r in expected.find_similar_cocktails(cocktail.id, top_k=4)]
+
+
+def test_build_index_persists_neighbor_table(make_service, tmp_path):
+    service = make_service(neighbor_k=4)
+    service.build_index(force_rebuild=True)
+
+    assert service.neighbor_ids.shape == (8, 5)
+    assert service.neighbor_ids.dtype == np.int32
+    # Each cocktail is its own nearest neighbour
+    assert service.neighbor_ids[:, 0].tolist() == list(range(8))
+    assert (tmp_path / "faiss_neighbors.npz").exists()
+
+
+@pytest.mark.parametrize("exclude_self", [True, False])
+def test_table_answers_match_faiss(make_service, cocktails, exclude_self):
+    service = make_service(neighbor_k=4)
+    service.build_index(force_rebuild=True)
+    service.index.search = MagicMock(wraps=service.index.search)
+
+    for cocktail in cocktails:
+        for top_k in range(1, 5):
+            results = service.find_similar_cocktails(cocktail.id, top_k=top_k, exclude_self=exclude_self)
+            assert [(r["cocktail"].id, r["similarity_score"]) for r in results] == \
+                search_directly(service, cocktail.id, top_k, exclude_self)
+            assert [r["rank"] for r in results] == list(range(1, top_k + 1))
+
+    # Only the reference searches above touched FAISS
+    assert service.index.search.call_count == len(cocktails) * 4
+
+
+def test_top_k_above_table_falls_back_to_faiss(make_service):
+    service = make_service(neighbor_k=2)
+    service.build_index(force_rebuild=True)
+
+    results = service.find_similar_cocktails("martini", top_k=5)
+    assert [(r["cocktail"].id, r["similarity_score"]) for r in results] == \
+        search_directly(service, "martini", 5, True)
+
+
+def test_table_is_reloaded_or_rebuilt(make_service, tmp_path):
+    built = make_service(neighbor_k=3)
+    built.build_index(force_rebuild=True)
+
+    loaded = make_service(neighbor_k=3)
+    assert loaded.load_index()
+    assert np.array_equal(loaded.neighbor_ids, built.neighbor_ids)
+
+    # An index saved without a neighbour table gets one on load
+    (tmp_path / "faiss_neighbors.npz").unlink()
+    upgraded = make_service(neighbor_k=3)
+    assert upgraded.load_index()
+    assert np.array_equal(upgraded.neighbor_ids, built.neighbor_ids)
+    assert (tmp_path / "faiss_neighbors.npz").exists()
+
+
+def test_unknown_cocktail(make_service):
+    service = make_service()
+    service.build_index(force_rebuild=True)
+    assert service.find_similar_cocktails("missing") == []
+
+
+def test_saved_index_is_memory_mapped_and_rehydrated(make_service, cocktails, tmp_path):
+    built = make_service()
+    built.build_index(force_rebuild=True)
+
+    manifest = json.loads((tmp_path / "faiss_manifest.json").read_text())
+    assert manifest["model_name"] == "sentence-transformers/all-MiniLM-L6-v2"
+    assert manifest["dimension"] == DIMENSION
+    assert manifest["count"] == len(cocktails)
+    assert np.load(tmp_path / "faiss_cocktail_ids.npy").tolist() == [c.id for c in cocktails]
+    assert not list(tmp_path.glob("*.pkl"))
+
+    loaded = make_service()
+    assert loaded.load_index()
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert not loaded.embeddings.flags.writeable
+    np.testing.assert_array_equal(loaded.embeddings, built.embeddings)
+    # Cocktails come from the parser lookup, not from a pickled copy
+    assert all(a is b for a, b in zip(loaded.cocktails, cocktails))
+    assert [r["cocktail"].id for r in loaded.find_similar_cocktails("negroni", top_k=7)] == \
+        [r["cocktail"].id for r in built.find_similar_cocktails("negroni", top_k=7)]
+
+
+def test_saving_keeps_a_manifest_until_the_new_files_are_in_place(make_service, tmp_path):
+    make_service().build_index(force_rebuild=True)
+    service = make_service()
+    replaced = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        # Every file is written before the first rename, and the manifest never disappears
+        assert (tmp_path / "faiss_manifest.json").exists()
+        assert len(list(tmp_path.glob("tmp*"))) == 6 - len(replaced)
+        replaced.append(os.path.basename(dst))
+        real_replace(src, dst)
+
+    with patch("backend.services.similarity_service.os.replace", side_effect=replace):
+        service.build_index(force_rebuild=True)
+    assert replaced[-1] == "faiss_manifest.json" and len(replaced) == 6
+    assert make_service().load_index()
+
+
+def test_changed_corpus_or_model_is_not_loaded(make_service, cocktails):
+    make_service().build_index(force_rebuild=True)
+
+    other_model = make_service(model_name="sentence-transformers/other-model")
+    assert not other_model.load_index()
+
+    cocktails[0].description = "Now with a description"
+    stale = make_service()
+    assert not stale.load_index()
+    # build_index brings a stale index up to date
+    stale.build_index()
+    assert stale.load_index()
+
+
+def test_stale_index_only_reencodes_changed_cocktails(make_service, cocktails):
+    make_service().build_index(force_rebuild=True)
+
+    cocktails[1].description = "Bitter and red"
+    cocktails.pop(3)
+    cocktails.append(Cocktail(uri="http://example.com/Gimlet", id="gimlet", name="Gimlet",
+                              ingredients="* 60 ml Gin", parsed_ingredients=["Gin"]))
+    refreshed = make_service()
+    refreshed.build_index()
+
+    encoded = [text for call in refreshed.embedding_backend.encode.call_args_list for text in call.args[0]]
+    assert len(encoded) == 2
+    assert any("Bitter and red" in text for text in encoded)
+    assert any("Gimlet" in text for text in encoded)
+    assert sorted(c.id for c in refreshed.cocktails) == sorted(c.id for c in cocktails)
+
+    rebuilt = make_service()
+    rebuilt.build_index(force_rebuild=True)
+    assert_same_index(refreshed, rebuilt)
+    assert make_service().load_index()
+
+
+def test_add_update_remove_only_encode_touched_cocktails(make_service, cocktails):
+    service = make_service(neighbor_k=4)
+    service.build_index(force_rebuild=True)
+    service.embedding_backend.encode.reset_mock()
+
+    gimlet = Cocktail(uri="http://example.com/Gimlet", id="gimlet", name="Gimlet",
+                      ingredients="* 60 ml Gin", parsed_ingredients=["Gin"])
+    assert service.add_cocktails([gimlet]) == 1
+    cocktails[2].description = "Bitter and bubbly"
+    assert service.update_cocktails([cocktails[2]]) == 1
+    assert service.remove_cocktails(["mojito", "unknown"]) == 1
+
+    encoded = [text for call in service.embedding_backend.encode.call_args_list for text in call.args[0]]
+    assert len(encoded) == 2
+    assert service.index.ntotal == len(cocktails)
+    assert service.find_similar_cocktails("gimlet", top_k=1, exclude_self=False)[0]["cocktail"] is gimlet
+    assert all(r["cocktail"].id != "mojito" for r in service.find_similar_cocktails("martini", top_k=7))
+
+    with pytest.raises(ValueError):
+        service.add_cocktails([gimlet])
+    with pytest.raises(ValueError):
+        service.update_cocktails([cocktails[4]])
+
+    # Same state as a full rebuild of the edited catalog, and persisted
+    cocktails.remove(next(c for c in cocktails if c.id == "mojito"))
+    cocktails.append(gimlet)
+    rebuilt = make_service(neighbor_k=4)
+    rebuilt.build_index(force_rebuild=True)
+    assert_same_index(service, rebuilt)
+    reloaded = make_service(neighbor_k=4)
+    assert reloaded.load_index()
+    assert_same_index(reloaded, rebuilt)
+
+
+def test_searches_during_updates_see_one_whole_index_state(make_service):
+    service = make_service(neighbor_k=2)
+    service.build_index(force_rebuild=True)
+    gimlet = Cocktail(uri="http://example.com/Gimlet", id="gimlet", name="Gimlet",
+                      ingredients="* 60 ml Gin", parsed_ingredients=["Gin"])
+    stop = threading.Event()
+    errors = []
+
+    def search():
+        while not stop.is_set():
+            try:
+                # Past the neighbour table, so every call maps a FAISS search back to cocktails
+                results = service.find_similar_cocktails("martini", top_k=7, exclude_self=False)
+                assert results[0]["cocktail"].id == "martini"
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=search) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    previous = service._state
+    for _ in range(10):
+        service.add_cocktails([gimlet])
+        service.remove_cocktails(["gimlet"])
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert service._state is not previous
+    assert service.index.ntotal == len(service.cocktails) == len(service.labels) == 8
+
+
+def test_query_embeddings_are_cached(make_service):
+    service = make_service()
+    service.build_index(force_rebuild=True)
+    service.embedding_backend.encode.reset_mock()
+
+    first = service.find_similar_by_text("gin and bitters", top_k=3)
+    second = service.find_similar_by_text("  gin and   bitters", top_k=3)
+    service.find_similar_by_ingredients(["Gin", "Campari"], top_k=3)
+    service.find_similar_by_ingredients(["Gin", "Campari"], top_k=3)
+
+    assert second == first
+    assert service.embedding_backend.encode.call_count == 2
+    assert service.query_cache.stats()["hits"] == 2
+    assert service.query_cache.stats()["misses"] == 2
+
+
+def test_async_search_matches_sync(make_service):
+    service = make_service(encoder_max_wait_ms=1)
+    service.build_index(force_rebuild=True)
+
+    async def search():
+        return await asyncio.gather(
+            service.find_similar_by_text_async("smoky and bitter", top_k=3),
+            service.find_similar_by_ingredients_async(["Gin", "Campari"], top_k=3),
+        )
+
+    by_text, by_ingredients = asyncio.run(search())
+    service.query_cache.clear()
+    assert by_text == service.find_similar_by_text("smoky and bitter", top_k=3)
+    assert by_ingredients == service.find_similar_by_ingredients(["Gin", "Campari"], top_k=3)
+    service.encoder.close()
+
+
+def test_encoder_is_reopened_after_a_shutdown(make_service):
+    service = make_service(encoder_max_batch_size=4, encoder_max_wait_ms=1)
+    service.build_index(force_rebuild=True)
+    encoder = service.encoder
+    service.open_encoder()
+    assert service.encoder is encoder
+
+    # App shutdown, then a new lifespan in the same process
+    encoder.close()
+    service.open_encoder()
+    assert service.encoder is not encoder
+    assert (service.encoder.max_batch_size, service.encoder.max_wait_ms) == (4, 1)
+    assert len(service.find_similar_by_text("smoky and bitter", top_k=3)) == 3
+    service.encoder.close()
+
+
+def test_model_and_index_load_lazily_once(make_service, tmp_path):
+    backend = MagicMock(spec=EmbeddingBackend)
+    backend.name = "sentence-transformers/all-MiniLM-L6-v2"
+    backend.encode.side_effect = fake_encode
+    with patch("backend.services.similarity_service.get_embedding_backend", return_value=backend) as loader:
+        service = make_service()
+        service._embedding_backend = None
+        assert loader.call_count == 0
+        assert service.model_name == "sentence-transformers/all-MiniLM-L6-v2"
+
+        service.build_index = MagicMock(wraps=service.build_index)
+        barrier = threading.Barrier(8)
+
+        def search():
+            barrier.wait()
+            service.find_similar_cocktails("martini")
+
+        threads = [threading.Thread(target=search) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert service.build_index.call_count == 1
+        assert loader.call_count == 1
+        assert set(service.warm_up()) == {"embedding_model", "index", "warm_up"}
+        assert loader.call_count == 1
+
+
+def test_hnsw_mode_is_persisted_and_rebuilt_without_reencoding(make_service, cocktails, tmp_path):
+    service = make_service(index_mode="hnsw")
+    service.build_index(force_rebuild=True)
+    assert service.index_mode == "hnsw"
+    assert json.loads((tmp_path / "faiss_manifest.json").read_text())["index_type"] == "IDMap2,HNSW32,Flat"
+
+    # HNSW cannot remove vectors: updates rebuild the graph from the stored embeddings
+    service.embedding_backend.encode.reset_mock()
+    cocktails[0].description = "Stirred, never shaken"
+    assert service.update_cocktails([cocktails[0]]) == 1
+    assert service.embedding_backend.encode.call_count == 1
+    assert service.index.ntotal == len(cocktails)
+
+    reloaded = make_service(index_mode="hnsw")
+    assert reloaded.load_index() and reloaded.index_mode == "hnsw"
+
+    # Switching the configured mode rebuilds the index without encoding anything
+    flat = make_service(index_mode="flat")
+    assert not flat.load_index()
+    flat.build_index()
+    assert flat.index_mode == "flat"
+    assert flat.embedding_backend.encode.call_count == 0
+
+
+def test_ivfpq_mode_keeps_its_training_on_updates(make_service, cocktails):
+    cocktails[:] = [Cocktail(uri=f"http://example.com/c{i}", id=f"c{i}", name=f"Cocktail {i}",
+                             ingredients=f"* {i} ml Gin", parsed_ingredients=["Gin"]) for i in range(300)]
+    service = make_service(index_mode="ivfpq")
+    service.build_index(force_rebuild=True)
+    assert service.index_mode == "ivfpq"
+    centroids = faiss.extract_index_ivf(service.index).quantizer.reconstruct_n(0, 4)
+
+    added = Cocktail(uri="http://example.com/new", id="new", name="Newcomer",
+                     ingredients="* 1 ml Rum", parsed_ingredients=["Rum"])
+    service.add_cocktails([added])
+    assert service.index.ntotal == 301
+    np.testing.assert_array_equal(faiss.extract_index_ivf(service.index).quantizer.reconstruct_n(0, 4), centroids)
+    assert service.find_similar_cocktails("new", top_k=3)
+
+
+def test_clusters_are_persisted_per_corpus(make_service, tmp_path):
+    service = make_service()
+    clusters = service.create_cocktails_clusters(3)
+    assert (tmp_path / "faiss_clusters_3.npz").exists()
+    assert sorted(cid for cluster in clusters.values() for cid in cluster.cocktail_ids) == \
+        sorted(c.id for c in service.cocktails)
+    assert all(cluster.title == "Shaken Classics" for cluster in clusters.values())
+
+    # Another worker (or a restart) reuses them: no k-means, no LLM call
+    other = make_service()
+    with patch("backend.services.similarity_service.train_kmeans") as trainer:
+        reloaded = other.create_cocktails_clusters(3)
+    trainer.assert_not_called()
+    other.llm_service.example.assert_not_called()
+    assert {k: c.model_dump() for k, c in reloaded.items()} == {k: c.model_dump() for k, c in clusters.items()}
+    assert other.cocktail_lookup.by_id["martini"].vibe_id is not None
+
+
+def test_changed_corpus_warm_starts_from_previous_centroids(make_service, cocktails, tmp_path):
+    service = make_service()
+    service.create_cocktails_clusters(3)
+    previous = np.load(tmp_path / "faiss_clusters_3.npz")["centroids"]
+
+    service.add_cocktails([Cocktail(uri="http://example.com/Gimlet", id="gimlet", name="Gimlet",
+                                    ingredients="* 60 ml Gin", parsed_ingredients=["Gin"])])
+    with patch("backend.services.similarity_service.train_kmeans", wraps=train_kmeans) as trainer:
+        clusters = service.create_cocktails_clusters(3)
+    np.testing.assert_array_equal(trainer.call_args.kwargs["init_centroids"], previous)
+    assert "gimlet" in [cid for cluster in clusters.values() for cid in cluster.cocktail_ids]
+
+    # A mostly different catalog starts over
+    cocktails[:] = [Cocktail(uri=f"http://example.com/c{i}", id=f"c{i}", name=f"Cocktail {i}",
+                             ingredients=f"* {i} ml Gin", parsed_ingredients=["Gin"]) for i in range(8)]
+    replaced = make_service()
+    with patch("backend.services.similarity_service.train_kmeans", wraps=train_kmeans) as trainer:
+        replaced.create_cocktails_clusters(3)
+    assert trainer.call_args.kwargs["init_centroids"] is None
+
+
+def test_get_clusters_never_trains_on_the_caller_thread(make_service, cocktails):
+    service = make_service()
+    service.ensure_index()
+    trained_on = []
+
+    def train(*args, **kwargs):
+        trained_on.append(threading.current_thread())
+        return train_kmeans(*args, **kwargs)
+
+    with patch("backend.services.similarity_service.train_kmeans", side_effect=train):
+        assert service.get_clusters(3) is None
+        for thread in threading.enumerate():
+            if thread.name == "clusters-3":
+                thread.join(timeout=30)
+        clusters = service.get_clusters(3)
+    assert trained_on and threading.current_thread() not in trained_on
+    assert sum(len(cluster.cocktail_ids) for cluster in clusters.values()) == len(cocktails)
+
+    # After a catalog change the previous clusters are served while new ones are computed
+    service.remove_cocktails(["mojito"])
+    with patch.object(service, "schedule_clusters") as schedule:
+        stale = service.get_clusters(3)
+    schedule.assert_called_once_with(3)
+    assert "mojito" in [cid for cluster in stale.values() for cid in cluster.cocktail_ids]
+
+
+def test_cluster_sweep_shares_one_silhouette_sample(make_service, tmp_path):
+    service = make_service()
+    with patch("backend.services.similarity_service.silhouette_sample", wraps=silhouette_sample) as sampler:
+        scores = service.precompute_clusters(range(2, 6))
+    assert sampler.call_count == 1
+    assert sorted(scores) == [2, 3, 4, 5]
+    assert all(-1 <= score <= 1 for score in scores.values())
+    assert service.recommended_n_clusters() == max(scores, key=scores.get)
+
+    # Scores are read back from the saved clusterings, without training
+    other = make_service()
+    assert other.cluster_scores() == {}
+    other.ensure_index()
+    with patch("backend.services.similarity_service.train_kmeans") as trainer:
+        assert other.cluster_scores() == pytest.approx(scores)
+        assert other.get_clusters(4) is not None
+    trainer.assert_not_called()
+
+
+def test_workers_wait_for_a_clustering_in_progress(make_service, tmp_path):
+    make_service().create_cocktails_clusters(3)
+    saved = tmp_path / "faiss_clusters_3.npz"
+    saved.rename(tmp_path / "aside.npz")
+
+    waiting = make_service()
+    waiting.ensure_index()
+    with patch("backend.services.similarity_service.train_kmeans", side_effect=AssertionError("trained twice")):
+        # Another worker is clustering: this one blocks on the lock, then loads its result
+        with clustering_lock(str(tmp_path / "faiss_clusters.lock")):
+            thread = threading.Thread(target=waiting.create_cocktails_clusters, args=(3,))
+            thread.start()
+            thread.join(timeout=0.3)
+            assert thread.is_alive()
+            (tmp_path / "aside.npz").rename(saved)
+        thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert waiting.get_clusters(3) is not None
+    waiting.llm_service.example.assert_not_called()
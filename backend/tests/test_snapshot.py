@@ -0,0 +1,99 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from rdflib import Graph, Literal, URIRef, Namespace
+
+from backend.data.snapshot import (
+    SNAPSHOT_VERSION,
+    compute_source_digest,
+    load_snapshot,
+    snapshot_path_for,
+    write_snapshot,
+)
+from backend.models.cocktail import Cocktail
+from backend.models.ingredient import Ingredient
+
+DBP = Namespace("http://dbpedia.org/property/")
+RDFS = Namespace("http://www.w3.org/2000/01/rdf-schema#")
+
+
+@pytest.fixture
+def ttl_file(tmp_path):
+    path = tmp_path / "data.ttl"
+    path.write_text("@prefix ex: <http://example.com/> .\nex:a ex:b ex:c .\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def sample_graph():
+    graph = Graph()
+    mojito = URIRef("http://dbpedia.org/resource/Mojito")
+    graph.add((mojito, RDFS.label, Literal("Mojito", lang="en")))
+    graph.add((mojito, RDFS.label, Literal("Mojito", lang="fr")))
+    graph.add((mojito, DBP.ingredients, Literal("* 45 ml White Rum\n* Mint")))
+    graph.add((mojito, DBP.abv, Literal(12)))
+    return graph
+
+
+@pytest.fixture
+def sample_data():
+    cocktails = [
+        Cocktail(uri="http://dbpedia.org/resource/Mojito", id="mojito", name="Mojito",
+                 parsed_ingredients=["White Rum", "Mint"], labels={"en": "Mojito", "fr": "Mojito"},
+                 vibe_id=3)
+    ]
+    ingredients = [Ingredient(id="http://marmitonic.local/ingredient/mint", name="Mint")]
+    return cocktails, ingredients
+
+
+def test_snapshot_path_for(ttl_file):
+    assert snapshot_path_for(ttl_file) == ttl_file.with_name("data.snapshot")
+
+
+def test_roundtrip(ttl_file, sample_graph, sample_data):
+    cocktails, ingredients = sample_data
+    digest = compute_source_digest(ttl_file)
+    path = write_snapshot(snapshot_path_for(ttl_file), digest, sample_graph, cocktails, ingredients)
+
+    snapshot = load_snapshot(path, digest)
+    assert snapshot is not None
+    assert snapshot.triple_count == len(sample_graph)
+    assert snapshot.cocktails[0].name == "Mojito"
+    assert snapshot.cocktails[0].parsed_ingredients == ["White Rum", "Mint"]
+    # Runtime clustering state is not persisted
+    assert snapshot.cocktails[0].vibe_id is None
+    assert snapshot.ingredients[0].name == "Mint"
+
+    rebuilt = snapshot.build_graph()
+    assert set(rebuilt) == set(sample_graph)
+
+
+def test_digest_mismatch_is_rejected(ttl_file, sample_graph, sample_data):
+    cocktails, ingredients = sample_data
+    digest = compute_source_digest(ttl_file)
+    path = write_snapshot(snapshot_path_for(ttl_file), digest, sample_graph, cocktails, ingredients)
+
+    ttl_file.write_text("@prefix ex: <http://example.com/> .\nex:a ex:b ex:d .\n", encoding="utf-8")
+    assert load_snapshot(path, compute_source_digest(ttl_file)) is None
+
+
+def test_version_mismatch_is_rejected(ttl_file, sample_graph, sample_data, monkeypatch):
+    cocktails, ingredients = sample_data
+    digest = compute_source_digest(ttl_file)
+    path = write_snapshot(snapshot_path_for(ttl_file), digest, sample_graph, cocktails, ingredients)
+
+    monkeypatch.setattr("backend.data.snapshot.SNAPSHOT_VERSION", SNAPSHOT_VERSION + 1)
+    assert load_snapshot(path, digest) is None
+
+
+def test_missing_or_corrupt_snapshot(ttl_file):
+    digest = compute_source_digest(ttl_file)
+    path = snapshot_path_for(ttl_file)
+    assert load_snapshot(path, digest) is None
+
+    path.write_bytes(b"garbage")
+    assert load_snapshot(path, digest) is None
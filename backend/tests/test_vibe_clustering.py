@@ -0,0 +1,83 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import faiss
+import numpy as np
+
+from backend.services.vibe_clustering import (
+    Clustering, assign_clusters, load_clustering, save_clustering, silhouette_sample, silhouette_score,
+    train_kmeans,
+)
+
+
+@pytest.fixture
+def blobs():
+    """Three well separated groups of 40 unit vectors"""
+    rng = np.random.default_rng(0)
+    centers = np.eye(16, dtype=np.float32)[:3] * 5
+    x = np.vstack([center + rng.standard_normal((40, 16)).astype(np.float32) for center in centers])
+    faiss.normalize_L2(x)
+    return x
+
+
+def brute_force_silhouette(x, labels):
+    scores = []
+    for i in range(len(x)):
+        distances = np.linalg.norm(x - x[i], axis=1)
+        same = labels == labels[i]
+        if same.sum() == 1:
+            scores.append(0.0)
+            continue
+        a = distances[same].sum() / (same.sum() - 1)
+        b = min(distances[labels == other].mean() for other in set(labels.tolist()) - {labels[i]})
+        scores.append((b - a) / max(a, b))
+    return float(np.mean(scores))
+
+
+def test_silhouette_matches_definition(blobs):
+    labels = np.random.default_rng(1).integers(0, 4, len(blobs))
+    # A singleton cluster scores 0
+    labels[0] = 7
+    assert silhouette_score(silhouette_sample(blobs), labels) == pytest.approx(brute_force_silhouette(blobs, labels), abs=1e-5)
+    assert silhouette_score(silhouette_sample(blobs), np.zeros(len(blobs), dtype=np.int32)) == 0.0
+
+
+def test_silhouette_prefers_the_true_number_of_groups(blobs):
+    sample = silhouette_sample(blobs, sample_size=60)
+    assert len(sample.positions) == 60
+    scores = {k: silhouette_score(sample, assign_clusters(blobs, train_kmeans(blobs, k))[0]) for k in range(2, 7)}
+    assert max(scores, key=scores.get) == 3
+
+
+def test_warm_start_refines_given_centroids(blobs):
+    centroids = train_kmeans(blobs, 3)
+    assignments, closest = assign_clusters(blobs, centroids)
+    assert sorted(np.bincount(assignments).tolist()) == [40, 40, 40]
+    # Each centroid's closest rows belong to its own cluster
+    assert all((assignments[closest[c]] == c).all() for c in range(3))
+
+    refined = train_kmeans(blobs, 3, init_centroids=centroids)
+    np.testing.assert_array_equal(assign_clusters(blobs, refined)[0], assignments)
+
+
+def test_clustering_round_trip(tmp_path, blobs):
+    centroids = train_kmeans(blobs, 3)
+    assignments, _ = assign_clusters(blobs, centroids)
+    clustering = Clustering(
+        n_clusters=3, model_name="model", corpus_hash="abc", cocktail_ids=[f"c{i}" for i in range(len(blobs))],
+        assignments=assignments, centroids=centroids, closest=[["c1", "c2"], ["c40"], []],
+        titles=["Citrus Dreams", "Classic Elegance", ""], silhouette=0.5,
+    )
+    path = str(tmp_path / "faiss_clusters_3.npz")
+    save_clustering(path, clustering)
+
+    loaded = load_clustering(path)
+    assert loaded.closest == clustering.closest
+    assert loaded.titles == clustering.titles
+    assert loaded.silhouette == 0.5
+    np.testing.assert_array_equal(loaded.centroids, centroids)
+    assert load_clustering(str(tmp_path / "missing.npz")) is None
@@ -189,14 +189,23 @@ async function fetchRandomCocktail() {
 }
 
 // Get vibe clusters with cocktails
-async function fetchVibeClusters(nClusters = 3) {
+// The server answers 202 while the clusters are computed in the background: poll until they are ready
+async function fetchVibeClusters(nClusters = 3, maxAttempts = 20) {
     try {
-        const response = await fetch(`${API_BASE_URL}/cocktails/clusters?n_clusters=${nClusters}&with_cocktails=true`);
-        if (!response.ok) {
-            throw new Error('Failed to fetch vibe clusters');
+        for (let attempt = 0; attempt < maxAttempts; attempt++) {
+            const response = await fetch(`${API_BASE_URL}/cocktails/clusters?n_clusters=${nClusters}&with_cocktails=true`);
+            if (!response.ok) {
+                throw new Error('Failed to fetch vibe clusters');
+            }
+            if (response.status !== 202) {
+                const data = await response.json();
+                return data.clusters || [];
+            }
+            const retryAfter = parseFloat(response.headers.get('Retry-After')) || 2;
+            console.log(`Vibe clusters are being computed, retrying in ${retryAfter}s...`);
+            await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
         }
-        const data = await response.json();
-        return data.clusters || [];
+        return [];
     } catch (error) {
         console.error('Error fetching vibe clusters:', error);
         return [];